@@ -0,0 +1,103 @@
+"""
+Fleet benchmark: scan and apply across many loopback agents.
+
+    python benchmarks/bench_fleet.py [--hosts 200] [--latency 0.2] [--adapters 4]
+
+Starts ``--hosts`` in-process agents on 127.0.0.1, each with a fake scan
+that takes up to ``--latency`` seconds and a FakeExecutor for apply. It
+then times full fleet sweeps and one fleet-wide apply. A sweep should take
+about the slowest host's latency, not the sum of them, and the thread
+count should not grow with the number of hosts. No network access or
+admin rights are needed.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from networkcontrol.agent import Agent  # noqa: E402
+from networkcontrol.model.apply_engine import ApplyEngine, FakeExecutor  # noqa: E402
+from networkcontrol.model.fleet import FleetPool, fleet_key, host_label  # noqa: E402
+
+TOKEN = "bench"  # agents refuse apply without one
+
+
+def fake_agent(index: int, adapters: int, latency: float) -> Agent:
+    interfaces = [
+        {"connection": f"Ethernet {n}", "description": f"Fake NIC {n}", "ip": f"10.{index // 250}.{index % 250}.{n}",
+         "subnet": "255.255.255.0", "gateway": "—", "mode": "DHCP", "link": "Up"}
+        for n in range(adapters)
+    ]
+    executor = FakeExecutor({iface["connection"]: {"mode": "DHCP"} for iface in interfaces})
+
+    async def scan(deep):
+        await asyncio.sleep(random.uniform(0, latency))
+        return interfaces
+
+    async def apply(changes):
+        await asyncio.sleep(random.uniform(0, latency))
+        return ApplyEngine(executor).run(changes)
+
+    return Agent(scan=scan, apply=apply, token=TOKEN)
+
+
+async def run(hosts: int, adapters: int, latency: float, sweeps: int):
+    servers, addresses = [], []
+    for i in range(hosts):
+        server = await fake_agent(i, adapters, latency).serve("127.0.0.1", 0)
+        servers.append(server)
+        addresses.append(("127.0.0.1", server.sockets[0].getsockname()[1]))
+
+    pool = FleetPool(addresses, token=TOKEN, timeout=latency * 10 + 5)
+    try:
+        for sweep in range(1, sweeps + 1):
+            start = time.perf_counter()
+            rows = errors = 0
+            first = None
+            async for res in pool.scan():
+                first = first or time.perf_counter() - start
+                if "error" in res:
+                    errors += 1
+                else:
+                    rows += len(res["interfaces"])
+            elapsed = time.perf_counter() - start
+            label = "cold (connect)" if sweep == 1 else "warm"
+            print(f"sweep {sweep} {label:<15} {elapsed * 1000:8.1f} ms  first host after {first * 1000:6.1f} ms  "
+                  f"{rows} rows  {errors} errors")
+
+        changes = [
+            {"connection": fleet_key(host_label(*addr), "Ethernet 0"), "mode": "Static",
+             "ip": f"192.168.{i // 250}.{i % 250 + 1}", "subnet": "24", "gateway": ""}
+            for i, addr in enumerate(addresses)
+        ]
+        start = time.perf_counter()
+        ok = 0
+        async for outcome in pool.apply(changes):
+            ok += sum(1 for res in outcome.get("results", []) if res["success"])
+        print(f"apply to {hosts} hosts          {(time.perf_counter() - start) * 1000:8.1f} ms  {ok} verified")
+        print(f"\nthreads alive: {threading.active_count()} (for {hosts} hosts)")
+        print(f"serial lower bound at mean latency: {hosts * latency / 2 * 1000:.0f} ms per sweep")
+    finally:
+        await pool.close()
+        for server in servers:
+            server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hosts", type=int, default=200)
+    parser.add_argument("--adapters", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--sweeps", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.hosts, args.adapters, args.latency, args.sweeps))
+
+
+if __name__ == "__main__":
+    main()
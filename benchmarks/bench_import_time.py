@@ -0,0 +1,88 @@
+"""
+Import-time profile of the GUI start-up path, from ``python -X importtime``.
+
+    python benchmarks/bench_import_time.py [--top 15] [--module networkcontrol.controller.main_controller]
+
+Prints the total import time, the slowest modules by self time, and
+whether any of the deferred heavy modules (wmi, pywin32/COM, psutil,
+PyQt6.uic) were imported eagerly. Exits non-zero in that last case, so it
+can guard against someone re-adding a top-level ``import wmi``.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Entry-point imports of ``python -m networkcontrol`` up to the first scan
+DEFAULT_MODULES = [
+    "PyQt6.QtWidgets",
+    "networkcontrol.view.main_window",
+    "networkcontrol.view.ui_main_window",
+    "networkcontrol.controller.main_controller",
+]
+
+DEFERRED = ("wmi", "win32com", "pythoncom", "pywintypes", "psutil", "PyQt6.uic")
+
+
+def import_profile(modules):
+    """
+    Run ``-X importtime`` in a fresh interpreter.
+
+    Returns:
+        list: (module, self_us, cumulative_us) in import order
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--module", action="append", help="module(s) to import (default: GUI start-up path)")
+    args = parser.parse_args()
+    modules = args.module or DEFAULT_MODULES
+
+    try:
+        rows = import_profile(modules)
+    except RuntimeError as e:
+        # Without PyQt6, profile the model layer the GUI would import
+        print(f"GUI path unavailable ({e}); profiling the model layer only\n")
+        modules = ["networkcontrol.controller.poll_scheduler", "networkcontrol.model.network_model",
+                   "networkcontrol.model.network_apply"]
+        rows = import_profile(modules)
+
+    total = sum(self_us for _, self_us, _ in rows)
+    print(f"imports: {' '.join(modules)}")
+    print(f"total import time: {total / 1000:.1f} ms across {len(rows)} modules\n")
+
+    print(f"{'module':<50} {'self ms':>9} {'cumul ms':>9}")
+    for name, self_us, cumulative in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"{name:<50} {self_us / 1000:>9.2f} {cumulative / 1000:>9.2f}")
+
+    eager = sorted({name for name, _, _ in rows if name.split(".")[0] in DEFERRED or name in DEFERRED})
+    print()
+    if eager:
+        print(f"FAIL: deferred modules imported at start-up: {', '.join(eager)}")
+        sys.exit(1)
+    print("deferred modules (wmi, COM, psutil, uic) not imported at start-up: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+netsh parser benchmark: legacy per-line regex loop vs. single-pass parser.
+
+    python benchmarks/bench_netsh_parser.py [--adapters 10000] [--rounds 5]
+
+Also parses every dump in benchmarks/netsh_corpus/ and prints the result,
+so locale or format regressions are visible at a glance. Runs anywhere;
+no netsh required.
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from networkcontrol.model.netsh_parser import parse_netsh_config  # noqa: E402
+
+CORPUS = Path(__file__).resolve().parent / "netsh_corpus"
+
+
+def legacy_parse(text):
+    """The original _parse_dhcp_and_gateway loop, kept for comparison."""
+    dhcp_modes, gateways = {}, {}
+    current_adapter = None
+    for line in text.splitlines():
+        header = re.match(r'Configuration for interface "(.*)"', line)
+        if header:
+            current_adapter = header.group(1).strip()
+            continue
+        if not current_adapter:
+            continue
+        dhcp_match = re.search(r"DHCP enabled:\s+(Yes|No)", line, re.IGNORECASE)
+        if dhcp_match:
+            dhcp_modes[current_adapter] = "DHCP" if dhcp_match.group(1).lower() == "yes" else "Static"
+        gw_match = re.search(r"Default Gateway:\s*(.*)", line)
+        if gw_match:
+            gw = gw_match.group(1).strip()
+            if gw and gw != "None":
+                gateways[current_adapter] = gw
+    return dhcp_modes, gateways
+
+
+def synthetic_dump(count):
+    blocks = []
+    for i in range(count):
+        dhcp = "Yes" if i % 2 else "No"
+        block = [
+            f'Configuration for interface "Ethernet {i}"',
+            f"    DHCP enabled:                         {dhcp}",
+            f"    IP Address:                           10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+            f"    Subnet Prefix:                        10.{i // 65536 % 256}.{i // 256 % 256}.0/24 (mask 255.255.255.0)",
+            f"    Default Gateway:                      10.{i // 65536 % 256}.{i // 256 % 256}.1",
+        ]
+        if i % 10 == 0:
+            block.append("                                          10.255.255.1")
+        block += [
+            "    Gateway Metric:                       0",
+            "    InterfaceMetric:                      25",
+            "    DNS servers configured through DHCP:  10.0.0.1",
+            "                                          10.0.0.2",
+            "    Register with which suffix:           Primary only",
+            "    WINS servers configured through DHCP: None",
+            "",
+        ]
+        blocks.append("\n".join(block))
+    return "\n".join(blocks)
+
+
+def best_of(fn, arg, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--adapters", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    for path in sorted(CORPUS.glob("*.txt")):
+        print(f"== {path.name}")
+        for name, adapter in parse_netsh_config(path.read_text(encoding="utf-8")).items():
+            print(f"   {name!r}: {adapter}")
+
+    dump = synthetic_dump(args.adapters)
+    lines = dump.count("\n") + 1
+    legacy_ms = best_of(legacy_parse, dump, args.rounds)
+    single_ms = best_of(parse_netsh_config, dump, args.rounds)
+    print(f"\n{args.adapters} adapters / {lines} lines (best of {args.rounds})")
+    print(f"  legacy      {legacy_ms:8.1f} ms")
+    print(f"  single-pass {single_ms:8.1f} ms  ({legacy_ms / single_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Connectivity probe benchmark against local listener stand-ins.
+
+    python benchmarks/bench_probes.py [--adapters 200] [--concurrency 1 8 32]
+
+Every synthetic adapter is bound to 127.0.0.1. Its "upstream" is a local
+listener that accepts, and its "gateway" is a closed loopback port that
+refuses (which still counts as reachable). Each round prints the time to
+probe every adapter at several concurrency limits, then a cached round,
+and checks that every adapter came out "Internet".
+"""
+
+import argparse
+import asyncio
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from networkcontrol.model.probes import ProbeEngine  # noqa: E402
+
+
+def closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def synthetic_interfaces(count):
+    # Distinct gateways, so each adapter costs its own connect
+    return [
+        {"connection": f"Ethernet {i}", "ip": "127.0.0.1", "gateway": f"127.0.{i // 250}.{i % 250 + 2}", "link": "Up"}
+        for i in range(count)
+    ]
+
+
+async def main(args):
+    server = await asyncio.start_server(lambda reader, writer: writer.close(), "127.0.0.1", 0, backlog=1024)
+    upstream = ("127.0.0.1", server.sockets[0].getsockname()[1])
+    interfaces = synthetic_interfaces(args.adapters)
+
+    print(f"{'concurrency':>11}  {'round ms':>9}  {'per adapter ms':>14}  {'internet':>8}")
+    for limit in args.concurrency:
+        engine = ProbeEngine(upstream=upstream, gateway_port=closed_port(), concurrency=limit, timeout=2.0)
+        start = time.perf_counter()
+        results = await engine.check_all(interfaces)
+        elapsed = (time.perf_counter() - start) * 1000
+        internet = sum(result["status"] == "Internet" for result in results.values())
+        print(f"{limit:>11}  {elapsed:>9.1f}  {elapsed / len(interfaces):>14.3f}  {internet:>8}")
+
+    start = time.perf_counter()
+    await engine.check_all(interfaces)
+    print(f"\ncached round: {(time.perf_counter() - start) * 1000:.2f} ms")
+    server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--adapters", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,74 @@
+"""
+Startup benchmark: headless entry point vs. the GUI entry point.
+
+    python benchmarks/bench_startup.py [--rounds 10]
+
+Each round imports the entry point's modules in a fresh interpreter and
+measures wall-clock time, so the numbers include interpreter start-up and
+every transitive import. Also checks that the headless import never pulls
+in PyQt6. The GUI row is skipped if PyQt6 is not installed.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+CASES = {
+    "python (baseline)": "pass",
+    "headless": "import networkcontrol.headless",
+    "gui": "from PyQt6 import QtWidgets, uic; import networkcontrol.controller.main_controller",
+}
+
+NO_QT_CHECK = (
+    "import sys, networkcontrol.headless; "
+    "leaked = sorted(m for m in sys.modules if m.split('.')[0] == 'PyQt6'); "
+    "print(','.join(leaked)); sys.exit(1 if leaked else 0)"
+)
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    return env
+
+
+def time_import(code: str, rounds: int):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code], env=_env(), capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if proc.returncode != 0:
+            return None, proc.stderr.strip().splitlines()[-1:] or ["failed"]
+        samples.append(elapsed)
+    return samples, None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    check = subprocess.run([sys.executable, "-c", NO_QT_CHECK], env=_env(), capture_output=True, text=True)
+    if check.returncode != 0:
+        print(f"FAIL: headless import pulled in PyQt6: {check.stdout.strip() or check.stderr.strip()}")
+        sys.exit(1)
+    print("headless import does not load PyQt6: OK\n")
+
+    print(f"{'entry point':<20} {'median ms':>10} {'min ms':>10}")
+    for name, code in CASES.items():
+        samples, error = time_import(code, args.rounds)
+        if samples is None:
+            print(f"{name:<20} {'skipped':>10}  ({error[0]})")
+            continue
+        print(f"{name:<20} {statistics.median(samples) * 1000:>10.1f} {min(samples) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Table update benchmark: QTableWidget full rebuild vs. incremental model update.
+
+    python benchmarks/bench_table_update.py [--adapters 500] [--rounds 20]
+
+Runs headless (QT_QPA_PLATFORM=offscreen). Each round changes a handful of
+synthetic adapters, as a typical background refresh would.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import QtWidgets  # noqa: E402
+from networkcontrol.controller.table_model import (  # noqa: E402
+    COL_LINK,
+    InterfaceTableModel,
+    LedDelegate,
+    fit_columns,
+    row_cells,
+)
+
+
+def synthetic_interfaces(count):
+    return [
+        {
+            "connection": f"Ethernet {i}",
+            "description": f"Synthetic Adapter #{i}",
+            "ip": f"10.{i // 250}.{i % 250}.10",
+            "subnet": "255.255.255.0",
+            "gateway": f"10.{i // 250}.{i % 250}.1" if i % 3 else "—",
+            "mode": "DHCP" if i % 2 else "Static",
+            "link": "Up",
+        }
+        for i in range(count)
+    ]
+
+
+def mutate(interfaces, changes=5):
+    scan = [dict(iface) for iface in interfaces]
+    for iface in random.sample(scan, min(changes, len(scan))):
+        iface["link"] = "Down" if iface["link"] == "Up" else "Up"
+    return scan
+
+
+def make_table():
+    table = QtWidgets.QTableWidget(0, 7)
+    table.setSortingEnabled(True)
+    return table
+
+
+def make_view():
+    view = QtWidgets.QTreeView()
+    model = InterfaceTableModel(view)
+    view.setModel(model)
+    view.setItemDelegateForColumn(COL_LINK, LedDelegate(view))
+    return view, model
+
+
+def model_update(view, model, interfaces):
+    if model.update(interfaces):
+        fit_columns(view)
+
+
+def full_rebuild(table, interfaces):
+    """The pre-diff behaviour: clear and recreate every item and LED label."""
+    table.setRowCount(0)
+    for row, iface in enumerate(interfaces):
+        table.insertRow(row)
+        for col, text in enumerate(row_cells(iface)):
+            if col == 1:
+                label = QtWidgets.QLabel()
+                label.setText(f"<span>●</span> <span>{text}</span>")
+                table.setCellWidget(row, col, label)
+                text = ""
+            table.setItem(row, col, QtWidgets.QTableWidgetItem(text))
+    table.resizeColumnsToContents()
+
+
+def timed(fn, scans):
+    start = time.perf_counter()
+    for scan in scans:
+        fn(scan)
+        QtWidgets.QApplication.processEvents()
+    return (time.perf_counter() - start) / len(scans) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--adapters", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv)  # noqa: F841
+    random.seed(0)
+
+    print(f"{'adapters':>8}  {'rebuild ms':>10}  {'model ms':>8}  {'speedup':>7}")
+    for count in args.adapters:
+        base = synthetic_interfaces(count)
+        scans = [base]
+        for _ in range(args.rounds):
+            scans.append(mutate(scans[-1]))
+
+        table = make_table()
+        rebuild_ms = timed(lambda s: full_rebuild(table, s), scans)
+
+        view, model = make_view()
+        model_ms = timed(lambda s: model_update(view, model, s), scans)
+
+        print(f"{count:>8}  {rebuild_ms:>10.2f}  {model_ms:>8.2f}  {rebuild_ms / model_ms:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
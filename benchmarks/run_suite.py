@@ -0,0 +1,320 @@
+"""
+Reproducible benchmark suite on mock OS backends, with a regression gate.
+
+    python benchmarks/run_suite.py                    # run and compare with baseline.json
+    python benchmarks/run_suite.py --save-baseline    # record a new baseline
+    python benchmarks/run_suite.py --only fast_scan --sizes 100
+
+Every case runs against ``SyntheticBackend`` (see ``model/backends.py``),
+so no Windows, psutil, netsh or WMI is needed and the numbers mean the
+same thing on every machine. Cases are run at 10, 100 and 1000 adapters.
+A measurement is the median of several rounds; rounds repeat until about
+``--min-time`` seconds have been spent, and very fast cases are called
+several times per round.
+
+Machines differ in speed, so each measurement is divided by the time of
+a fixed pure-Python calibration loop, re-timed just before it. Each case
+is measured ``--repeats`` times and keeps the best normalized result:
+noise only ever slows a case down. The baseline stores these numbers. A
+case regresses when it exceeds the baseline by more than ``--tolerance``
+(default 30%) and by more than ``--noise-floor`` milliseconds, and then
+the script exits with status 1, so CI can run it as-is. Suspected
+regressions are re-measured with twice the repeats before failing.
+
+The table case needs PyQt6 and is skipped without it.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from networkcontrol.model.apply_engine import ApplyEngine, FakeExecutor  # noqa: E402
+from networkcontrol.model.backends import SyntheticBackend, configure_backend  # noqa: E402
+from networkcontrol.model.netsh_parser import parse_netsh_config  # noqa: E402
+from networkcontrol.model.network_model import (  # noqa: E402
+    configure_description_cache,
+    get_network_interfaces,
+    parse_deep_scan,
+)
+from networkcontrol.model.reconcile import Reconciler, configure_reconciler  # noqa: E402
+from networkcontrol.model.scan_cache import ScanCache, configure_scan_cache  # noqa: E402
+from networkcontrol.model.snapshot_store import SnapshotStore  # noqa: E402
+from networkcontrol.model.throughput import ThroughputMonitor  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+SIZES = (10, 100, 1000)
+
+
+# ------------------------------------------------------------
+# Cases: each takes a backend and returns a zero-argument callable
+# ------------------------------------------------------------
+def case_fast_scan(backend):
+    configure_backend(backend)
+    configure_description_cache()
+    configure_scan_cache(":memory:")
+    configure_reconciler(Reconciler())
+    return get_network_interfaces
+
+
+def case_deep_scan_parse(backend):
+    stdout = backend.recording["deep_scan"]
+    return lambda: parse_deep_scan(stdout)
+
+
+def case_netsh_parse(backend):
+    text = backend.recording["netsh"]
+    return lambda: parse_netsh_config(text)
+
+
+def case_snapshot_push(backend):
+    configure_backend(backend)
+    configure_description_cache()
+    configure_scan_cache(None)
+    configure_reconciler(Reconciler())
+    base = get_network_interfaces()
+    flipped = [{**iface, "link": "Down" if i % 7 == 0 else iface["link"]} for i, iface in enumerate(base)]
+    store = SnapshotStore()
+    scans = [base, flipped]
+    state = {"n": 0}
+
+    def push():
+        state["n"] += 1
+        store.push(scans[state["n"] % 2])
+    return push
+
+
+def case_cache_warm_start(backend):
+    """Open the scan cache file and load the last fast scan, as the GUI does at launch."""
+    configure_backend(backend)
+    configure_description_cache()
+    configure_scan_cache(None)
+    configure_reconciler(Reconciler())
+    path = Path(tempfile.mkdtemp(prefix="nc-bench-")) / "scan_cache.sqlite3"
+    writer = ScanCache(path, scope=backend.name)
+    writer.save("fast", get_network_interfaces())
+    writer.close()
+
+    def load():
+        cache = ScanCache(path, scope=backend.name)
+        cache.load("fast")
+        cache.close()
+    return load
+
+
+def case_throughput_sample(backend):
+    monitor = ThroughputMonitor()
+    clock = {"now": 0.0}
+
+    def sample():
+        clock["now"] += 1.0
+        updated = monitor.sample(backend.net_io_counters(), now=clock["now"])
+        monitor.snapshot(updated)
+    return sample
+
+
+def case_apply_batch(backend):
+    changes = [
+        {"connection": name, "mode": "Static", "ip": f"192.168.{i // 250 % 256}.{i % 250 + 2}",
+         "subnet": "24", "gateway": ""}
+        for i, name in enumerate(n for n in backend.recording["descriptions"] if n.startswith("Ethernet"))
+    ]
+
+    configs = backend.apply_executor().configs
+
+    def apply():
+        # A fresh executor each time, so every round applies real changes
+        list(ApplyEngine(executor=FakeExecutor(configs)).run(changes))
+    return apply
+
+
+_qt_app = None  # kept alive for the whole run: Qt destroys widgets when it is collected
+
+
+def case_table_populate(backend):
+    global _qt_app
+    from PyQt6 import QtWidgets
+    from networkcontrol.controller.table_model import InterfaceTableModel, fit_columns
+
+    _qt_app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    configure_backend(backend)
+    configure_description_cache()
+    configure_scan_cache(None)
+    configure_reconciler(Reconciler())
+    interfaces = get_network_interfaces()
+    view = QtWidgets.QTreeView()  # one view for every round, so only the model and the fit are timed
+
+    def populate():
+        previous = view.model()
+        model = InterfaceTableModel(view)
+        view.setModel(model)
+        if previous is not None:
+            previous.deleteLater()
+        model.update(interfaces)
+        fit_columns(view)
+        _qt_app.processEvents()  # runs the deleteLater so old models do not pile up
+    return populate
+
+
+CASES = {
+    "fast_scan": case_fast_scan,
+    "deep_scan_parse": case_deep_scan_parse,
+    "netsh_parse": case_netsh_parse,
+    "snapshot_push": case_snapshot_push,
+    "cache_warm_start": case_cache_warm_start,
+    "throughput_sample": case_throughput_sample,
+    "apply_batch": case_apply_batch,
+    "table_populate": case_table_populate,
+}
+
+
+# ------------------------------------------------------------
+# Timing
+# ------------------------------------------------------------
+def measure(fn, min_time: float, min_rounds: int = 5, max_rounds: int = 200, reduce=statistics.median) -> float:
+    """
+    Time per ``fn()`` call in milliseconds: ``reduce`` (median) over rounds.
+
+    Fast functions are called several times per round so each round lasts
+    at least a millisecond, well above timer resolution and scheduler noise.
+    """
+    start = time.perf_counter()
+    fn()  # warm-up, also sizes the rounds
+    calls = max(1, int(0.001 / max(time.perf_counter() - start, 1e-9)))
+    samples = []
+    spent = 0.0
+    while len(samples) < min_rounds or (spent < min_time and len(samples) < max_rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed * 1000 / calls)
+        spent += elapsed
+    return reduce(samples)
+
+
+def calibrate(min_time: float = 0.1) -> float:
+    """Best time (ms) of a fixed pure-Python workload: the unit for normalized results."""
+    def workload():
+        table = {}
+        for i in range(20000):
+            key = f"Ethernet {i % 500}"
+            table[key] = table.get(key, 0) + len(key.split(" "))
+        return sorted(table.items())
+    return measure(workload, min_time=min_time, min_rounds=5, reduce=min)
+
+
+def run(jobs, min_time, repeats: int = 3) -> dict:
+    """Time every (case name, size) in ``jobs``, keeping the best of ``repeats`` normalized medians."""
+    units = []
+    results = {}
+    for name, size in jobs:
+        key = f"{name}[{size}]"
+        try:
+            fn = CASES[name](SyntheticBackend(size))
+        except ImportError as e:
+            print(f"{key:<24} skipped ({e.name} not installed)")
+            continue
+        best = None
+        for _ in range(repeats):
+            # Calibrate next to every measurement, so drift during the run (turbo, noisy neighbours) cancels out
+            unit = calibrate()
+            ms = measure(fn, min_time)
+            if best is None or ms / unit < best[0] / best[1]:
+                best = (ms, unit)
+        ms, unit = best
+        units.append(unit)
+        results[key] = {"ms": ms, "normalized": ms / unit}
+        print(f"{key:<24} {ms:>10.3f} ms  {ms / unit:>9.3f} units", flush=True)
+    configure_backend()
+    configure_scan_cache()
+    configure_reconciler()
+    return {
+        "calibration_ms": statistics.median(units) if units else 0.0,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float, noise_floor: float = 0.0) -> list:
+    """
+    Return the keys whose normalized time exceeds the baseline by more than
+    ``tolerance``, and by more than ``noise_floor`` ms at today's calibration.
+    """
+    regressions = []
+    print()
+    print(f"{'case':<24} {'baseline':>9} {'current':>9} {'change':>8}")
+    for key, now in current["results"].items():
+        before = baseline.get("results", {}).get(key)
+        if before is None:
+            print(f"{key:<24} {'—':>9} {now['normalized']:>9.3f}      new")
+            continue
+        change = now["normalized"] / before["normalized"] - 1
+        unit = now["ms"] / now["normalized"] if now["normalized"] else 0.0
+        excess_ms = (now["normalized"] - before["normalized"]) * unit
+        flag = "  REGRESSION" if change > tolerance and excess_ms > noise_floor else ""
+        print(f"{key:<24} {before['normalized']:>9.3f} {now['normalized']:>9.3f} {change:>+7.0%}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds spent per case and size")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.30, help="allowed slowdown before failing (0.30 = 30%%)")
+    parser.add_argument("--noise-floor", type=float, default=0.05, metavar="MS",
+                        help="slowdowns smaller than this many milliseconds never fail (default 0.05)")
+    parser.add_argument("--repeats", type=int, default=3, help="measurements per case; the best one counts (default 3)")
+    parser.add_argument("--json", type=Path, metavar="FILE", help="also write the results to FILE")
+    args = parser.parse_args()
+
+    current = run([(name, size) for name in args.only for size in args.sizes], args.min_time, args.repeats)
+    print(f"\ncalibration unit: {current['calibration_ms']:.3f} ms")
+
+    if args.json:
+        args.json.write_text(json.dumps(current, indent=2, sort_keys=True), encoding="utf-8")
+    if args.save_baseline:
+        if args.baseline.exists() and (args.only != list(CASES) or args.sizes != list(SIZES)):
+            # A partial run updates its own entries and keeps the rest
+            saved = json.loads(args.baseline.read_text(encoding="utf-8"))
+            saved["results"].update(current["results"])
+            current = {**current, "results": saved["results"]}
+        args.baseline.write_text(json.dumps(current, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(current, baseline, args.tolerance, args.noise_floor)
+    if regressions:
+        # One slow stretch should not fail a build: re-measure the suspects, harder
+        print("\nre-measuring " + ", ".join(regressions))
+        jobs = [(key.split("[")[0], int(key.split("[")[1].rstrip("]"))) for key in regressions]
+        retry = run(jobs, args.min_time, args.repeats * 2)
+        current["results"].update(retry["results"])
+        regressions = compare(retry, baseline, args.tolerance, args.noise_floor)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,53 @@
+import argparse
+import os
 import sys
-from pathlib import Path
-from PyQt6 import QtWidgets, uic
-from networkcontrol.controller.main_controller import MainController
+
+
+def _parse_gui_args(argv):
+    parser = argparse.ArgumentParser(prog="networkcontrol")
+    parser.add_argument("--fleet", metavar="HOSTS_FILE",
+                        help="manage the agents listed in HOSTS_FILE (host[:port] per line) instead of this machine")
+    parser.add_argument("--token", default=os.environ.get("NETWORKCONTROL_AGENT_TOKEN"),
+                        help="fleet agent token (default: $NETWORKCONTROL_AGENT_TOKEN)")
+    parser.add_argument("--tls-ca", default=os.environ.get("NETWORKCONTROL_AGENT_CA"), metavar="PEM",
+                        help="connect to agents over TLS, trusting this CA or certificate (default: $NETWORKCONTROL_AGENT_CA)")
+    args, _ = parser.parse_known_args(argv)  # leave Qt's own options alone
+    return args
 
 
 def main():
+    # Headless and agent modes must not import PyQt6 at all
+    if "--headless" in sys.argv[1:]:
+        from networkcontrol.headless import main as headless_main
+        headless_main(sys.argv[1:])
+        return
+    if "--agent" in sys.argv[1:]:
+        from networkcontrol.agent import main as agent_main
+        agent_main(sys.argv[1:])
+        return
+
+    args = _parse_gui_args(sys.argv[1:])
+    fleet = None
+    if args.fleet:
+        from networkcontrol.model.fleet import parse_hosts
+        with open(args.fleet, encoding="utf-8") as f:
+            fleet = {"hosts": parse_hosts(f), "token": args.token, "tls_ca": args.tls_ca}
+
+    from PyQt6 import QtWidgets
+    from networkcontrol.view.main_window import create_main_window
+    from networkcontrol.controller.main_controller import MainController
+
     app = QtWidgets.QApplication(sys.argv)
 
-    # Load the UI file
-    ui_path = Path(__file__).parent / "view" / "ui" / "main_window.ui"
-    window = QtWidgets.QMainWindow()
-    uic.loadUi(str(ui_path), window)
+    # Precompiled UI (falls back to the .ui file during development)
+    window = create_main_window()
 
-    # Initialize controller
-    controller = MainController(window)
+    # Initialize controller; the first scan fills the table asynchronously
+    controller = MainController(window, fleet=fleet)
     window.show()
 
-    # Gracefully stop background worker if active
-    if hasattr(controller, "worker") and controller.worker:
-        app.aboutToQuit.connect(controller.worker.stop)
+    # Gracefully stop background workers
+    app.aboutToQuit.connect(controller.shutdown)
 
     sys.exit(app.exec())
 
@@ -0,0 +1,222 @@
+"""
+agent.py
+--------
+Fleet agent: ``python -m networkcontrol --agent [--listen HOST:PORT] [--token T] [--tls-cert PEM]``.
+
+A small asyncio TCP server that exposes this machine's model layer to a
+fleet console (see ``model/fleet.py``). Like the headless mode it never
+imports PyQt6. The protocol is NDJSON. The agent opens each connection
+with a greeting, then answers one request per line, in any order,
+matched by "id":
+
+    <- {"type": "hello", "nonce": "..."}
+    {"id": 1, "mac": "...", "type": "ping"}
+        -> {"id": 1, "type": "pong", "hostname": "..."}
+    {"id": 2, "mac": "...", "type": "scan", "deep": false}
+        -> {"id": 2, "type": "interfaces", "interfaces": [...]}
+    {"id": 3, "mac": "...", "type": "apply", "changes": [...]}
+        -> {"id": 3, "type": "apply_results", "results": [...]}
+    any failure
+        -> {"id": n, "type": "error", "message": "..."}
+
+With a token, "mac" is ``fleet.sign(token, nonce, request)`` and ids must
+increase on each connection, so the token never crosses the network and
+captured requests cannot be replayed. ``--tls-cert`` (and ``--tls-key``
+when the key is in its own file) also encrypts the connection.
+
+Concurrent scan requests share one in-flight scan. Listening on anything
+other than loopback requires a token, and an agent without one is
+read-only: it refuses "apply", since any local process could send it.
+"""
+
+import argparse
+import asyncio
+import hmac
+import inspect
+import ipaddress
+import json
+import os
+import secrets
+import socket
+import ssl
+import sys
+
+from networkcontrol.model.fleet import DEFAULT_AGENT_PORT, MAX_LINE, sign
+
+
+def _default_scan(deep=False):
+    from networkcontrol.model.network_model import get_network_interfaces, get_network_interfaces_deep
+    return get_network_interfaces_deep() if deep else get_network_interfaces()
+
+
+def _default_apply(changes):
+    from networkcontrol.model.network_apply import iter_apply_results
+    return list(iter_apply_results(changes))
+
+
+class Agent:
+    """
+    Serves scan/apply requests; see module docstring.
+
+    Args:
+        scan (callable): ``scan(deep) -> list`` of interface dicts (sync or async)
+        apply (callable): ``apply(changes) -> list`` of apply results (sync or async)
+        token (str): shared secret every request must be signed with (None = no check, and no apply)
+    """
+
+    def __init__(self, scan=None, apply=None, token: str = None):
+        self.scan = scan or _default_scan
+        self.apply = apply or _default_apply
+        self.token = token
+        self.requests = 0
+        self._inflight = {}  # deep flag -> future of the running scan
+        self._apply_lock = None
+
+    async def _call(self, fn, *args):
+        if inspect.iscoroutinefunction(fn):
+            return await fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def _scan(self, deep: bool) -> list:
+        # Join a scan already running instead of starting another one
+        future = self._inflight.get(deep)
+        if future is None:
+            future = asyncio.ensure_future(self._call(self.scan, deep))
+            self._inflight[deep] = future
+            future.add_done_callback(lambda _: self._inflight.pop(deep, None))
+        return await asyncio.shield(future)
+
+    async def _apply(self, changes: list) -> list:
+        if self._apply_lock is None:
+            self._apply_lock = asyncio.Lock()
+        async with self._apply_lock:  # one transaction at a time on this host
+            return await self._call(self.apply, changes)
+
+    def authenticate(self, request: dict, nonce: str, last_id: int) -> str:
+        """Why ``request`` is refused on the connection greeted with ``nonce``, or None if it is accepted."""
+        if self.token is None:
+            return "apply needs an agent started with --token" if request.get("type") == "apply" else None
+        if not hmac.compare_digest(str(request.get("mac", "")), sign(self.token, nonce, request)):
+            return "Invalid signature"
+        request_id = request.get("id")
+        if type(request_id) is not int or request_id <= last_id:
+            return "Replayed or out-of-order request id"
+        return None
+
+    async def handle_request(self, request: dict) -> dict:
+        """Answer one request that has already passed ``authenticate``."""
+        reply = {"id": request.get("id")}
+        kind = request.get("type")
+        try:
+            if kind == "ping":
+                return {**reply, "type": "pong", "hostname": socket.gethostname()}
+            if kind == "scan":
+                return {**reply, "type": "interfaces", "interfaces": await self._scan(bool(request.get("deep")))}
+            if kind == "apply":
+                return {**reply, "type": "apply_results", "results": await self._apply(list(request.get("changes", [])))}
+        except Exception as e:
+            return {**reply, "type": "error", "message": str(e) or type(e).__name__}
+        return {**reply, "type": "error", "message": f"Unknown request type: {kind!r}"}
+
+    async def _respond(self, request, writer, lock, refused=None):
+        if refused is not None:
+            reply = {"id": request.get("id"), "type": "error", "message": refused}
+        else:
+            reply = await self.handle_request(request)
+        data = (json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8")
+        async with lock:
+            writer.write(data)
+            await writer.drain()
+
+    async def handle_client(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+        nonce = secrets.token_hex(16)
+        last_id = 0
+        try:
+            writer.write((json.dumps({"type": "hello", "nonce": nonce}) + "\n").encode("utf-8"))
+            await writer.drain()
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be an object")
+                except ValueError as e:
+                    request = {"type": "invalid", "error": str(e)}
+                self.requests += 1
+                # Checked in arrival order, so each id is compared with the one before it
+                refused = self.authenticate(request, nonce, last_id)
+                if refused is None and self.token is not None:
+                    last_id = request["id"]
+                # Requests on one connection run concurrently; replies carry the id
+                task = asyncio.ensure_future(self._respond(request, writer, lock, refused))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_AGENT_PORT, ssl_context=None):
+        """Start listening; returns the ``asyncio.Server`` (port 0 picks a free port, ``ssl_context`` enables TLS)."""
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE, ssl=ssl_context)
+
+
+def server_ssl_context(certfile: str, keyfile: str = None) -> ssl.SSLContext:
+    """TLS context for the agent from a PEM certificate (and its key, if kept in a separate file)."""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certfile, keyfile)
+    return context
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="networkcontrol --agent", description="Serve this host to a fleet console.")
+    parser.add_argument("--agent", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--listen", default=f"127.0.0.1:{DEFAULT_AGENT_PORT}", metavar="HOST:PORT")
+    parser.add_argument("--token", default=os.environ.get("NETWORKCONTROL_AGENT_TOKEN"),
+                        help="shared secret, needed for apply (default: $NETWORKCONTROL_AGENT_TOKEN)")
+    parser.add_argument("--tls-cert", default=os.environ.get("NETWORKCONTROL_AGENT_CERT"), metavar="PEM",
+                        help="serve over TLS with this certificate (default: $NETWORKCONTROL_AGENT_CERT)")
+    parser.add_argument("--tls-key", default=os.environ.get("NETWORKCONTROL_AGENT_KEY"), metavar="PEM",
+                        help="private key, if not in the certificate file (default: $NETWORKCONTROL_AGENT_KEY)")
+    args = parser.parse_args(argv)
+
+    host, _, port = args.listen.rpartition(":")
+    host = host.strip("[]") or "127.0.0.1"
+    if not _is_loopback(host) and not args.token:
+        parser.error("a --token is required when listening on a non-loopback address")
+    if args.tls_key and not args.tls_cert:
+        parser.error("--tls-key needs --tls-cert")
+    try:
+        context = server_ssl_context(args.tls_cert, args.tls_key) if args.tls_cert else None
+    except (OSError, ssl.SSLError) as e:
+        parser.error(f"cannot load the TLS certificate: {e}")
+    if context is None and not _is_loopback(host):
+        print("warning: requests are signed but not encrypted; use --tls-cert to encrypt them",
+              file=sys.stderr, flush=True)
+
+    async def _run():
+        server = await Agent(token=args.token).serve(host, int(port), context)
+        addresses = ", ".join(str(s.getsockname()[:2]) for s in server.sockets)
+        print(f"networkcontrol agent listening on {addresses}", file=sys.stderr, flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
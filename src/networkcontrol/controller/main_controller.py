@@ -1,10 +1,32 @@
 from PyQt6 import QtWidgets, QtGui, QtCore
-from networkcontrol.model.network_model import (
-    get_network_interfaces,
-    get_network_interfaces_deep,
+from networkcontrol.model import instrumentation
+from networkcontrol.model.apply_engine import ApplyError, normalize_addresses
+from networkcontrol.model.network_apply import diff_changes, validate_ip_structure
+from networkcontrol.model.network_model import get_last_deep_report
+from networkcontrol.model.scan_cache import get_scan_cache
+from networkcontrol.model.snapshot_store import apply_diff, diff_records, is_empty, to_record
+from networkcontrol.view.diagnostics_dock import DiagnosticsDock, PaintTimer
+from networkcontrol.controller.worker_thread import (
+    ApplyWorker,
+    DeepScanWorker,
+    FleetApplyWorker,
+    FleetMonitorWorker,
+    NetworkMonitorWorker,
+    ProbeWorker,
+    ThroughputWorker,
+)
+from networkcontrol.controller.table_model import (
+    COL_LINK,
+    COL_MODE,
+    COL_RX,
+    COL_TX,
+    RATE_COLUMNS,
+    SORT_ROLE,
+    InterfaceTableModel,
+    LedDelegate,
+    SparklineDelegate,
+    fit_columns,
 )
-from networkcontrol.model.network_apply import apply_nic_settings, validate_ip_structure
-from networkcontrol.controller.worker_thread import NetworkMonitorWorker
 
 
 # ------------------------------------------------------------
@@ -30,9 +52,16 @@ class ComboBoxDelegate(QtWidgets.QStyledItemDelegate):
 # Main Controller
 # ------------------------------------------------------------
 class MainController:
-    def __init__(self, window: QtWidgets.QMainWindow):
+    def __init__(self, window: QtWidgets.QMainWindow, fleet: dict = None):
+        """
+        Args:
+            window: main window built from main_window.ui
+            fleet (dict): {"hosts": [(host, port), ...], "token": str, "tls_ca": str} to manage remote
+                agents instead of this machine (see model/fleet.py)
+        """
         self.window = window
-        self.table = window.findChild(QtWidgets.QTableWidget, "tableNetwork")
+        self.fleet = fleet
+        self.table = window.findChild(QtWidgets.QTreeView, "tableNetwork")
         self.btn_refresh = window.findChild(QtWidgets.QPushButton, "btnRefresh")
         self.btn_deep_scan = window.findChild(QtWidgets.QPushButton, "btnDeepScan")
         self.btn_apply = window.findChild(QtWidgets.QPushButton, "btnApply")
@@ -43,31 +72,91 @@ class MainController:
         if not all([self.btn_refresh, self.btn_deep_scan, self.btn_apply]):
             raise RuntimeError("UI missing one or more control buttons")
 
-        # Drop-down delegate for DHCP/Static column (index 6)
-        self.table.setItemDelegateForColumn(6, ComboBoxDelegate(self.table))
+        # Model + sort proxy; delegates for DHCP/Static drop-down and link LED
+        self.model = InterfaceTableModel(self.table)
+        self.proxy = QtCore.QSortFilterProxyModel(self.table)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(SORT_ROLE)  # rate columns sort by value, not text
+        self.table.setModel(self.proxy)
+        self.table.setItemDelegateForColumn(COL_MODE, ComboBoxDelegate(self.table))
+        self.table.setItemDelegateForColumn(COL_LINK, LedDelegate(self.table))
+        sparkline = SparklineDelegate(self.table)
+        self.table.setItemDelegateForColumn(COL_RX, sparkline)
+        self.table.setItemDelegateForColumn(COL_TX, sparkline)
+        # Adapters with several addresses expand into one child row per address
+        self.table.setRootIsDecorated(True)
+        self.table.expanded.connect(lambda _: fit_columns(self.table))
+        self.table.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.CustomContextMenu)
+        self.table.customContextMenuRequested.connect(self._show_address_menu)
+
+        # Diagnostics: repaint timing plus a dock toggled from View ▸ Diagnostics (Ctrl+Shift+D)
+        self._paint_timer = PaintTimer(self.table)
+        self.diagnostics = DiagnosticsDock(window)
+        window.addDockWidget(QtCore.Qt.DockWidgetArea.RightDockWidgetArea, self.diagnostics)
+        self.diagnostics.hide()
+        toggle = self.diagnostics.toggleViewAction()
+        toggle.setShortcut(QtGui.QKeySequence("Ctrl+Shift+D"))
+        window.menuBar().addMenu("&View").addAction(toggle)
 
         # Editing-pause state
         self._editing = False
         self._resume_timer = None
 
+        # Dirty-row tracking: last scan keyed by connection + user-edited connections
+        self._snapshot = {}
+        self._dirty = set()
+        self._address_ops = {}  # {connection: {"add": [...], "remove": [...]}} queued for Apply
+        self._apply_worker = None
+        self._apply_skipped = []
+        self._deep_worker = None
+        self._refresh_requested = False
+        self._table_behind = False  # diffs arrived while the table was frozen for editing
+        self._from_cache = False  # the table shows cached rows until the first live scan
+
         # Connect edit detection
-        self.table.itemSelectionChanged.connect(self._pause_for_editing)
-        self.table.cellClicked.connect(self._pause_for_editing)
-        self.table.cellActivated.connect(self._pause_for_editing)
-        self.table.itemChanged.connect(self._pause_for_editing)
+        self.table.selectionModel().selectionChanged.connect(self._pause_for_editing)
+        self.table.clicked.connect(self._pause_for_editing)
+        self.table.activated.connect(self._pause_for_editing)
+        self.model.edited.connect(self._on_cell_edited)
 
         # Start background worker
-        self.worker = NetworkMonitorWorker(interval=10)
+        if fleet:
+            self.worker = FleetMonitorWorker(fleet["hosts"], token=fleet.get("token"), tls_ca=fleet.get("tls_ca"))
+            self.btn_deep_scan.setEnabled(False)
+            self.btn_deep_scan.setToolTip("Deep scan is only available for the local machine")
+            window.setWindowTitle(f"{window.windowTitle()} — Fleet ({len(fleet['hosts'])} hosts)")
+            self.throughput = None
+            self.probes = None
+            for col in RATE_COLUMNS:  # counters are only sampled locally
+                self.table.setColumnHidden(col, True)
+        else:
+            self.worker = NetworkMonitorWorker(interval=10)
+            # Live rates on a 1 s cadence, independent of the (adaptive) scan interval
+            self.throughput = ThroughputWorker(interval=1.0)
+            self.throughput.rates_signal.connect(self._on_rates)
+            self.throughput.start()
+            # Gateway / upstream probes decide Internet vs Network and add RTT and loss
+            self.probes = ProbeWorker(interval=10.0)
+            self.probes.probe_signal.connect(self.model.update_probes)
+            self.probes.start()
         self.worker.update_signal.connect(self._on_background_update)
         self.worker.start()
 
         # Button bindings
-        self.btn_refresh.clicked.connect(self.manual_refresh)
+        self.btn_refresh.clicked.connect(self.request_refresh)
         self.btn_deep_scan.clicked.connect(self.handle_deep_scan)
         self.btn_apply.clicked.connect(self.apply_changes)
 
-        # Initial load
-        self.manual_refresh()
+        # Initial load: the worker's first scan fills the table, so the window shows immediately.
+        # Until then, show the last scan from the cache (greyed out as stale).
+        self._refresh_requested = True
+        cached = [] if fleet else get_scan_cache().load("fast")
+        if cached:
+            self._populate_table_rows(cached)
+            self._from_cache = True
+            self.status_bar.showMessage(f"Showing {len(cached)} cached adapters — refreshing...")
+        else:
+            self.status_bar.showMessage("Loading adapters...")
 
     # ------------------------------------------------------------
     # Editing-pause logic
@@ -84,151 +173,262 @@ class MainController:
         self._resume_timer.start(10000)  # 10 s delay
 
     def _resume_updates(self):
+        if self._apply_worker is not None:
+            return  # stay paused until the running apply reports back
         self._editing = False
         self.status_bar.showMessage("Background updates resumed", 2000)
 
+    def _on_cell_edited(self, connection):
+        self._dirty.add(connection)
+        self._pause_for_editing()
+
+    # ------------------------------------------------------------
+    # Address add / remove (context menu)
+    # ------------------------------------------------------------
+    def _show_address_menu(self, pos):
+        index = self.table.indexAt(pos)
+        if not index.isValid():
+            return
+        # Sorting reorders address rows in the proxy; the source model keeps the primary first
+        source = self.proxy.mapToSource(index)
+        connection, address, origin = self.model.address_at(source)
+        menu = QtWidgets.QMenu(self.table)
+        menu.addAction("Add address…", lambda: self._add_address(connection))
+        remove = menu.addAction("Remove address", lambda: self._queue_address(connection, "remove", address))
+        # Only extra manual addresses are ours to remove; the primary is edited in the adapter row
+        remove.setEnabled(address is not None and source.row() > 0 and origin in ("Manual", "—"))
+        menu.exec(self.table.viewport().mapToGlobal(pos))
+
+    def _add_address(self, connection):
+        self._pause_for_editing()
+        text, ok = QtWidgets.QInputDialog.getText(
+            self.window, "Add address", f"IPv4 or IPv6 address with prefix for {connection}\n(e.g. 2001:db8::10/64):")
+        if not ok or not text.strip():
+            return
+        try:
+            normalize_addresses([text])
+        except ApplyError as e:
+            QtWidgets.QMessageBox.warning(self.window, "Add address", str(e))
+            return
+        self._queue_address(connection, "add", text.strip())
+
+    def _queue_address(self, connection, op, address):
+        ops = self._address_ops.setdefault(connection, {"add": [], "remove": []})
+        other = ops["remove" if op == "add" else "add"]
+        if address in other:
+            other.remove(address)  # undoes a queued opposite operation
+        elif address not in ops[op]:
+            ops[op].append(address)
+        self._dirty.add(connection)
+        self._pause_for_editing()
+        verb = "added" if op == "add" else "removed"
+        self.status_bar.showMessage(f"{connection}: {address} will be {verb} on Apply")
+
     # ------------------------------------------------------------
     # Refresh & update handling
     # ------------------------------------------------------------
-    def manual_refresh(self):
+    def request_refresh(self):
+        """Ask the monitor worker for an immediate scan (non-blocking)."""
+        self._refresh_requested = True
         self.status_bar.showMessage("Refreshing adapter list...")
-        QtWidgets.QApplication.setOverrideCursor(QtGui.QCursor(QtCore.Qt.CursorShape.WaitCursor))
-        try:
-            interfaces = get_network_interfaces()
-            self._populate_table_rows(interfaces)
-            self.status_bar.showMessage(f"Loaded {len(interfaces)} adapters.", 3000)
-        except Exception as e:
-            self.status_bar.showMessage(f"Error: {e}")
-        finally:
-            QtWidgets.QApplication.restoreOverrideCursor()
-
-    def _on_background_update(self, interfaces):
-        if self._editing:
+        self.worker.refresh_now()
+
+    def _on_background_update(self, diff):
+        if self._from_cache:
+            # The worker's first diff is a full scan: it replaces the cached rows wholesale
+            self._from_cache = False
+            self._snapshot = {}
+            self._table_behind = True
+        # The snapshot always tracks the worker, even while the table is frozen
+        apply_diff(self._snapshot, diff)
+        if self.probes is not None:
+            self.probes.set_interfaces(self._snapshot.values())
+        if self._editing and not self._refresh_requested:
+            self._table_behind = self._table_behind or not is_empty(diff)
             return
-        self._populate_table_rows(interfaces)
-        self.status_bar.showMessage("Background refresh complete", 2000)
+
+        if self._table_behind:
+            self._populate_table_rows(list(self._snapshot.values()))
+        else:
+            self._apply_table_diff(diff)
+
+        if self._refresh_requested:
+            self._refresh_requested = False
+            self.status_bar.showMessage(f"Loaded {len(self._snapshot)} adapters.", 3000)
+        else:
+            self.status_bar.showMessage("Background refresh complete", 2000)
+
+    @instrumentation.timed("table.rates")
+    def _on_rates(self, rates):
+        # Rate cells are never edited, so they keep updating while the table is frozen
+        self.model.update_rates(rates)
 
     # ------------------------------------------------------------
     def handle_deep_scan(self):
+        if self._deep_worker is not None:
+            # Join the scan already in flight rather than starting another
+            self.status_bar.showMessage("Deep scan already running — results will appear when it finishes...")
+            return
+
         self.status_bar.showMessage("Performing deep PowerShell scan...")
-        QtWidgets.QApplication.setOverrideCursor(QtGui.QCursor(QtCore.Qt.CursorShape.WaitCursor))
-        QtWidgets.QApplication.processEvents()
-        try:
-            self.worker.stop()
-            interfaces = get_network_interfaces_deep()
-            self._populate_table_rows(interfaces)
+        QtWidgets.QApplication.setOverrideCursor(QtGui.QCursor(QtCore.Qt.CursorShape.BusyCursor))
+        self.worker.pause()
+
+        self._deep_worker = DeepScanWorker()
+        self._deep_worker.progress_signal.connect(self.status_bar.showMessage)
+        self._deep_worker.result_signal.connect(self._on_deep_scan_result)
+        self._deep_worker.cancelled_signal.connect(lambda: self.status_bar.showMessage("Deep scan cancelled.", 4000))
+        self._deep_worker.error_signal.connect(
+            lambda message: self.status_bar.showMessage(f"Deep scan failed: {message}", 8000))
+        self._deep_worker.finished.connect(self._on_deep_scan_finished)
+        self._deep_worker.start()
+
+    def cancel_deep_scan(self):
+        if self._deep_worker is not None:
+            self._deep_worker.cancel()
+
+    def _on_deep_scan_result(self, interfaces):
+        report = get_last_deep_report()
+        status, targets = report.get("status", "ok"), report.get("targets")
+        if status.startswith("error") and [i["connection"] for i in interfaces] == ["Error"]:
+            # Nothing known at all: keep whatever the table shows rather than an Error row
+            self.status_bar.showMessage(f"Deep scan failed: {interfaces[0]['description']}", 8000)
+            return
+        # Only rows the deep scan changed are touched; rows the user is editing keep their edits
+        diff = diff_records(
+            {key: to_record(iface) for key, iface in self._snapshot.items()},
+            {iface["connection"]: to_record(iface) for iface in interfaces},
+        )
+        apply_diff(self._snapshot, diff)
+        self._apply_table_diff(diff, keep_edits=True)
+        if status == "skipped":
+            self.status_bar.showMessage("Deep scan: every field is fresh and consistent; nothing to query.", 5000)
+        elif status != "ok":
+            self.status_bar.showMessage(
+                f"PowerShell unavailable — showing {len(interfaces)} adapters from the last known values.", 8000)
+        elif targets is not None:
+            fields = sum(len(f) for f in targets.values())
+            self.status_bar.showMessage(
+                f"Deep scan refreshed {fields} field(s) on {len(targets)} adapter(s).", 5000)
+        else:
             self.status_bar.showMessage(f"Deep scan loaded {len(interfaces)} adapters.", 5000)
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self.window, "Deep Scan Error", str(e))
-            self.status_bar.showMessage("Deep scan failed.", 4000)
-        finally:
-            QtWidgets.QApplication.restoreOverrideCursor()
-            self.worker = NetworkMonitorWorker(interval=10)
-            self.worker.update_signal.connect(self._on_background_update)
-            self.worker.start()
+
+    def _on_deep_scan_finished(self):
+        self._deep_worker.wait()
+        self._deep_worker = None
+        QtWidgets.QApplication.restoreOverrideCursor()
+        self.worker.resume()
+
+    def shutdown(self):
+        """Stop all background work (connected to QApplication.aboutToQuit)."""
+        if self._deep_worker is not None:
+            self._deep_worker.cancel()
+            self._deep_worker.wait()
+        if self._apply_worker is not None:
+            self._apply_worker.wait()
+        for worker in (self.throughput, self.probes):
+            if worker is not None:
+                worker.stop()
+        self.worker.stop()
 
     # ------------------------------------------------------------
     # Apply-Changes logic
     # ------------------------------------------------------------
     def apply_changes(self):
-        self.status_bar.showMessage("Applying changes...")
+        if self._apply_worker is not None:
+            self.status_bar.showMessage("Apply already in progress...")
+            return
         if self._resume_timer:
             self._resume_timer.stop()
-        self._editing = False
 
-        rows = self.table.rowCount()
-        results = []
-
-        for r in range(rows):
-            connection = self._get_text(r, 0)
-            ip = self._get_text(r, 3)
-            subnet = self._get_text(r, 4)
-            gateway = self._get_text(r, 5)
-            mode = self._get_text(r, 6)
+        edited = {}
+        skipped = []
+        for connection in self.model.connections():
+            if connection not in self._dirty:
+                continue
+            values = self.model.values(connection)
 
             # Validate static entries
-            if mode.upper() == "STATIC" and not validate_ip_structure(ip):
-                results.append(f"{connection}: Invalid IP '{ip}' — skipped")
+            if values["mode"].upper() == "STATIC" and not validate_ip_structure(values["ip"]):
+                skipped.append(f"{connection}: Invalid IP '{values['ip']}' — skipped")
                 continue
+            edited[connection] = values
+
+        changes = diff_changes(edited, self._snapshot, self._address_ops)
+        if not changes:
+            self._dirty.clear()
+            if skipped:
+                QtWidgets.QMessageBox.information(self.window, "Apply Results", "\n\n".join(skipped))
+            self._editing = False
+            self.status_bar.showMessage("No changes to apply.", 3000)
+            return
 
-            res = apply_nic_settings(connection, ip, subnet, gateway, mode)
-            status = "OK" if res["success"] else "FAILED"
-            results.append(f"{connection}: {status}\n{res['stderr'] or res['stdout']}")
+        # Keep background refreshes off the table until the batch finishes
+        self._editing = True
+        self._apply_skipped = skipped
+        self.btn_apply.setEnabled(False)
+        self.status_bar.showMessage(f"Applying changes to {len(changes)} adapter(s)...")
 
-        msg = "\n\n".join(results)
-        QtWidgets.QMessageBox.information(self.window, "Apply Results", msg)
+        if self.fleet:
+            self._apply_worker = FleetApplyWorker(changes, self.fleet["hosts"], token=self.fleet.get("token"),
+                                                  tls_ca=self.fleet.get("tls_ca"))
+        else:
+            self._apply_worker = ApplyWorker(changes)
+        self._apply_worker.progress_signal.connect(self.status_bar.showMessage)
+        self._apply_worker.result_signal.connect(self._on_apply_result)
+        self._apply_worker.done_signal.connect(self._on_apply_done)
+        self._apply_worker.start()
+
+    @staticmethod
+    def _apply_status(res):
+        if res["success"]:
+            return "OK"
+        return "ROLLED BACK" if res.get("rolled_back") else "FAILED"
+
+    def _on_apply_result(self, res):
+        status = self._apply_status(res)
+        self.status_bar.showMessage(f"{res['connection']}: {status}")
+        if res["success"]:
+            self._dirty.discard(res["connection"])
+            self._address_ops.pop(res["connection"], None)
+
+    def _on_apply_done(self, results):
+        self._apply_worker.wait()
+        self._apply_worker = None
+        self.btn_apply.setEnabled(True)
+
+        lines = list(self._apply_skipped)
+        for res in results:
+            status = self._apply_status(res)
+            lines.append(f"{res['connection']}: {status}\n{res['stderr'] or res['stdout']}")
+        QtWidgets.QMessageBox.information(self.window, "Apply Results", "\n\n".join(lines))
         self._resume_updates()
 
     # ------------------------------------------------------------
     # Table population helpers
     # ------------------------------------------------------------
+    @instrumentation.timed("table.populate")
     def _populate_table_rows(self, interfaces):
-        self.table.setRowCount(0)
-        for row, iface in enumerate(interfaces):
-            self.table.insertRow(row)
-            self._set_readonly(row, 0, iface["connection"])
-            self._set_readonly(row, 1, self._get_link_status_text(iface))
-            self._add_link_led(row, 1)
-            mode_item = QtWidgets.QTableWidgetItem(iface["mode"])
-            mode_item.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 2, mode_item)
-            self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(iface["ip"]))       # IP
-            self.table.setItem(row, 4, QtWidgets.QTableWidgetItem(iface["subnet"]))   # Subnet
-            self.table.setItem(row, 5, QtWidgets.QTableWidgetItem(iface["gateway"]))  # Gateway
-            self._set_readonly(row, 6, iface["description"])                          # Description
-        self.table.resizeColumnsToContents()
-
-    def _get_text(self, row, col):
-        item = self.table.item(row, col)
-        return item.text().strip() if item else ""
-
-    def _set_readonly(self, row, col, text):
-        item = QtWidgets.QTableWidgetItem(text)
-        item.setFlags(item.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
-        self.table.setItem(row, col, item)
-
-    # ------------------------------------------------------------
-    # LED Indicator (adds color next to text)
-    # ------------------------------------------------------------
-    def _add_link_led(self, row, col):
-        """
-        Inline LED (colored circle) inside the same text string.
-        Colors:
-            Red   = Down
-            Green = Network
-            Blue  = Internet
+        if self.model.update(interfaces, force=self._dirty):
+            fit_columns(self.table)
+        self._snapshot = {iface["connection"]: iface for iface in interfaces}
+        self._dirty.clear()
+        self._address_ops.clear()
+        self._table_behind = False
+
+    @instrumentation.timed("table.diff")
+    def _apply_table_diff(self, diff, keep_edits: bool = False):
         """
-        item = self.table.item(row, col)
-        if not item:
-            return
-
-        text = item.text().strip()
-        lower = text.lower()
+        Update only the rows named in a snapshot diff.
 
-        if lower == "down":
-            color = "#E53935"  # Red
-        elif lower == "internet":
-            color = "#1E90FF"  # Blue
-        else:
-            color = "#32CD32"  # Green (Network)
-
-        # Unicode circle + color
-        html = f"<span style='color:{color}; font-size:12pt;'>●</span>  <span>{text}</span>"
-
-        # Set rich text directly on the cell
-        item.setText("")
-        label = QtWidgets.QLabel()
-        label.setTextFormat(QtCore.Qt.TextFormat.RichText)
-        label.setText(html)
-        label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-        self.table.setCellWidget(row, col, label)
-
-    # ------------------------------------------------------------
-    def _get_link_status_text(self, iface):
-        link_state = iface.get("link", "—").lower()
-        gateway = str(iface.get("gateway", "")).strip()
-        if "down" in link_state:
-            return "Down"
-        if gateway in ("—", "", "none", "0.0.0.0"):
-            return "Network"
-        return "Internet"
+        User-edited rows are reset (and queued address operations dropped),
+        unless ``keep_edits`` is set: then they are left as the user left them.
+        """
+        keys = set(diff["added"]) | set(diff["modified"])
+        keys = keys - self._dirty if keep_edits else keys | self._dirty
+        changed = [self._snapshot[key] for key in keys if key in self._snapshot]
+        if self.model.update_rows(diff["removed"], changed):
+            fit_columns(self.table)
+        if not keep_edits:
+            self._dirty.clear()
+            self._address_ops.clear()
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from networkcontrol.model.change_notifier import PollingNotifier
+
+
+class PollScheduler:
+    """
+    Decides when the monitor worker scans next.
+
+    ``wait()`` blocks on the change notifier, so it returns immediately on
+    an OS change, ``request_refresh()``, ``stop()`` or ``set_interval()``.
+    The timeout adapts: each scan that finds nothing new stretches it by
+    ``backoff`` up to ``max_interval``; a scan that finds a change drops it
+    back to ``min_interval``.
+    """
+
+    def __init__(self, notifier=None, interval: float = 10, min_interval: float = None,
+                 max_interval: float = None, backoff: float = 1.5, clock=time.monotonic):
+        self.notifier = notifier or PollingNotifier()
+        self.backoff = backoff
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._refresh = False
+        self._last_poll = None
+        self.last_elapsed = None  # seconds between the two most recent polls
+        self.set_interval(interval, min_interval, max_interval, wake=False)
+
+    # ------------------------------------------------------------
+    def set_interval(self, interval: float, min_interval: float = None, max_interval: float = None, wake=True):
+        """Change the base interval; a blocked ``wait()`` re-arms with the new value."""
+        with self._lock:
+            self.interval = interval
+            self.min_interval = min_interval if min_interval is not None else max(1.0, interval / 4)
+            self.max_interval = max_interval if max_interval is not None else interval * 6
+            self.current = interval
+        if wake:
+            self.notifier.wake()
+
+    def request_refresh(self):
+        with self._lock:
+            self._refresh = True
+        self.notifier.wake()
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+        self.notifier.wake()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    # ------------------------------------------------------------
+    def record_poll(self, changed: bool):
+        """Note that a scan just ran and whether it found anything new."""
+        now = self._clock()
+        with self._lock:
+            if self._last_poll is not None:
+                self.last_elapsed = now - self._last_poll
+            self._last_poll = now
+            if changed:
+                self.current = self.min_interval
+            else:
+                self.current = min(self.current * self.backoff, self.max_interval)
+
+    def wait(self) -> str:
+        """
+        Block until the next scan is due.
+
+        Returns:
+            str: "stop", "refresh", "change" or "timeout"
+        """
+        start = self._clock()
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return "stop"
+                if self._refresh:
+                    self._refresh = False
+                    return "refresh"
+                # Re-read each pass so set_interval() takes effect mid-wait
+                remaining = self.current - (self._clock() - start)
+            if remaining <= 0:
+                return "timeout"
+            if self.notifier.wait_for_change(remaining):
+                return "change"
@@ -0,0 +1,584 @@
+import time
+
+from PyQt6 import QtWidgets, QtGui, QtCore
+
+from networkcontrol.model.addresses import ORIGIN_LABELS, format_prefix, to_address
+from networkcontrol.model.probes import format_probe
+from networkcontrol.model.throughput import (
+    DROP_PS, ERR_PS, RX_BPS, RX_PPS, TX_BPS, TX_PPS, format_bytes_rate, format_count_rate,
+)
+
+# Table columns: scan columns come from row_cells(), rate columns from update_rates()
+COL_CONNECTION, COL_LINK, COL_MODE, COL_IP, COL_SUBNET, COL_GATEWAY, COL_DESCRIPTION = range(7)
+COL_RX, COL_TX, COL_PACKETS, COL_ERRORS, COL_DROPS = range(7, 12)
+SCAN_COLUMNS = 7
+HEADERS = (
+    "Connection", "Link", "DHCP/Static", "IP Address", "Subnet", "Gateway", "Description",
+    "Rx", "Tx", "Packets/s", "Errors/s", "Drops/s",
+)
+RATE_COLUMNS = (COL_RX, COL_TX, COL_PACKETS, COL_ERRORS, COL_DROPS)
+EDITABLE_COLUMNS = {COL_MODE: "mode", COL_IP: "ip", COL_SUBNET: "subnet", COL_GATEWAY: "gateway"}
+# Interface "stale" field names -> the column greyed out for each
+STALE_COLUMNS = {
+    "link": COL_LINK, "mode": COL_MODE, "ip": COL_IP, "subnet": COL_SUBNET,
+    "gateway": COL_GATEWAY, "description": COL_DESCRIPTION,
+}
+STALE_COLOR = "#9E9E9E"
+
+# Custom roles: numeric sort key, and the rate history drawn by SparklineDelegate
+SORT_ROLE = QtCore.Qt.ItemDataRole.UserRole + 1
+HISTORY_ROLE = QtCore.Qt.ItemDataRole.UserRole + 2
+
+LED_COLORS = {
+    "down": "#E53935",      # Red
+    "internet": "#1E90FF",  # Blue
+    "network": "#32CD32",   # Green
+    "isolated": "#FB8C00",  # Orange (up, but neither gateway nor upstream answers)
+    "unreachable": "#9E9E9E",  # Grey (fleet host not answering)
+}
+
+
+# ------------------------------------------------------------
+# Row / diff helpers (pure Python)
+# ------------------------------------------------------------
+def get_link_status_text(iface):
+    link_state = iface.get("link", "—").lower()
+    gateway = str(iface.get("gateway", "")).strip()
+    if "unreachable" in link_state:
+        return "Unreachable"
+    if "down" in link_state:
+        return "Down"
+    if gateway in ("—", "", "none", "0.0.0.0"):
+        return "Network"
+    return "Internet"
+
+
+def row_cells(iface) -> tuple:
+    """Cell texts for one interface, in column order."""
+    return (
+        iface["connection"],
+        get_link_status_text(iface),
+        iface["mode"],
+        iface["ip"],
+        iface["subnet"],
+        iface["gateway"],
+        iface["description"],
+    )
+
+
+def plan_update(current: dict, interfaces, force=()):
+    """
+    Keyed diff of the table contents against a new scan.
+
+    Args:
+        current (dict): {connection: cells tuple} currently shown
+        interfaces (list): New interface dicts
+        force (iterable): Connections to rewrite in full (e.g. user-edited rows)
+
+    Returns:
+        tuple: (removed keys, {key: cells} to insert, {key: [(col, text), ...]} to update)
+    """
+    new_rows = {iface["connection"]: row_cells(iface) for iface in interfaces}
+    force = set(force)
+
+    removed = [key for key in current if key not in new_rows]
+    added = {}
+    updated = {}
+    for key, cells in new_rows.items():
+        old = current.get(key)
+        if old is None:
+            added[key] = cells
+        elif key in force:
+            updated[key] = list(enumerate(cells))
+        elif old != cells:
+            updated[key] = [(col, text) for col, text in enumerate(cells) if old[col] != text]
+    return removed, added, updated
+
+
+def child_cells(iface) -> tuple:
+    """
+    Cell tuples for an adapter's address rows, or () when it has at most one address.
+
+    Child rows reuse the scan columns: family under Connection, origin
+    under DHCP/Static, then address and prefix under IP Address and Subnet.
+    """
+    records = [to_address(a) for a in iface.get("addresses", ())]
+    if len(records) < 2:
+        return ()
+    return tuple(
+        (
+            "IPv4" if record.family == "ipv4" else "IPv6",
+            "",
+            ORIGIN_LABELS.get(record.origin, record.origin),
+            record.address,
+            format_prefix(record),
+            "",
+            "",
+        )
+        for record in records
+    )
+
+
+def stale_state(iface):
+    """
+    (greyed-out columns, tooltip) for one interface, or None if it is fully live.
+
+    Rows from the scan cache carry "cached_at"; rows of a live scan list
+    the fields no source refreshed recently, and "sources" names where
+    each field's value came from.
+    """
+    columns = frozenset(STALE_COLUMNS[f] for f in iface.get("stale", ()) if f in STALE_COLUMNS)
+    if not columns:
+        return None
+    if iface.get("cached_at"):
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(iface["cached_at"]))
+        return columns, f"Cached from {when}; waiting for a live scan"
+    text = "Not refreshed by the last scan; showing the last known value"
+    origins = [s.replace(":", " from ") for s in iface.get("sources", ()) if s.partition(":")[0] in iface["stale"]]
+    if origins:
+        text += " (" + ", ".join(origins) + ")"
+    return columns, text
+
+
+def column_signature(rows) -> tuple:
+    """Longest text per scan column; column widths only need recomputing when this changes."""
+    if not rows:
+        return ()
+    return tuple(max(len(cells[col]) for cells in rows) for col in range(SCAN_COLUMNS))
+
+
+def rate_cells(rates) -> tuple:
+    """Rate column texts and sort values for one ``ThroughputMonitor.rates()`` tuple."""
+    values = (
+        rates[RX_BPS],
+        rates[TX_BPS],
+        rates[RX_PPS] + rates[TX_PPS],
+        rates[ERR_PS],
+        rates[DROP_PS],
+    )
+    texts = (
+        format_bytes_rate(values[0]),
+        format_bytes_rate(values[1]),
+        format_count_rate(values[2]),
+        format_count_rate(values[3]),
+        format_count_rate(values[4]),
+    )
+    return texts, values
+
+
+def fit_columns(view):
+    """Size every visible column to its contents (QTreeView has no resizeColumnsToContents)."""
+    for col in range(view.model().columnCount()):
+        if not view.isColumnHidden(col):
+            view.resizeColumnToContents(col)
+
+
+# ------------------------------------------------------------
+# Table model
+# ------------------------------------------------------------
+class InterfaceTableModel(QtCore.QAbstractItemModel):
+    """
+    Adapter table backed by a flat list of cell tuples, one per adapter,
+    with the adapter's addresses as child rows when it has more than one.
+
+    ``update()`` applies a scan as a keyed diff on the connection name and
+    emits row inserts/removals and one ``dataChanged`` per modified row, so
+    views only repaint what changed. Child rows are diffed the same way
+    under their adapter and are read-only.
+
+    Address-row indexes point at their adapter's token, a ``(connection,)``
+    tuple kept for the model's lifetime so the pointer never dangles;
+    adapter-row indexes point at nothing.
+
+    Rate columns are kept apart from the scan cells and are refreshed by
+    ``update_rates()``, which only ever signals the rate columns. Probe
+    results from ``update_probes()`` replace the Link column's
+    gateway-based guess while the scan says the adapter is up. Cells of
+    fields listed in an interface's "stale" entry are greyed out, with a
+    tooltip saying why (see ``stale_state()``).
+
+    Emits:
+        edited (str): Connection whose editable cell was changed by the user
+    """
+    edited = QtCore.pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []   # [cells tuple, ...]
+        self._index = {}  # {connection: row}
+        self._children = {}  # {connection: (child cells tuple, ...)}
+        self._tokens = {}  # {connection: (connection,)} internal pointer of its child rows
+        self._stale = {}  # {connection: (columns, tooltip)} for rows with stale fields
+        self._rates = {}  # {connection: (texts, values, rx history, tx history)}
+        self._probes = {}  # {connection: link text from the latest probe}
+        self._signature = ()
+
+    # -- Qt model interface ---------------------------------------
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column)
+        return self.createIndex(row, column, self._tokens[self._rows[parent.row()][COL_CONNECTION]])
+
+    def parent(self, index=None):
+        if index is None:  # QObject.parent()
+            return QtCore.QObject.parent(self)
+        connection = self._parent_key(index)
+        if connection is None or connection not in self._index:
+            return QtCore.QModelIndex()
+        return self.createIndex(self._index[connection], 0)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self._rows)
+        if self._parent_key(parent) is not None or parent.column() != 0:
+            return 0
+        return len(self._children.get(self._rows[parent.row()][COL_CONNECTION], ()))
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return len(HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if role == QtCore.Qt.ItemDataRole.DisplayRole and orientation == QtCore.Qt.Orientation.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        col = index.column()
+        if self._parent_key(index) is not None:
+            return self._child_data(index, role)
+        if col >= SCAN_COLUMNS:
+            return self._rate_data(index.row(), col, role)
+        if role in (QtCore.Qt.ItemDataRole.DisplayRole, QtCore.Qt.ItemDataRole.EditRole, SORT_ROLE):
+            cells = self._rows[index.row()]
+            if col == COL_LINK and cells[COL_LINK] not in ("Down", "Unreachable"):
+                return self._probes.get(cells[COL_CONNECTION], cells[COL_LINK])
+            return cells[col]
+        if role == QtCore.Qt.ItemDataRole.TextAlignmentRole and col in (COL_LINK, COL_MODE):
+            return QtCore.Qt.AlignmentFlag.AlignCenter
+        if role in (QtCore.Qt.ItemDataRole.ForegroundRole, QtCore.Qt.ItemDataRole.ToolTipRole):
+            stale = self._stale.get(self._rows[index.row()][COL_CONNECTION])
+            if stale is not None and col in stale[0]:
+                if role == QtCore.Qt.ItemDataRole.ToolTipRole:
+                    return stale[1]
+                return QtGui.QColor(STALE_COLOR)
+        return None
+
+    @staticmethod
+    def _parent_key(index):
+        """Connection of an address row's adapter; None for adapter rows."""
+        token = index.internalPointer() if index.isValid() else None
+        return token[0] if token is not None else None
+
+    def _child_data(self, index, role):
+        col = index.column()
+        if role in (QtCore.Qt.ItemDataRole.DisplayRole, SORT_ROLE):
+            if col >= SCAN_COLUMNS:
+                return ""
+            return self._children[self._parent_key(index)][index.row()][col]
+        if role == QtCore.Qt.ItemDataRole.TextAlignmentRole and col in (COL_LINK, COL_MODE):
+            return QtCore.Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def _rate_data(self, row, col, role):
+        entry = self._rates.get(self._rows[row][COL_CONNECTION])
+        offset = col - SCAN_COLUMNS
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return entry[0][offset] if entry else "—"
+        if role == SORT_ROLE:
+            return entry[1][offset] if entry else -1.0
+        if role == HISTORY_ROLE and col in (COL_RX, COL_TX):
+            return entry[2 + offset] if entry else ()
+        if role == QtCore.Qt.ItemDataRole.TextAlignmentRole:
+            return QtCore.Qt.AlignmentFlag.AlignRight | QtCore.Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() in EDITABLE_COLUMNS and self._parent_key(index) is None:
+            flags |= QtCore.Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=QtCore.Qt.ItemDataRole.EditRole):
+        if (role != QtCore.Qt.ItemDataRole.EditRole or index.column() not in EDITABLE_COLUMNS
+                or self._parent_key(index) is not None):
+            return False
+        row, col = index.row(), index.column()
+        cells = self._rows[row]
+        text = str(value).strip()
+        if cells[col] == text:
+            return False
+        self._rows[row] = cells[:col] + (text,) + cells[col + 1:]
+        self.dataChanged.emit(index, index, [role])
+        self.edited.emit(cells[COL_CONNECTION])
+        return True
+
+    # -- Scan updates ---------------------------------------------
+    def update(self, interfaces, force=()) -> bool:
+        """
+        Apply a scan incrementally.
+
+        Returns:
+            bool: True if column widths may need recomputing
+        """
+        current = {cells[COL_CONNECTION]: cells for cells in self._rows}
+        children = {iface["connection"]: child_cells(iface) for iface in interfaces}
+        resize = self._apply_plan(*plan_update(current, interfaces, force), children)
+        self._update_stale(interfaces)
+        return resize
+
+    def update_rows(self, removed, changed) -> bool:
+        """
+        Apply a partial update: drop ``removed`` connections and insert or
+        refresh the interface dicts in ``changed``. Untouched rows cost nothing.
+
+        Returns:
+            bool: True if column widths may need recomputing
+        """
+        current = {}
+        for iface in changed:
+            row = self._index.get(iface["connection"])
+            if row is not None:
+                current[iface["connection"]] = self._rows[row]
+        _, added, updated = plan_update(current, changed)
+        children = {iface["connection"]: child_cells(iface) for iface in changed}
+        resize = self._apply_plan([key for key in removed if key in self._index], added, updated, children)
+        self._update_stale(changed)
+        return resize
+
+    def _apply_plan(self, removed, added, updated, children) -> bool:
+        if removed:
+            # Remove contiguous runs bottom-up so earlier indexes stay valid
+            rows = sorted(self._index[key] for key in removed)
+            while rows:
+                last = first = rows.pop()
+                while rows and rows[-1] == first - 1:
+                    first = rows.pop()
+                self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+                del self._rows[first:last + 1]
+                self.endRemoveRows()
+            for key in removed:
+                self._children.pop(key, None)
+            self._reindex()
+
+        for key, changes in updated.items():
+            row = self._index[key]
+            cells = list(self._rows[row])
+            for col, text in changes:
+                cells[col] = text
+            self._rows[row] = tuple(cells)
+            cols = [col for col, _ in changes]
+            self.dataChanged.emit(self.index(row, min(cols)), self.index(row, max(cols)))
+
+        if added:
+            first = len(self._rows)
+            for key in added:
+                self._tokens.setdefault(key, (key,))
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(added) - 1)
+            self._rows.extend(added.values())
+            for key in added:
+                self._children[key] = children.get(key, ())
+            self._reindex()
+            self.endInsertRows()
+
+        for key, rows in children.items():
+            if key not in added and key in self._index:
+                self._update_children(key, rows)
+
+        signature = column_signature(self._rows)
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return True
+
+    def _update_stale(self, interfaces):
+        """Record which cells of ``interfaces`` are stale; repaint the rows whose state changed."""
+        for key in [key for key in self._stale if key not in self._index]:
+            del self._stale[key]
+        for iface in interfaces:
+            key = iface["connection"]
+            state = stale_state(iface)
+            if self._stale.get(key) == state:
+                continue
+            if state is None:
+                del self._stale[key]
+            else:
+                self._stale[key] = state
+            row = self._index[key]
+            self.dataChanged.emit(self.index(row, 0), self.index(row, SCAN_COLUMNS - 1))
+
+    def _update_children(self, key, rows):
+        """Replace one adapter's address rows, signalling only the rows that changed."""
+        old = self._children.get(key, ())
+        if old == rows:
+            return
+        parent = self.index(self._index[key], 0)
+        if len(rows) < len(old):
+            self.beginRemoveRows(parent, len(rows), len(old) - 1)
+            self._children[key] = old[:len(rows)]
+            self.endRemoveRows()
+        changed = [row for row in range(min(len(old), len(rows))) if old[row] != rows[row]]
+        if len(rows) > len(old):
+            self.beginInsertRows(parent, len(old), len(rows) - 1)
+            self._children[key] = old + rows[len(old):]
+            self.endInsertRows()
+        self._children[key] = rows
+        if changed:
+            self.dataChanged.emit(self.index(changed[0], 0, parent),
+                                  self.index(changed[-1], SCAN_COLUMNS - 1, parent))
+
+    # -- Rate updates ---------------------------------------------
+    def update_rates(self, rates: dict):
+        """
+        Refresh the rate columns from a ``ThroughputMonitor.snapshot()``.
+
+        Only rows whose rates changed are signalled, and only across the
+        rate columns, so scan cells never repaint for a throughput tick.
+        """
+        changed = []
+        for connection, sample in rates.items():
+            if connection not in self._index:
+                continue
+            texts, values = rate_cells(sample["rates"])
+            entry = (texts, values, sample["rx"], sample["tx"])
+            if self._rates.get(connection) != entry:
+                self._rates[connection] = entry
+                changed.append(self._index[connection])
+
+        for connection in [c for c in self._rates if c not in self._index]:
+            del self._rates[connection]
+
+        for row in changed:
+            self.dataChanged.emit(self.index(row, RATE_COLUMNS[0]), self.index(row, RATE_COLUMNS[-1]))
+
+    def update_probes(self, results: dict):
+        """
+        Show connectivity probe results (``ProbeEngine.check_all()``) in the Link column.
+
+        Adapters missing from ``results`` fall back to the scan's own link text.
+        """
+        probes = {key: format_probe(result) for key, result in results.items() if key in self._index}
+        changed = {key for key in set(probes) | set(self._probes) if probes.get(key) != self._probes.get(key)}
+        self._probes = probes
+        for key in changed:
+            row = self._index.get(key)
+            if row is not None:
+                index = self.index(row, COL_LINK)
+                self.dataChanged.emit(index, index)
+
+    def address_at(self, index):
+        """
+        (connection, "address/prefix" or None, origin label) for a model index.
+
+        The address is None on an adapter row; the origin is "" there.
+        """
+        key = self._parent_key(index)
+        if key is None:
+            return self._rows[index.row()][COL_CONNECTION], None, ""
+        cells = self._children[key][index.row()]
+        address = cells[COL_IP].partition("%")[0]
+        prefix = cells[COL_SUBNET].lstrip("/")
+        return key, (address if prefix == "—" else f"{address}/{prefix}"), cells[COL_MODE]
+
+    def values(self, connection) -> dict:
+        """Current editable values of one row, keyed by field name."""
+        cells = self._rows[self._index[connection]]
+        return {field: cells[col] for col, field in EDITABLE_COLUMNS.items()}
+
+    def connections(self):
+        return list(self._index)
+
+    def _reindex(self):
+        self._index = {cells[COL_CONNECTION]: row for row, cells in enumerate(self._rows)}
+
+
+# ------------------------------------------------------------
+# LED delegate for the link column
+# ------------------------------------------------------------
+class LedDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Paints a colored circle next to the link text, chosen by its first word.
+    Colors:
+        Red    = Down
+        Green  = Network
+        Blue   = Internet
+        Orange = Isolated
+        Grey   = Unreachable
+    """
+    SPACING = 6
+
+    def paint(self, painter, option, index):
+        opt = QtWidgets.QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        text = opt.text
+        if not text:  # address rows have no link status
+            super().paint(painter, option, index)
+            return
+        opt.text = ""
+
+        # Background, selection and focus as for a normal cell
+        style = opt.widget.style() if opt.widget else QtWidgets.QApplication.style()
+        style.drawControl(QtWidgets.QStyle.ControlElement.CE_ItemViewItem, opt, painter, opt.widget)
+
+        metrics = opt.fontMetrics
+        diameter = metrics.height() * 0.6
+        text_width = metrics.horizontalAdvance(text)
+        rect = QtCore.QRectF(opt.rect)
+        x = rect.center().x() - (diameter + self.SPACING + text_width) / 2
+        color = LED_COLORS.get(text.split(" ", 1)[0].lower(), LED_COLORS["network"])
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        painter.setPen(QtCore.Qt.PenStyle.NoPen)
+        painter.setBrush(QtGui.QColor(color))
+        painter.drawEllipse(QtCore.QRectF(x, rect.center().y() - diameter / 2, diameter, diameter))
+        painter.setPen(opt.palette.color(QtGui.QPalette.ColorRole.Text))
+        text_rect = QtCore.QRectF(x + diameter + self.SPACING, rect.top(), text_width + 1, rect.height())
+        painter.drawText(text_rect, QtCore.Qt.AlignmentFlag.AlignVCenter | QtCore.Qt.AlignmentFlag.AlignLeft, text)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        extra = int(option.fontMetrics.height() * 0.6) + self.SPACING
+        return QtCore.QSize(size.width() + extra, size.height())
+
+
+# ------------------------------------------------------------
+# Sparkline delegate for the Rx / Tx columns
+# ------------------------------------------------------------
+class SparklineDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Draws the rate history (``HISTORY_ROLE``) as a small line chart under
+    the rate text, scaled to the largest value in the window.
+    """
+    WIDTH = 72
+    COLORS = {COL_RX: "#1E90FF", COL_TX: "#FB8C00"}
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        history = index.data(HISTORY_ROLE)
+        if not history or len(history) < 2:
+            return
+        peak = max(history) or 1.0
+
+        rect = QtCore.QRectF(option.rect).adjusted(3, 3, -3, -3)
+        width = min(self.WIDTH, rect.width() / 2)
+        step = width / (len(history) - 1)
+        points = [
+            QtCore.QPointF(rect.left() + i * step, rect.bottom() - value / peak * rect.height())
+            for i, value in enumerate(history)
+        ]
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        painter.setPen(QtGui.QPen(QtGui.QColor(self.COLORS.get(index.column(), "#1E90FF")), 1.2))
+        painter.drawPolyline(QtGui.QPolygonF(points))
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        return QtCore.QSize(max(size.width(), option.fontMetrics.horizontalAdvance("0000.0 MB/s") + self.WIDTH + 12),
+                            size.height())
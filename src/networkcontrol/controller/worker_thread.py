@@ -1,34 +1,423 @@
+import asyncio
+import threading
+import time
+
 from PyQt6 import QtCore
-from networkcontrol.model.network_model import get_network_interfaces
+from networkcontrol.model.network_model import get_network_interfaces, get_network_interfaces_deep
+from networkcontrol.model.network_apply import iter_apply_results
+from networkcontrol.model.powershell_pool import CommandCancelled
+from networkcontrol.model.backends import get_backend
+from networkcontrol.model.throughput import HISTORY, ThroughputMonitor
+from networkcontrol.model.probes import ProbeEngine, probe_gateway, probe_source
+from networkcontrol.model.change_notifier import create_notifier
+from networkcontrol.model.snapshot_store import SnapshotStore, is_empty
+from networkcontrol.model.fleet import FleetPool, fleet_apply_results, fleet_key, fleet_rows
+from networkcontrol.controller.poll_scheduler import PollScheduler
 
 
 class NetworkMonitorWorker(QtCore.QThread):
     """
-    Background thread that periodically polls network interface data.
+    Background thread that rescans network interfaces when they change.
+
+    Scans are triggered by OS change notifications (see ``change_notifier``),
+    ``refresh_now()``, or the adaptive timer in ``PollScheduler``.
+    ``interval`` is the polling period when no notification backend is
+    available; with one, a safety rescan still runs every ``fallback_interval``.
+    All waits are interruptible, so ``stop()`` returns as soon as any
+    in-progress scan finishes.
+
+    Each scan is pushed into ``store`` and only its diff against the
+    previous scan is emitted (see ``snapshot_store``). Unchanged scans are
+    not emitted unless a refresh was requested (the first scan always is).
 
     Emits:
-        update_signal (list): List of interface dictionaries
+        update_signal (dict): Snapshot diff (added / removed / modified)
+        poll_signal (dict): {"reason", "elapsed", "next_interval"} after each scan
     """
-    update_signal = QtCore.pyqtSignal(list)
+    update_signal = QtCore.pyqtSignal(object)
+    poll_signal = QtCore.pyqtSignal(dict)
 
-    def __init__(self, interval: int = 10):
+    def __init__(self, interval: int = 10, fallback_interval: int = 60, notifier=None):
         super().__init__()
         self.interval = interval  # seconds
-        self._running = True
+        self.fallback_interval = fallback_interval  # seconds
+        self.notifier = notifier or create_notifier()
+        self.scheduler = PollScheduler(self.notifier, interval=self._base_interval())
+        self.store = SnapshotStore()
+        self._paused = False
+
+    def _base_interval(self):
+        if self.notifier.polling:
+            return self.interval
+        return max(self.interval, self.fallback_interval)
+
+    def run(self):
+        """Scan, emit, then block until the scheduler says the next scan is due."""
+        reason = "start"
+        while not self.scheduler.stopped:
+            if not self._paused:
+                try:
+                    diff = self.store.push(get_network_interfaces())
+                    changed = not is_empty(diff)
+                    self.scheduler.record_poll(changed)
+                    if changed or reason in ("start", "refresh"):
+                        self.update_signal.emit(diff)
+                    self.poll_signal.emit({
+                        "reason": reason,
+                        "elapsed": self.scheduler.last_elapsed,
+                        "next_interval": self.scheduler.current,
+                    })
+                except Exception:
+                    # Suppress transient failures (e.g., PowerShell access)
+                    pass
+            reason = self.scheduler.wait()
+
+    def refresh_now(self):
+        """Wake the worker for an immediate scan."""
+        self.scheduler.request_refresh()
+
+    def set_interval(self, interval: int):
+        self.interval = interval
+        self.scheduler.set_interval(self._base_interval())
+
+    def pause(self):
+        """Skip scans until ``resume()``; the thread itself keeps running."""
+        self._paused = True
+
+    def resume(self):
+        """Scan again, starting now: refreshes and changes seen while paused were skipped."""
+        self._paused = False
+        self.scheduler.request_refresh()
+
+    def stop(self):
+        """Stop thread safely."""
+        self.scheduler.stop()
+        self.wait()
+        self.notifier.close()
+
+
+class ThroughputWorker(QtCore.QThread):
+    """
+    Samples per-adapter I/O counters every ``interval`` seconds.
+
+    Runs beside ``NetworkMonitorWorker``, whose scans can be a minute
+    apart, and only reads ``net_io_counters``, which is cheap enough for
+    a 1 s cadence. Rates and history live in fixed-size ring buffers (see
+    ``model/throughput.py``).
+
+    Emits:
+        rates_signal (dict): ``ThroughputMonitor.snapshot()`` of the adapters updated by this sample
+    """
+    rates_signal = QtCore.pyqtSignal(object)
+
+    def __init__(self, interval: float = 1.0, history: int = HISTORY):
+        super().__init__()
+        self.interval = interval
+        self.monitor = ThroughputMonitor(history=history)
+        self._stop = threading.Event()
 
     def run(self):
-        """Loop and emit interface data until stopped."""
-        while self._running:
+        while not self._stop.is_set():
             try:
-                data = get_network_interfaces()
-                self.update_signal.emit(data)
+                updated = self.monitor.sample(get_backend().net_io_counters())
+                if updated:
+                    self.rates_signal.emit(self.monitor.snapshot(updated))
             except Exception:
-                # Suppress transient failures (e.g., PowerShell access)
+                # Counters are best-effort; the next sample tries again
                 pass
-            self.msleep(self.interval * 1000)
+            self._stop.wait(self.interval)
 
     def stop(self):
-        """Stop thread safely."""
-        self._running = False
-        self.quit()
+        self._stop.set()
+        self.wait()
+
+
+class ApplyWorker(QtCore.QThread):
+    """
+    Background thread that applies a batch of adapter changes as one transaction.
+
+    Emits:
+        progress_signal (str): Stage of the batch (snapshot, apply, verify, rollback)
+        result_signal (dict): One apply result per adapter, once the batch is final
+        done_signal (list): All results once the batch is complete
+    """
+    progress_signal = QtCore.pyqtSignal(str)
+    result_signal = QtCore.pyqtSignal(dict)
+    done_signal = QtCore.pyqtSignal(list)
+
+    def __init__(self, changes: list):
+        super().__init__()
+        self.changes = changes
+
+    def run(self):
+        results = []
+        for res in iter_apply_results(self.changes, progress=self.progress_signal.emit):
+            results.append(res)
+            self.result_signal.emit(res)
+        self.done_signal.emit(results)
+
+
+class DeepScanWorker(QtCore.QThread):
+    """
+    Background thread for a single PowerShell deep scan.
+
+    Emits:
+        progress_signal (str): Human-readable stage of the scan
+        result_signal (list): List of interface dictionaries
+        cancelled_signal (): The scan was cancelled before completing
+        error_signal (str): The scan failed
+    """
+    progress_signal = QtCore.pyqtSignal(str)
+    result_signal = QtCore.pyqtSignal(list)
+    cancelled_signal = QtCore.pyqtSignal()
+    error_signal = QtCore.pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self._cancel = threading.Event()
+
+    def run(self):
+        try:
+            data = get_network_interfaces_deep(progress=self.progress_signal.emit, cancel=self._cancel)
+        except CommandCancelled:
+            self.cancelled_signal.emit()
+            return
+        except Exception as e:
+            self.error_signal.emit(str(e))
+            return
+        self.result_signal.emit(data)
+
+    def cancel(self):
+        """Abort the scan; the running PowerShell host is killed and replaced."""
+        self._cancel.set()
+
+
+# ------------------------------------------------------------
+# Fleet mode
+# ------------------------------------------------------------
+class _AsyncLoopThread(QtCore.QThread):
+    """QThread running one asyncio loop (fleet and probe workers); ``wake()`` is safe to call from the GUI thread."""
+
+    def __init__(self):
+        super().__init__()
+        self._loop = None
+        self._wake = None
+        self._woken_early = False  # wake() before the loop existed
+        self._stopped = False
+
+    def run(self):
+        asyncio.run(self._run_loop())
+
+    async def _run_loop(self):
+        self._wake = asyncio.Event()
+        if self._woken_early:
+            self._wake.set()
+        self._loop = asyncio.get_running_loop()
+        await self.main()
+
+    async def main(self):
+        raise NotImplementedError
+
+    async def sleep(self, seconds: float):
+        """Wait ``seconds`` or until ``wake()``."""
+        try:
+            await asyncio.wait_for(self._wake.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    def wake(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        else:
+            self._woken_early = True
+
+    def stop(self):
+        self._stopped = True
+        self.wake()
         self.wait()
+
+
+class FleetMonitorWorker(_AsyncLoopThread):
+    """
+    Fleet counterpart of ``NetworkMonitorWorker``, with the same signals and controls.
+
+    Every host is scanned from one asyncio loop in this thread (see
+    ``model/fleet.py``). Each host's reply is merged into ``store`` as it
+    arrives, and the diff is emitted right away. The table therefore fills
+    in host by host instead of waiting for the slowest one. Rows of a host
+    that stops answering are kept, with link "Unreachable".
+
+    Emits:
+        update_signal (dict): Snapshot diff of the merged fleet rows
+        poll_signal (dict): {"reason", "elapsed", "next_interval", "hosts", "failed"} after each sweep
+        host_signal (dict): {"host", "error"} per host per sweep ("error" is None on success)
+    """
+    update_signal = QtCore.pyqtSignal(object)
+    poll_signal = QtCore.pyqtSignal(dict)
+    host_signal = QtCore.pyqtSignal(dict)
+
+    def __init__(self, hosts, token: str = None, interval: int = 30, timeout: float = 10.0, per_host_limit: int = 1,
+                 tls_ca: str = None):
+        super().__init__()
+        self.hosts = hosts
+        self.token = token
+        self.tls_ca = tls_ca
+        self.interval = interval
+        self.timeout = timeout
+        self.per_host_limit = per_host_limit
+        self.store = SnapshotStore()
+        self._rows = {}  # host label -> fleet rows
+        self._paused = False
+        self._refresh = False
+        self._last_sweep = None
+
+    async def main(self):
+        pool = FleetPool(self.hosts, token=self.token, timeout=self.timeout, per_host_limit=self.per_host_limit,
+                         tls_ca=self.tls_ca)
+        reason = "start"
+        try:
+            while not self._stopped:
+                if not self._paused:
+                    await self._sweep(pool, reason)
+                await self.sleep(self.interval)
+                reason = "refresh" if self._refresh else "timeout"
+                self._refresh = False
+        finally:
+            await pool.close()
+
+    async def _sweep(self, pool, reason):
+        start = time.monotonic()
+        emitted, failed = False, 0
+        async for res in pool.scan():
+            if self._stopped:
+                return
+            host = res["host"]
+            error = res.get("error")
+            self.host_signal.emit({"host": host, "error": error})
+            if error:
+                failed += 1
+                self._rows[host] = self._unreachable_rows(host, error)
+            else:
+                self._rows[host] = fleet_rows(host, res["interfaces"])
+            diff = self.store.push([row for rows in self._rows.values() for row in rows])
+            if not is_empty(diff):
+                self.update_signal.emit(diff)
+                emitted = True
+
+        if not emitted and reason in ("start", "refresh"):
+            # Let the controller finish its "Refreshing..." state even when nothing changed
+            self.update_signal.emit(self.store.push([row for rows in self._rows.values() for row in rows]))
+        self.poll_signal.emit({
+            "reason": reason,
+            "elapsed": None if self._last_sweep is None else start - self._last_sweep,
+            "next_interval": self.interval,
+            "hosts": len(self.hosts),
+            "failed": failed,
+        })
+        self._last_sweep = start
+
+    def _unreachable_rows(self, host, error):
+        rows = self._rows.get(host)
+        if rows:
+            return [{**row, "link": "Unreachable", "stale": ["ip", "subnet", "gateway", "mode", "link"]} for row in rows]
+        return [{
+            "connection": fleet_key(host, "—"),
+            "description": error,
+            "ip": "—",
+            "subnet": "—",
+            "gateway": "—",
+            "mode": "—",
+            "link": "Unreachable",
+            "stale": ["ip", "subnet", "gateway", "mode", "link"],
+        }]
+
+    def refresh_now(self):
+        self._refresh = True
+        self.wake()
+
+    def set_interval(self, interval: int):
+        self.interval = interval
+        self.wake()
+
+    def pause(self):
+        self._paused = True
+
+    def resume(self):
+        """Sweep again now, like ``NetworkMonitorWorker.resume()``."""
+        self._paused = False
+        self.refresh_now()
+
+
+class FleetApplyWorker(_AsyncLoopThread):
+    """
+    Applies fleet changes (keyed by ``fleet_key``), one transaction per host, all hosts concurrently.
+
+    Same signals as ``ApplyWorker``; ``result_signal`` fires per adapter as each host finishes.
+    """
+    progress_signal = QtCore.pyqtSignal(str)
+    result_signal = QtCore.pyqtSignal(dict)
+    done_signal = QtCore.pyqtSignal(list)
+
+    def __init__(self, changes: list, hosts, token: str = None, timeout: float = 10.0, tls_ca: str = None):
+        super().__init__()
+        self.changes = changes
+        self.hosts = hosts
+        self.token = token
+        self.tls_ca = tls_ca
+        self.timeout = timeout
+
+    async def main(self):
+        pool = FleetPool(self.hosts, token=self.token, timeout=self.timeout, tls_ca=self.tls_ca)
+        results = []
+        try:
+            self.progress_signal.emit(f"Applying {len(self.changes)} change(s) across the fleet...")
+            async for outcome in pool.apply(self.changes):
+                for res in fleet_apply_results(outcome):
+                    results.append(res)
+                    self.result_signal.emit(res)
+        finally:
+            await pool.close()
+        self.done_signal.emit(results)
+
+
+# ------------------------------------------------------------
+# Connectivity probes
+# ------------------------------------------------------------
+class ProbeWorker(_AsyncLoopThread):
+    """
+    Probes gateway and upstream reachability for every local adapter (see
+    ``model/probes.py``) about every ``interval`` seconds, with jitter.
+
+    ``set_interfaces()`` hands it the latest scan. A change to the set of
+    adapters, addresses or gateways starts a round straight away, and the
+    engine's cache keeps repeated rounds cheap.
+
+    Emits:
+        probe_signal (dict): {connection: probe result} after each round
+    """
+    probe_signal = QtCore.pyqtSignal(object)
+
+    def __init__(self, interval: float = 10.0, engine: ProbeEngine = None):
+        super().__init__()
+        self.interval = interval
+        self.engine = engine or ProbeEngine()
+        self._interfaces = []
+        self._targets = set()
+
+    async def main(self):
+        await self.engine.run(
+            lambda: self._interfaces,
+            self.probe_signal.emit,
+            interval=self.interval,
+            wait=self.sleep,
+            stopped=lambda: self._stopped,
+        )
+
+    def set_interfaces(self, interfaces):
+        interfaces = list(interfaces)
+        targets = {(iface["connection"], probe_source(iface), probe_gateway(iface)) for iface in interfaces}
+        self._interfaces = interfaces
+        if targets != self._targets:
+            self._targets = targets
+            self.wake()
@@ -0,0 +1,282 @@
+"""
+headless.py
+-----------
+GUI-less mode: ``python -m networkcontrol --headless``.
+
+Runs the same model-layer scans as the GUI and streams NDJSON (one JSON
+object per line) to stdout, or to every client of a Unix socket with
+``--socket PATH``. PyQt6 is never imported.
+
+Output messages:
+    {"type": "snapshot", "seq", "taken_at", "interfaces": [...]}
+    {"type": "diff", "seq", "taken_at", "added", "removed", "modified"}
+    {"type": "apply_result", "connection", "success", "command", "stdout", "stderr",
+     "verified", "rolled_back"}
+    {"type": "error", "message"}
+    {"type": "host_scan", "host", "interfaces"}      (--fleet)
+    {"type": "host_error", "host", "message"}        (--fleet)
+
+Input (stdin, or lines sent by a socket client):
+    {"type": "apply", "changes": [{"connection", "ip", "subnet", "gateway", "mode"}, ...]}
+        (a change may also list "add_addresses" / "remove_addresses", e.g. ["2001:db8::10/64"])
+    {"type": "refresh"}
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+
+from networkcontrol.controller.poll_scheduler import PollScheduler
+from networkcontrol.model import instrumentation
+from networkcontrol.model.change_notifier import create_notifier
+from networkcontrol.model.network_apply import iter_apply_results, validate_ip_structure
+from networkcontrol.model.network_model import get_network_interfaces
+from networkcontrol.model.snapshot_store import SnapshotStore, is_empty
+
+
+def _dumps(message: dict) -> str:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+# ------------------------------------------------------------
+# Output sinks
+# ------------------------------------------------------------
+class StdoutSink:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def send(self, message: dict):
+        with self._lock:
+            self.stream.write(_dumps(message) + "\n")
+            self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class SocketSink:
+    """
+    Unix socket server; every connected client receives every message.
+
+    New clients are first sent a full snapshot (from ``initial()``), then
+    the live stream. Lines a client sends are passed to ``on_request``.
+    ``send()`` runs on the scan thread and on every client's handler thread,
+    so each client has a write lock that keeps its lines whole.
+    """
+
+    def __init__(self, path: str, initial, on_request):
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Unix sockets are not supported on this platform")
+        self.path = path
+        self._clients = {}  # {wfile: write lock}
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                self.wfile.write((_dumps(initial()) + "\n").encode("utf-8"))
+                with sink._lock:
+                    sink._clients[self.wfile] = threading.Lock()
+                try:
+                    for raw in self.rfile:
+                        on_request(raw.decode("utf-8", errors="ignore"), sink)
+                except OSError:
+                    pass  # client went away
+                finally:
+                    with sink._lock:
+                        sink._clients.pop(self.wfile, None)
+
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def send(self, message: dict):
+        data = (_dumps(message) + "\n").encode("utf-8")
+        with self._lock:
+            clients = list(self._clients.items())
+        for wfile, lock in clients:
+            try:
+                with lock:
+                    wfile.write(data)
+                    wfile.flush()
+            except OSError:
+                with self._lock:
+                    self._clients.pop(wfile, None)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+# ------------------------------------------------------------
+# Requests
+# ------------------------------------------------------------
+def handle_request(line: str, sink, scheduler: PollScheduler = None):
+    """Process one NDJSON request line, replying on ``sink``."""
+    line = line.strip()
+    if not line:
+        return
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        sink.send({"type": "error", "message": f"Invalid JSON: {e}"})
+        return
+
+    kind = request.get("type") if isinstance(request, dict) else None
+    if kind == "refresh":
+        if scheduler is not None:
+            scheduler.request_refresh()
+        return
+    if kind != "apply":
+        sink.send({"type": "error", "message": f"Unknown request type: {kind!r}"})
+        return
+
+    changes = []
+    for change in request.get("changes", []):
+        if not isinstance(change, dict) or not change.get("connection"):
+            sink.send({"type": "error", "message": f"Change is missing 'connection': {change!r}"})
+            continue
+        addresses = {f: [str(a) for a in change[f]] for f in ("add_addresses", "remove_addresses")
+                     if isinstance(change.get(f), list)}
+        change = {f: str(change.get(f, "")) for f in ("connection", "ip", "subnet", "gateway", "mode")}
+        change.update(addresses)
+        if change["mode"].upper() == "STATIC" and not validate_ip_structure(change["ip"]):
+            sink.send({"type": "error", "message": f"{change['connection']}: Invalid IP '{change['ip']}' — skipped"})
+            continue
+        changes.append(change)
+
+    for res in iter_apply_results(changes):
+        sink.send({"type": "apply_result", **res})
+    if changes and scheduler is not None:
+        scheduler.request_refresh()
+
+
+def _read_stdin(sink, scheduler):
+    for line in sys.stdin:
+        handle_request(line, sink, scheduler)
+
+
+# ------------------------------------------------------------
+# Main loop
+# ------------------------------------------------------------
+def run(interval: float = 10, fallback_interval: float = 60, once: bool = False, diffs: bool = True,
+        socket_path: str = None):
+    store = SnapshotStore()
+    notifier = create_notifier()
+    # Same cadence as NetworkMonitorWorker: notifications drive scans, polling is the safety net
+    base = interval if notifier.polling else max(interval, fallback_interval)
+    scheduler = PollScheduler(notifier, interval=base)
+
+    def snapshot_message():
+        latest = store.snapshots()
+        return {
+            "type": "snapshot",
+            "seq": latest[-1].seq if latest else 0,
+            "taken_at": latest[-1].taken_at if latest else None,
+            "interfaces": store.latest(),
+        }
+
+    if socket_path:
+        sink = SocketSink(socket_path, snapshot_message, lambda line, s: handle_request(line, s, scheduler))
+    else:
+        sink = StdoutSink()
+        if not once:
+            threading.Thread(target=_read_stdin, args=(sink, scheduler), daemon=True).start()
+
+    try:
+        while not scheduler.stopped:
+            try:
+                diff = store.push(get_network_interfaces())
+            except Exception as e:
+                sink.send({"type": "error", "message": f"Scan failed: {e}"})
+                diff = None
+
+            if diff is not None:
+                scheduler.record_poll(not is_empty(diff))
+                if not diffs or diff["seq"] == 1:
+                    sink.send(snapshot_message())
+                elif not is_empty(diff):
+                    sink.send({"type": "diff", **diff})
+            if once:
+                break
+            scheduler.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.close()
+        notifier.close()
+
+
+def run_fleet(hosts, token: str = None, interval: float = 30, once: bool = False, tls_ca: str = None):
+    """Stream one message per host per sweep, as each host answers (see ``model/fleet.py``)."""
+    from networkcontrol.model.fleet import FleetPool
+
+    sink = StdoutSink()
+
+    async def _sweeps():
+        pool = FleetPool(hosts, token=token, tls_ca=tls_ca)
+        try:
+            while True:
+                async for res in pool.scan():
+                    if "error" in res:
+                        sink.send({"type": "host_error", "host": res["host"], "message": res["error"]})
+                    else:
+                        sink.send({"type": "host_scan", "host": res["host"], "interfaces": res["interfaces"]})
+                if once:
+                    break
+                await asyncio.sleep(interval)
+        finally:
+            await pool.close()
+
+    try:
+        asyncio.run(_sweeps())
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="networkcontrol --headless", description=__doc__.split("\n\n")[1])
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--interval", type=float, default=10, help="polling interval in seconds (default 10)")
+    parser.add_argument("--fallback-interval", type=float, default=60,
+                        help="safety rescan period when OS change notifications are available (default 60)")
+    parser.add_argument("--once", action="store_true", help="print one snapshot and exit")
+    parser.add_argument("--snapshots", action="store_true", help="emit full snapshots instead of diffs")
+    parser.add_argument("--socket", metavar="PATH", help="serve the stream on a Unix socket instead of stdout")
+    parser.add_argument("--trace", metavar="FILE", help="profile the run and write a Chrome trace to FILE on exit")
+    parser.add_argument("--fleet", metavar="HOSTS_FILE", help="scan the agents listed in HOSTS_FILE instead of this machine")
+    parser.add_argument("--token", default=os.environ.get("NETWORKCONTROL_AGENT_TOKEN"),
+                        help="fleet agent token (default: $NETWORKCONTROL_AGENT_TOKEN)")
+    parser.add_argument("--tls-ca", default=os.environ.get("NETWORKCONTROL_AGENT_CA"), metavar="PEM",
+                        help="connect to agents over TLS, trusting this CA or certificate (default: $NETWORKCONTROL_AGENT_CA)")
+    args = parser.parse_args(argv)
+    if args.trace:
+        instrumentation.enable()
+    try:
+        _dispatch(args)
+    finally:
+        if args.trace:
+            instrumentation.export_chrome_trace(args.trace)
+
+
+def _dispatch(args):
+    if args.fleet:
+        from networkcontrol.model.fleet import parse_hosts
+        with open(args.fleet, encoding="utf-8") as f:
+            hosts = parse_hosts(f)
+        run_fleet(hosts, token=args.token, interval=args.interval, once=args.once, tls_ca=args.tls_ca)
+        return
+    run(interval=args.interval, fallback_interval=args.fallback_interval, once=args.once,
+        diffs=not args.snapshots, socket_path=args.socket)
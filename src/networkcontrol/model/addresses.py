@@ -0,0 +1,188 @@
+"""
+addresses.py
+------------
+Every IPv4 and IPv6 address of an adapter, parsed once at scan time.
+
+Interface dicts carry
+
+    "addresses": (AddressRecord, ...)   # primary first, then IPv4, then IPv6
+    "gateways":  (str, ...)             # IPv4 default gateways first, then IPv6
+
+next to the single-valued "ip", "subnet" and "gateway" fields, which keep
+holding the primary address for the table and apply. An ``AddressRecord``
+is a namedtuple of interned strings plus the prefix length:
+
+    AddressRecord(family="ipv6", address="2001:db8::10", prefix=64, origin="manual")
+
+``origin`` is where the address came from: "dhcp", "manual", "ra" (router
+advertisement / SLAAC), "link" (link-local), "wellknown" or "" (unknown).
+Over JSON (headless mode, fleet agents) a record travels as a
+[family, address, prefix, origin] list; ``to_address()`` accepts either.
+"""
+
+import functools
+import ipaddress
+import socket
+import sys
+from collections import namedtuple
+
+AddressRecord = namedtuple("AddressRecord", "family address prefix origin")
+
+# Get-NetIPAddress PrefixOrigin / SuffixOrigin values -> origin
+_ORIGINS = {
+    "dhcp": "dhcp",
+    "manual": "manual",
+    "routeradvertisement": "ra",
+    "wellknown": "wellknown",
+    "link": "link",
+    "random": "ra",
+    "other": "",
+}
+ORIGIN_LABELS = {
+    "dhcp": "DHCP",
+    "manual": "Manual",
+    "ra": "SLAAC",
+    "link": "Link-local",
+    "wellknown": "Well-known",
+    "": "—",
+}
+
+
+def _origin(value) -> str:
+    return _ORIGINS.get(str(value or "").replace(" ", "").lower(), "")
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_address(address: str, prefix=None, netmask: str = None, origin: str = ""):
+    """
+    Build an ``AddressRecord`` from scan output, or None if ``address`` is not an IP.
+
+    Cached: every scan sees the same few addresses, and ``ipaddress``
+    parsing dominates the scan's cost otherwise.
+
+    Args:
+        prefix: prefix length, if known
+        netmask (str): IPv4 dotted mask or IPv6 mask, used when ``prefix`` is None
+        origin (str): Raw origin (PowerShell PrefixOrigin or an origin name)
+    """
+    text = str(address or "").strip()
+    host, _, zone = text.partition("%")  # psutil appends the zone to link-local IPv6
+    try:
+        ip = ipaddress.ip_address(host)
+    except ValueError:
+        return None
+
+    length = None
+    if prefix not in (None, ""):
+        try:
+            length = int(prefix)
+        except (TypeError, ValueError):
+            length = None
+    if length is None and netmask:
+        try:
+            if ip.version == 4:
+                length = ipaddress.IPv4Network(f"0.0.0.0/{netmask}").prefixlen
+            else:
+                # ipaddress takes no IPv6 masks; a contiguous mask is just its set bits
+                length = bin(int(ipaddress.IPv6Address(netmask))).count("1")
+        except ValueError:
+            length = None
+
+    origin = "link" if ip.is_link_local else _origin(origin)
+    family = "ipv4" if ip.version == 4 else "ipv6"
+    value = f"{ip.compressed}%{zone}" if zone else ip.compressed
+    return AddressRecord(sys.intern(family), sys.intern(value), length, sys.intern(origin))
+
+
+def from_psutil(addrs, dhcp: bool = None) -> tuple:
+    """
+    Records for one adapter's ``psutil.net_if_addrs()`` entries (AF_INET / AF_INET6 only).
+
+    psutil has no origin. IPv4 addresses take it from the adapter's DHCP
+    flag (netsh) when known. Link-local IPv6 addresses are recognised by
+    their address.
+    """
+    records = []
+    for a in addrs:
+        if a.family not in (socket.AF_INET, socket.AF_INET6):
+            continue
+        origin = ""
+        if a.family == socket.AF_INET and dhcp is not None:
+            origin = "dhcp" if dhcp else "manual"
+        record = parse_address(a.address, netmask=a.netmask, origin=origin)
+        if record is not None:
+            records.append(record)
+    return order_addresses(records)
+
+
+def to_address(value) -> AddressRecord:
+    """``AddressRecord`` from a record or its JSON list form."""
+    if isinstance(value, AddressRecord):
+        return value
+    family, address, prefix, origin = value
+    return AddressRecord(sys.intern(str(family)), sys.intern(str(address)),
+                         None if prefix is None else int(prefix), sys.intern(str(origin or "")))
+
+
+def _rank(record: AddressRecord) -> tuple:
+    return (
+        record.family != "ipv4",
+        record.origin == "link",
+        record.origin == "ra" and record.family == "ipv6",  # prefer stable over temporary/SLAAC
+    )
+
+
+def order_addresses(records) -> tuple:
+    """Primary first: IPv4, then global IPv6, then link-local; scan order within each group."""
+    return tuple(sorted(records, key=_rank))
+
+
+def primary(records):
+    """The record shown in the adapter's own row (None if it has no address)."""
+    return records[0] if records else None
+
+
+def primary_gateway(gateways, family: str) -> str:
+    """First gateway of the primary address's family (any family if there is none; "—" if no gateway)."""
+    if not gateways:
+        return "—"
+    v6 = family == "ipv6"
+    return next((g for g in gateways if (":" in g) == v6), gateways[0])
+
+
+def format_prefix(record: AddressRecord) -> str:
+    """"255.255.255.0" for IPv4 (matching the Subnet column), "/64" for IPv6."""
+    if record.prefix is None:
+        return "—"
+    if record.family == "ipv4":
+        return _netmask(record.prefix)
+    return f"/{record.prefix}"
+
+
+@functools.lru_cache(maxsize=None)
+def _netmask(prefix: int) -> str:
+    return str(ipaddress.IPv4Network(f"0.0.0.0/{prefix}").netmask)
+
+
+def cidr(record: AddressRecord) -> str:
+    """"address/prefix" without the zone, as apply takes it."""
+    host = record.address.partition("%")[0]
+    return host if record.prefix is None else f"{host}/{record.prefix}"
+
+
+def order_gateways(gateways) -> tuple:
+    """IPv4 gateways first, then IPv6; invalid entries dropped, duplicates removed."""
+    seen = []
+    for gateway in gateways:
+        value = _gateway(str(gateway).strip())
+        if value and value not in seen:
+            seen.append(value)
+    return tuple(sorted(seen, key=lambda g: ":" in g))
+
+
+@functools.lru_cache(maxsize=4096)
+def _gateway(text: str) -> str:
+    try:
+        return ipaddress.ip_address(text.partition("%")[0]).compressed
+    except ValueError:
+        return ""
@@ -0,0 +1,515 @@
+"""
+apply_engine.py
+---------------
+Transactional apply of a batch of adapter changes.
+
+A batch runs in four steps:
+
+    1. snapshot  read the current config of only the adapters in the batch
+    2. apply     push every change, in parallel (bounded by the executor)
+    3. verify    one targeted read-back of the same adapters, compared to the targets
+    4. rollback  if any change failed, timed out or did not verify, every
+                 adapter the batch touched is restored from the snapshot
+
+Nothing is touched if a change is invalid or the snapshot cannot be read.
+The whole batch shares one deadline (``timeout``); rollback has its own.
+A timed-out command cannot be stopped, so rollback first waits (up to
+``rollback_timeout``) for applies still running; an adapter whose apply is
+still running after that is not restored and is reported as unknown.
+
+Commands come from an executor, so the engine does not care how settings
+are read or written:
+
+    executor.parallelism -> int
+    executor.read(connections, timeout) -> {connection: config}
+    executor.apply(connection, config, timeout) -> {"success", "command", "stdout", "stderr"}
+
+where ``config`` is {"mode": "DHCP" | "Static", "ip", "subnet" (prefix
+length), "gateway", "addresses"}. "addresses" is a sorted tuple of the
+adapter's other manually configured addresses, IPv4 or IPv6, as
+"address/prefix". A change adds or removes individual addresses with
+optional "add_addresses" / "remove_addresses" lists. Its target address
+set is the snapshot's set with those applied, so an adapter's other
+addresses survive a change to its primary address. ``PowerShellExecutor``
+is the real one; ``FakeExecutor`` keeps adapter configs in memory.
+"""
+
+import functools
+import ipaddress
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from networkcontrol.model import instrumentation
+from networkcontrol.model.powershell_pool import get_pool, ps_quote
+
+CONFIG_FIELDS = ("mode", "ip", "subnet", "gateway", "addresses")
+_NO_GATEWAY = ("", "—", "-", "none", "0.0.0.0")
+
+
+class ApplyError(Exception):
+    """A change cannot be applied (invalid values or unreadable adapter)."""
+
+
+# ------------------------------------------------------------
+# Config normalisation
+# ------------------------------------------------------------
+def normalize_config(values: dict) -> dict:
+    """
+    Canonical form of an adapter's IPv4 settings, as compared by verify.
+
+    DHCP configs carry no primary address fields (the lease is not ours to
+    check), and no extra IPv4 addresses, which DHCP mode clears.
+
+    Raises:
+        ApplyError: invalid static address, mask/prefix, gateway or extra address
+    """
+    mode = str(values.get("mode", "")).strip().upper()
+    addresses = normalize_addresses(values.get("addresses") or ())
+    if mode == "DHCP":
+        return {"mode": "DHCP", "ip": "", "subnet": "", "gateway": "",
+                "addresses": tuple(a for a in addresses if ":" in a)}
+
+    ip = str(values.get("ip", "")).strip()
+    subnet = str(values.get("subnet", "")).strip()
+    gateway = str(values.get("gateway", "")).strip()
+    try:
+        address = ipaddress.IPv4Address(ip)
+    except ValueError:
+        raise ApplyError(f"Invalid IP address '{ip}'")
+    try:
+        # Accepts a dotted mask (255.255.255.0) or a prefix length (24)
+        prefix = ipaddress.IPv4Network(f"0.0.0.0/{subnet}").prefixlen
+    except ValueError:
+        raise ApplyError(f"Invalid subnet '{subnet}'")
+    if gateway.lower() in _NO_GATEWAY:
+        gateway = ""
+    else:
+        try:
+            gateway = str(ipaddress.IPv4Address(gateway))
+        except ValueError:
+            raise ApplyError(f"Invalid gateway '{gateway}'")
+    primary = f"{address}/{prefix}"
+    return {"mode": "Static", "ip": str(address), "subnet": str(prefix), "gateway": gateway,
+            "addresses": tuple(a for a in addresses if a != primary)}
+
+
+def normalize_addresses(values) -> tuple:
+    """
+    Canonical, sorted "address/prefix" strings (IPv4 or IPv6).
+
+    A bare address gets a host prefix (/32 or /128).
+
+    Raises:
+        ApplyError: an entry is not an address
+    """
+    return tuple(sorted({_canonical_address(str(value).strip()) for value in values}))
+
+
+@functools.lru_cache(maxsize=4096)
+def _canonical_address(text: str) -> str:
+    host, slash, prefix = text.partition("/")
+    try:
+        interface = ipaddress.ip_interface(host.partition("%")[0] + slash + prefix)
+    except ValueError:
+        raise ApplyError(f"Invalid address '{text}'")
+    return f"{interface.ip.compressed}/{interface.network.prefixlen}"
+
+
+def plan_addresses(current: tuple, change: dict, target: dict) -> tuple:
+    """Target "addresses" for a change: the current ones plus "add_addresses", minus "remove_addresses"."""
+    add = normalize_addresses(change.get("add_addresses") or ())
+    remove = set(normalize_addresses(change.get("remove_addresses") or ()))
+    result = (set(current or ()) | set(add)) - remove
+    return normalize_config({**target, "addresses": tuple(result)})["addresses"]
+
+
+def config_mismatch(expected: dict, actual: dict) -> list:
+    """Fields where a read-back config differs from the target."""
+    if actual is None:
+        return ["adapter missing"]
+    fields = ("mode", "addresses") if expected["mode"] == "DHCP" else CONFIG_FIELDS
+    problems = []
+    for f in fields:
+        want, found = expected.get(f, ()), actual.get(f, () if f == "addresses" else "")
+        if f == "addresses":
+            want, found = tuple(want), tuple(found)
+            if want != found:
+                problems.append(f"addresses: expected {', '.join(want) or 'none'}, found {', '.join(found) or 'none'}")
+        elif want != found:
+            problems.append(f"{f}: expected '{want}', found '{found}'")
+    return problems
+
+
+# ------------------------------------------------------------
+# PowerShell executor
+# ------------------------------------------------------------
+def _as_list(value) -> list:
+    """ConvertTo-Json turns a one-element array into a scalar and an empty one into null."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+class PowerShellExecutor:
+    """Reads and writes IPv4 settings with NetTCPIP cmdlets on the shared PowerShell pool."""
+
+    def __init__(self, pool=None):
+        self._pool = pool
+
+    @property
+    def pool(self):
+        return self._pool or get_pool()
+
+    @property
+    def parallelism(self) -> int:
+        return self.pool.size
+
+    def read(self, connections, timeout: float) -> dict:
+        aliases = ", ".join(ps_quote(c) for c in connections)
+        # Scoped in a script block so ErrorActionPreference does not leak into the host
+        script = (
+            "& { $ErrorActionPreference = 'Stop'\n"
+            f"@(foreach ($alias in @({aliases})) {{\n"
+            "  $if = Get-NetIPInterface -InterfaceAlias $alias -AddressFamily IPv4\n"
+            "  $addr = Get-NetIPAddress -InterfaceAlias $alias -AddressFamily IPv4 -ErrorAction Ignore |"
+            " Where-Object { $_.PrefixOrigin -ne 'WellKnown' } | Select-Object -First 1\n"
+            "  $route = Get-NetRoute -InterfaceAlias $alias -DestinationPrefix '0.0.0.0/0' -ErrorAction Ignore |"
+            " Select-Object -First 1\n"
+            "  $extra = @(Get-NetIPAddress -InterfaceAlias $alias -PrefixOrigin Manual -ErrorAction Ignore |"
+            " Where-Object { $_.IPAddress -ne $addr.IPAddress } | ForEach-Object { \"$($_.IPAddress)/$($_.PrefixLength)\" })\n"
+            "  [pscustomobject]@{ Alias = $alias; Dhcp = [string]$if.Dhcp; IPAddress = [string]$addr.IPAddress;"
+            " PrefixLength = [string]$addr.PrefixLength; Gateway = [string]$route.NextHop; Addresses = $extra }\n"
+            "}) | ConvertTo-Json -Depth 2 -Compress }"
+        )
+        result = self.pool.run(script, timeout=timeout)
+        if result.returncode != 0 or not result.stdout.strip():
+            raise ApplyError(f"Could not read adapter settings: {result.stderr.strip() or 'no output'}")
+        rows = json.loads(result.stdout)
+        if isinstance(rows, dict):
+            rows = [rows]
+        return {
+            row["Alias"]: {
+                "mode": "DHCP" if row.get("Dhcp") == "Enabled" else "Static",
+                "ip": row.get("IPAddress") or "",
+                "subnet": row.get("PrefixLength") or "",
+                "gateway": row.get("Gateway") or "",
+                "addresses": normalize_addresses(_as_list(row.get("Addresses"))),
+            }
+            for row in rows
+        }
+
+    def apply(self, connection: str, config: dict, timeout: float) -> dict:
+        alias = ps_quote(connection)
+        clear_gateway = (
+            f"Get-NetRoute -InterfaceAlias {alias} -DestinationPrefix '0.0.0.0/0' -ErrorAction Ignore |"
+            " Remove-NetRoute -Confirm:$false\n"
+        )
+        if config["mode"] == "DHCP":
+            body = (
+                clear_gateway
+                + f"Get-NetIPAddress -InterfaceAlias {alias} -AddressFamily IPv4 -PrefixOrigin Manual"
+                " -ErrorAction Ignore | Remove-NetIPAddress -Confirm:$false\n"
+                f"Set-NetIPInterface -InterfaceAlias {alias} -AddressFamily IPv4 -Dhcp Enabled\n"
+            )
+        else:
+            gateway = f" -DefaultGateway {config['gateway']}" if config["gateway"] else ""
+            # DHCP off first, so no lease reappears between the remove and the add
+            body = (
+                f"Set-NetIPInterface -InterfaceAlias {alias} -AddressFamily IPv4 -Dhcp Disabled\n"
+                + clear_gateway
+                + f"Get-NetIPAddress -InterfaceAlias {alias} -AddressFamily IPv4 -ErrorAction Ignore |"
+                " Remove-NetIPAddress -Confirm:$false\n"
+            )
+            if config["ip"]:  # a snapshot of an unaddressed static adapter restores to no address
+                body += (
+                    f"New-NetIPAddress -InterfaceAlias {alias} -AddressFamily IPv4 -IPAddress {config['ip']}"
+                    f" -PrefixLength {config['subnet']}{gateway} | Out-Null\n"
+                )
+        body += self._address_script(alias, config)
+        script = "& { $ErrorActionPreference = 'Stop'\n" + body + "}"
+        result = self.pool.run(script, timeout=timeout)
+        return {
+            "success": result.returncode == 0,
+            "command": script,
+            "stdout": result.stdout.strip(),
+            "stderr": result.stderr.strip(),
+        }
+
+    @staticmethod
+    def _address_script(alias: str, config: dict) -> str:
+        """Make the adapter's other manual addresses exactly ``config["addresses"]``."""
+        keep = ", ".join(ps_quote(a) for a in config.get("addresses", ()))
+        primary = ps_quote(config["ip"])
+        body = (
+            f"$keep = @({keep})\n"
+            f"Get-NetIPAddress -InterfaceAlias {alias} -PrefixOrigin Manual -ErrorAction Ignore |"
+            f" Where-Object {{ $_.IPAddress -ne {primary} -and"
+            " (\"$($_.IPAddress)/$($_.PrefixLength)\" -notin $keep) } | Remove-NetIPAddress -Confirm:$false\n"
+            "foreach ($entry in $keep) {\n"
+            "  $ip, $length = $entry -split '/'\n"
+            f"  if (-not (Get-NetIPAddress -InterfaceAlias {alias} -IPAddress $ip -ErrorAction Ignore)) {{\n"
+            f"    New-NetIPAddress -InterfaceAlias {alias} -IPAddress $ip -PrefixLength $length | Out-Null\n"
+            "  }\n"
+            "}\n"
+        )
+        return body
+
+
+# ------------------------------------------------------------
+# Fake executor
+# ------------------------------------------------------------
+class FakeExecutor:
+    """
+    In-memory executor for benchmarks and for exercising the engine off Windows.
+
+    Args:
+        configs (dict): {connection: config} the fake adapters start with
+        fail (iterable): connections whose apply reports failure
+        ignore (iterable): connections whose apply reports success but changes nothing
+        delay (float): seconds each apply takes; longer than its timeout raises TimeoutError
+    """
+
+    def __init__(self, configs: dict, fail=(), ignore=(), delay: float = 0.0, parallelism: int = 4):
+        self.configs = {c: normalize_config(v) for c, v in configs.items()}
+        self.fail = set(fail)
+        self.ignore = set(ignore)
+        self.delay = delay
+        self.parallelism = parallelism
+        self.calls = []  # ("read", connections) / ("apply", connection, config)
+        self._lock = threading.Lock()
+
+    def read(self, connections, timeout: float) -> dict:
+        with self._lock:
+            self.calls.append(("read", tuple(connections)))
+            missing = [c for c in connections if c not in self.configs]
+            if missing:
+                raise ApplyError(f"No such adapter: {', '.join(missing)}")
+            return {c: dict(self.configs[c]) for c in connections}
+
+    def apply(self, connection: str, config: dict, timeout: float) -> dict:
+        with self._lock:
+            self.calls.append(("apply", connection, dict(config)))
+        if self.delay:
+            time.sleep(min(self.delay, timeout))
+            if self.delay > timeout:
+                raise TimeoutError(f"apply on {connection} timed out")
+        command = f"fake-apply {connection} {config}"
+        if connection in self.fail:
+            return {"success": False, "command": command, "stdout": "", "stderr": "simulated failure"}
+        if connection not in self.ignore:
+            with self._lock:
+                self.configs[connection] = dict(config)
+        return {"success": True, "command": command, "stdout": "", "stderr": ""}
+
+
+# ------------------------------------------------------------
+# Engine
+# ------------------------------------------------------------
+class ApplyEngine:
+    """
+    Runs batches as transactions; see module docstring.
+
+    Args:
+        executor: command backend (defaults to ``PowerShellExecutor()``)
+        timeout (float): deadline in seconds for snapshot + apply + verify
+        rollback_timeout (float): deadline in seconds for the rollback
+        max_workers (int): parallel applies (defaults to ``executor.parallelism``)
+    """
+
+    def __init__(self, executor=None, timeout: float = 30.0, rollback_timeout: float = 30.0,
+                 max_workers: int = None, clock=time.monotonic):
+        self.executor = executor or PowerShellExecutor()
+        self.timeout = timeout
+        self.rollback_timeout = rollback_timeout
+        self.max_workers = max_workers
+        self._clock = clock
+
+    @instrumentation.timed("apply.batch")
+    def run(self, changes: list, progress=None) -> list:
+        """
+        Apply ``changes`` ({"connection", "ip", "subnet", "gateway", "mode"} dicts,
+        optionally with "add_addresses" / "remove_addresses").
+
+        Args:
+            progress (callable): Optional ``progress(message)`` callback
+
+        Returns:
+            list: one result per change, in order:
+                {"connection", "success", "command", "stdout", "stderr",
+                 "verified", "rolled_back"}
+        """
+        report = progress or (lambda message: None)
+        connections = [c["connection"] for c in changes]
+        results = {
+            conn: {"connection": conn, "success": False, "command": "", "stdout": "", "stderr": "",
+                   "verified": False, "rolled_back": False}
+            for conn in connections
+        }
+        if not changes:
+            return []
+
+        # Validate everything before touching anything
+        targets, invalid = {}, []
+        for change in changes:
+            try:
+                targets[change["connection"]] = normalize_config(change)
+                normalize_addresses(change.get("add_addresses") or ())
+                normalize_addresses(change.get("remove_addresses") or ())
+            except ApplyError as e:
+                results[change["connection"]]["stderr"] = str(e)
+                invalid.append(change["connection"])
+        if invalid:
+            return self._abort(results, connections, f"Batch not applied: invalid settings for {', '.join(invalid)}")
+
+        deadline = self._clock() + self.timeout
+        report(f"Reading current settings of {len(connections)} adapter(s)...")
+        try:
+            snapshot = self.executor.read(connections, timeout=self._remaining(deadline))
+        except Exception as e:
+            return self._abort(results, connections, f"Batch not applied: {e}")
+
+        # Address additions/removals are relative to what is configured now
+        for change in changes:
+            conn = change["connection"]
+            current = (snapshot.get(conn) or {}).get("addresses", ())
+            targets[conn]["addresses"] = plan_addresses(current, change, targets[conn])
+
+        pending = [c for c in connections if config_mismatch(targets[c], snapshot.get(c))]
+        for conn in connections:
+            if conn not in pending:
+                results[conn].update(success=True, verified=True, stdout="Already configured")
+
+        report(f"Applying changes to {len(pending)} adapter(s)...")
+        running = {}
+        failed = self._apply_all(pending, targets, results, deadline, running)
+
+        if not failed and pending:
+            report("Verifying...")
+            try:
+                actual = self.executor.read(pending, timeout=self._remaining(deadline))
+            except Exception as e:
+                actual = {}
+                for conn in pending:
+                    results[conn]["stderr"] = f"Verify failed: {e}"
+                failed = list(pending)
+            for conn in pending:
+                if conn in failed:
+                    continue
+                problems = config_mismatch(targets[conn], actual.get(conn))
+                if problems:
+                    results[conn]["stderr"] = "Verify failed: " + "; ".join(problems)
+                    failed.append(conn)
+                else:
+                    results[conn]["verified"] = True
+
+        if failed:
+            report(f"Rolling back {len(pending)} adapter(s)...")
+            instrumentation.count("apply.rollback")
+            self._rollback(pending, snapshot, results, failed, running)
+            return [results[c] for c in connections]
+
+        for conn in pending:
+            results[conn]["success"] = True
+        return [results[c] for c in connections]
+
+    # ------------------------------------------------------------
+    def _remaining(self, deadline: float) -> float:
+        remaining = deadline - self._clock()
+        if remaining <= 0:
+            raise TimeoutError("Apply batch timed out")
+        return remaining
+
+    def _abort(self, results, connections, message):
+        for conn in connections:
+            res = results[conn]
+            res["stderr"] = f"{res['stderr']}\n{message}".strip() if res["stderr"] else message
+        return [results[c] for c in connections]
+
+    def _run_parallel(self, connections, configs, timeout, running=None):
+        """
+        Run ``executor.apply`` for each connection; return {connection: result or exception}.
+        Commands still running after ``timeout`` are reported as TimeoutError, and
+        their futures are added to ``running`` ({connection: future}) if given.
+        """
+        if not connections:
+            return {}
+        workers = max(1, min(len(connections), self.max_workers or self.executor.parallelism))
+        outcome = {}
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nic-apply")
+        try:
+            futures = {
+                pool.submit(self.executor.apply, conn, configs[conn], timeout): conn
+                for conn in connections
+            }
+            done, _ = wait(futures, timeout=timeout)
+            for future, conn in futures.items():
+                if future not in done:
+                    outcome[conn] = TimeoutError("Apply timed out")
+                    if running is not None:
+                        running[conn] = future
+                elif future.exception() is not None:
+                    outcome[conn] = future.exception()
+                else:
+                    outcome[conn] = future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return outcome
+
+    def _apply_all(self, pending, targets, results, deadline, running) -> list:
+        try:
+            timeout = self._remaining(deadline)
+        except TimeoutError as e:
+            for conn in pending:
+                results[conn]["stderr"] = str(e)
+            return list(pending)
+
+        failed = []
+        for conn, outcome in self._run_parallel(pending, targets, timeout, running).items():
+            if isinstance(outcome, Exception):
+                results[conn]["stderr"] = str(outcome) or type(outcome).__name__
+                failed.append(conn)
+                continue
+            results[conn].update(command=outcome["command"], stdout=outcome["stdout"], stderr=outcome["stderr"])
+            if not outcome["success"]:
+                failed.append(conn)
+        return failed
+
+    def _rollback(self, touched, snapshot, results, failed, running):
+        """
+        Restore every touched adapter (including the ones that succeeded) from the snapshot.
+
+        Applies still ``running`` are waited for first: restoring an adapter
+        while its apply is still changing it could leave a mix of both.
+        """
+        if running:
+            wait(running.values(), timeout=self.rollback_timeout)
+        unknown = {conn for conn, future in running.items() if not future.done()}
+        restore = [conn for conn in touched if conn not in unknown]
+
+        deadline = self._clock() + self.rollback_timeout
+        outcome = self._run_parallel(restore, snapshot, self.rollback_timeout)
+        try:
+            restored = self.executor.read(restore, timeout=self._remaining(deadline)) if restore else {}
+        except Exception:
+            restored = {}
+
+        for conn in touched:
+            res = results[conn]
+            res["success"] = False
+            res["verified"] = False
+            reason = res["stderr"] if conn in failed else "Rolled back: another adapter in the batch failed"
+            if conn in unknown:
+                res["stderr"] = f"{reason}\nROLLBACK SKIPPED: the apply is still running; adapter state unknown"
+                continue
+            rollback = outcome.get(conn)
+            if isinstance(rollback, Exception) or not (rollback or {}).get("success"):
+                detail = rollback if isinstance(rollback, Exception) else (rollback or {}).get("stderr", "")
+                res["stderr"] = f"{reason}\nROLLBACK FAILED: {detail}".strip()
+            elif config_mismatch(snapshot[conn], restored.get(conn)):
+                res["stderr"] = f"{reason}\nROLLBACK NOT VERIFIED: " + "; ".join(
+                    config_mismatch(snapshot[conn], restored.get(conn)))
+            else:
+                res["rolled_back"] = True
+                res["stderr"] = reason
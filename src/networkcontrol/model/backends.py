@@ -0,0 +1,407 @@
+"""
+backends.py
+-----------
+OS access behind one interface, so scans and applies can run (and be
+measured) without Windows.
+
+A backend provides:
+
+    net_if_addrs() / net_if_stats() / net_io_counters()   psutil-shaped results
+    netsh_config(timeout)        parsed ``netsh interface ip show config``
+    descriptions()               {adapter name: hardware description}
+    powershell(script, timeout, cancel)   subprocess.CompletedProcess
+    apply_executor()             executor for ``ApplyEngine``
+
+Implementations:
+- ``SystemBackend`` is the real machine: psutil, netsh, WMI and the
+  PowerShell pool.
+- ``RecordedBackend`` replays a JSON recording captured with
+  ``python -m networkcontrol.model.backends --record FILE``.
+- ``SyntheticBackend`` generates a consistent recording of any size.
+
+The process-wide backend comes from ``get_backend()``. Choose another with
+``configure_backend()`` or the ``NETWORKCONTROL_BACKEND`` variable:
+"synthetic", "synthetic:<adapters>" or the path of a recording.
+"""
+
+import argparse
+import json
+import math
+import os
+import socket
+import subprocess
+import threading
+import time
+from collections import namedtuple
+
+from networkcontrol.model.apply_engine import FakeExecutor, PowerShellExecutor
+from networkcontrol.model.netsh_parser import console_encoding, parse_netsh_config, run_netsh_config
+from networkcontrol.model.powershell_pool import get_pool
+
+# psutil's result shapes, so callers cannot tell a fake from the real thing
+snicaddr = namedtuple("snicaddr", "family address netmask broadcast ptp")
+snicstats = namedtuple("snicstats", "isup duplex speed mtu flags")
+snetio = namedtuple("snetio", "bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout")
+
+DEEP_SCAN_MARKER = "Get-NetIPConfiguration"
+DEEP_QUERY_MARKER = "networkcontrol:deep-query"  # first line of targeted deep queries
+
+
+# ------------------------------------------------------------
+# Real machine
+# ------------------------------------------------------------
+class WmiDescriptionProvider:
+    """
+    Reads {adapter_name: friendly_description} from Win32_NetworkAdapter.
+
+    The WMI connection is opened once per thread and reused; COM objects
+    cannot be shared between apartments, and the monitor worker and GUI
+    thread both scan.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                import pythoncom
+                pythoncom.CoInitialize()
+            except Exception:
+                pass
+            try:
+                import wmi  # pywin32 + COM: loaded on first use, not at startup
+            except ImportError:  # non-Windows hosts (e.g. headless mode on a server)
+                raise RuntimeError("WMI is not available on this platform")
+            conn = wmi.WMI()
+            self._local.conn = conn
+        return conn
+
+    def descriptions(self) -> dict:
+        try:
+            return {
+                nic.NetConnectionID: nic.Name
+                for nic in self._connection().Win32_NetworkAdapter()
+                if nic.NetConnectionID
+            }
+        except Exception:
+            self._local.conn = None  # reconnect next time
+            raise
+
+
+class SystemBackend:
+    name = "system"
+
+    def __init__(self):
+        self._wmi = WmiDescriptionProvider()
+
+    def net_if_addrs(self):
+        import psutil  # deferred so importing the model stays cheap at GUI startup
+        return psutil.net_if_addrs()
+
+    def net_if_stats(self):
+        import psutil
+        return psutil.net_if_stats()
+
+    def net_io_counters(self):
+        import psutil
+        return psutil.net_io_counters(pernic=True)
+
+    def netsh_config(self, timeout: float = None) -> dict:
+        return run_netsh_config(timeout=timeout)
+
+    def descriptions(self) -> dict:
+        return self._wmi.descriptions()
+
+    def powershell(self, script: str, timeout: float = 15, cancel=None) -> subprocess.CompletedProcess:
+        return get_pool().run(script, timeout=timeout, cancel=cancel)
+
+    def apply_executor(self):
+        return PowerShellExecutor()
+
+
+# ------------------------------------------------------------
+# Recorded / synthetic
+# ------------------------------------------------------------
+class RecordedBackend:
+    """
+    Serves a recording:
+
+        {"net_if_addrs": {name: [[family, address, netmask, broadcast, ptp], ...]},
+         "net_if_stats": {name: [isup, duplex, speed, mtu, flags]},
+         "net_io_counters": {name: [bytes_sent, bytes_recv, ...]},
+         "netsh": "<netsh interface ip show config output>",
+         "descriptions": {name: description},
+         "deep_scan": "<Get-NetIPConfiguration JSON>"}
+
+    ``latency`` ({"netsh": s, "wmi": s, "powershell": s}) adds simulated
+    per-call delays. Applies go to a ``FakeExecutor`` seeded from the
+    recorded netsh config.
+    """
+
+    name = "recorded"
+
+    def __init__(self, recording: dict, latency: dict = None):
+        self.recording = recording
+        self.latency = latency or {}
+        self._addrs = {
+            name: [snicaddr(*entry) for entry in entries]
+            for name, entries in recording.get("net_if_addrs", {}).items()
+        }
+        self._stats = {name: snicstats(*entry) for name, entry in recording.get("net_if_stats", {}).items()}
+        self._io = {name: snetio(*entry) for name, entry in recording.get("net_io_counters", {}).items()}
+        self._executor = None
+
+    @classmethod
+    def load(cls, path, latency: dict = None):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), latency=latency)
+
+    def _delay(self, source):
+        seconds = self.latency.get(source)
+        if seconds:
+            time.sleep(seconds)
+
+    def net_if_addrs(self):
+        return self._addrs
+
+    def net_if_stats(self):
+        return self._stats
+
+    def net_io_counters(self):
+        return self._io
+
+    def netsh_config(self, timeout: float = None) -> dict:
+        self._delay("netsh")
+        return parse_netsh_config(self.recording.get("netsh", ""))
+
+    def descriptions(self) -> dict:
+        self._delay("wmi")
+        return dict(self.recording.get("descriptions", {}))
+
+    def powershell(self, script: str, timeout: float = 15, cancel=None) -> subprocess.CompletedProcess:
+        self._delay("powershell")
+        # Targeted deep queries get the full answer too; callers keep only what they asked for
+        deep = DEEP_SCAN_MARKER in script or DEEP_QUERY_MARKER in script
+        stdout = self.recording.get("deep_scan", "") if deep else ""
+        return subprocess.CompletedProcess(script, 0, stdout, "")
+
+    def apply_executor(self):
+        if self._executor is None:
+            configs = {}
+            for name, adapter in self.netsh_config().items():
+                if adapter["dhcp"] or not adapter["ips"]:
+                    configs[name] = {"mode": "DHCP"}
+                else:
+                    configs[name] = {
+                        "mode": "Static",
+                        "ip": adapter["ips"][0],
+                        "subnet": _netsh_prefix(adapter["subnets"][0]) if adapter["subnets"] else "24",
+                        "gateway": adapter["gateways"][0] if adapter["gateways"] else "",
+                        "addresses": [
+                            f"{ip}/{_netsh_prefix(subnet)}"
+                            for ip, subnet in zip(adapter["ips"][1:], adapter["subnets"][1:])
+                        ],
+                    }
+            self._executor = FakeExecutor(configs)
+        return self._executor
+
+
+def _netsh_prefix(subnet: str) -> str:
+    """'10.0.0.0/24 (mask 255.255.255.0)' -> '24'."""
+    return subnet.split("/", 1)[1].split()[0] if "/" in subnet else subnet
+
+
+def synthetic_recording(adapters: int = 10) -> dict:
+    """
+    A consistent recording with ``adapters`` physical-looking NICs.
+
+    Every 3rd is DHCP and every 5th is down. Every 4th is dual-stack (a
+    global IPv6 address and an IPv6 gateway), and every 10th has a second
+    IPv4 address. All have an IPv6 link-local address. Loopback, virtual and
+    Bluetooth extras are added so the classifier has work to do.
+    """
+    names = [f"Ethernet {i}" for i in range(adapters)]
+    extras = {
+        "Loopback Pseudo-Interface 1": ("127.0.0.1", "255.0.0.0", "Software Loopback Interface 1"),
+        "vEthernet (Default Switch)": ("172.30.0.1", "255.255.240.0", "Hyper-V Virtual Ethernet Adapter"),
+        "Bluetooth Network Connection": ("169.254.10.1", "255.255.0.0", "Bluetooth Device (Personal Area Network)"),
+    }
+    addrs, stats, io, descriptions, netsh, deep = {}, {}, {}, {}, [], []
+
+    for i, name in enumerate(names):
+        octets = f"10.{i // 250 % 256}.{i % 250}"
+        ip, gateway, dhcp = f"{octets}.10", f"{octets}.1", i % 3 == 0
+        origin = "Dhcp" if dhcp else "Manual"
+        ipv4 = [ip] + ([f"{octets}.11"] if i % 10 == 9 else [])
+        ipv6 = [f"2001:db8:{i:x}::10"] if i % 4 == 3 else []
+        link_local = f"fe80::{i + 1:x}"
+        addrs[name] = (
+            [[socket.AF_INET, a, "255.255.255.0", None, None] for a in ipv4]
+            + [[socket.AF_INET6, a, "ffff:ffff:ffff:ffff::", None, None] for a in ipv6]
+            + [[socket.AF_INET6, f"{link_local}%{i + 2}", "ffff:ffff:ffff:ffff::", None, None]]
+        )
+        stats[name] = [i % 5 != 4, 2, 1000, 1500, "up,broadcast,running,multicast"]
+        io[name] = [1000 * (i + 1), 5000 * (i + 1), 10 * (i + 1), 50 * (i + 1), 0, 0, 0, 0]
+        descriptions[name] = f"Synthetic Gigabit Adapter #{i}"
+        netsh += [
+            f'Configuration for interface "{name}"',
+            f"    DHCP enabled:                         {'Yes' if dhcp else 'No'}",
+        ]
+        for a in ipv4:
+            netsh += [
+                f"    IP Address:                           {a}",
+                f"    Subnet Prefix:                        {octets}.0/24 (mask 255.255.255.0)",
+            ]
+        netsh += [
+            f"    Default Gateway:                      {gateway}",
+        ] + (["                                          fe80::1"] if ipv6 else []) + [
+            "    Gateway Metric:                       0",
+            "    InterfaceMetric:                      25",
+            "",
+        ]
+        deep.append({
+            "InterfaceAlias": name,
+            "InterfaceDescription": descriptions[name],
+            "DHCP": "DHCP" if dhcp else "Static",
+            "Addresses": (
+                [{"IPAddress": a, "PrefixLength": 24, "PrefixOrigin": origin} for a in ipv4]
+                + [{"IPAddress": a, "PrefixLength": 64, "PrefixOrigin": "RouterAdvertisement"} for a in ipv6]
+                + [{"IPAddress": link_local, "PrefixLength": 64, "PrefixOrigin": "WellKnown"}]
+            ),
+            "Gateways": [gateway] + (["fe80::1"] if ipv6 else []),
+        })
+
+    for name, (ip, mask, description) in extras.items():
+        addrs[name] = [[socket.AF_INET, ip, mask, None, None]]
+        stats[name] = [True, 0, 0, 1500, "up,running"]
+        io[name] = [0, 0, 0, 0, 0, 0, 0, 0]
+        descriptions[name] = description
+        deep.append({"InterfaceAlias": name, "InterfaceDescription": description, "DHCP": "Static",
+                     "Addresses": [{"IPAddress": ip, "PrefixLength": 24, "PrefixOrigin": "Manual"}],
+                     "Gateways": []})
+
+    return {
+        "net_if_addrs": addrs,
+        "net_if_stats": stats,
+        "net_io_counters": io,
+        "netsh": "\n".join(netsh),
+        "descriptions": descriptions,
+        "deep_scan": json.dumps(deep, indent=2),
+    }
+
+
+class SyntheticBackend(RecordedBackend):
+    """
+    ``RecordedBackend`` over ``synthetic_recording(adapters)``.
+
+    Its I/O counters keep moving: adapter ``i`` receives about (i + 1)
+    KB/s and sends a fifth of that, with a little jitter. Down adapters
+    stay idle. The throughput columns therefore have something to show.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, adapters: int = 10, latency: dict = None, clock=time.monotonic):
+        super().__init__(synthetic_recording(adapters), latency=latency)
+        self.adapters = adapters
+        self._clock = clock
+        self._started = clock()
+
+    def net_io_counters(self):
+        elapsed = self._clock() - self._started
+        wobble = 1 + 0.25 * math.sin(elapsed / 3)
+        counters = {}
+        for index, (name, base) in enumerate(self._io.items()):
+            if not self._stats[name].isup or not base.bytes_recv:
+                counters[name] = base
+                continue
+            rx = int(elapsed * 1024 * (index + 1) * wobble)
+            counters[name] = base._replace(
+                bytes_recv=base.bytes_recv + rx,
+                bytes_sent=base.bytes_sent + rx // 5,
+                packets_recv=base.packets_recv + rx // 800,
+                packets_sent=base.packets_sent + rx // 4000,
+                dropin=base.dropin + int(elapsed) // 30,
+            )
+        return counters
+
+
+# ------------------------------------------------------------
+# Recording the real machine
+# ------------------------------------------------------------
+def record(backend=None) -> dict:
+    """Capture a backend's current answers as a recording (see ``RecordedBackend``)."""
+    backend = backend or SystemBackend()
+    from networkcontrol.model.network_model import DEEP_SCAN_SCRIPT
+
+    def _safe(fn, default):
+        try:
+            return fn()
+        except Exception:
+            return default
+
+    netsh = ""
+    if isinstance(backend, RecordedBackend):
+        netsh = backend.recording.get("netsh", "")
+    else:
+        netsh = _safe(lambda: subprocess.run(
+            ["netsh", "interface", "ip", "show", "config"], capture_output=True, timeout=15,
+            text=True, encoding=console_encoding(), errors="ignore",
+        ).stdout, "")
+
+    return {
+        "net_if_addrs": {name: [list(a) for a in addrs] for name, addrs in backend.net_if_addrs().items()},
+        "net_if_stats": {name: list(s) for name, s in backend.net_if_stats().items()},
+        "net_io_counters": _safe(lambda: {n: list(c) for n, c in backend.net_io_counters().items()}, {}),
+        "netsh": netsh,
+        "descriptions": _safe(backend.descriptions, {}),
+        "deep_scan": _safe(lambda: backend.powershell(DEEP_SCAN_SCRIPT, timeout=30).stdout, ""),
+    }
+
+
+# ------------------------------------------------------------
+# Process-wide backend
+# ------------------------------------------------------------
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _from_environment():
+    spec = os.environ.get("NETWORKCONTROL_BACKEND", "").strip()
+    if not spec or spec == "system":
+        return SystemBackend()
+    if spec.startswith("synthetic"):
+        _, _, size = spec.partition(":")
+        return SyntheticBackend(int(size) if size else 10)
+    return RecordedBackend.load(spec)
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _from_environment()
+        return _backend
+
+
+def configure_backend(backend=None):
+    """Replace the process-wide backend (None re-reads ``NETWORKCONTROL_BACKEND``)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend if backend is not None else _from_environment()
+        return _backend
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m networkcontrol.model.backends")
+    parser.add_argument("--record", metavar="FILE", required=True,
+                        help="capture this machine's answers into FILE for RecordedBackend")
+    args = parser.parse_args(argv)
+    with open(args.record, "w", encoding="utf-8") as f:
+        json.dump(record(get_backend()), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
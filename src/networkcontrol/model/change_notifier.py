@@ -0,0 +1,222 @@
+"""
+change_notifier.py
+------------------
+OS notifications for address and link-state changes.
+
+The monitor worker blocks in ``wait_for_change()`` instead of sleeping, so
+it rescans as soon as the OS reports a change and otherwise stays idle.
+Backends:
+
+    IpHelperNotifier   Windows, NotifyIpInterfaceChange / NotifyUnicastIpAddressChange
+    NetlinkNotifier    Linux, rtnetlink multicast groups (link, address, route)
+    PollingNotifier    Anywhere; never reports changes, so callers fall back to polling
+
+Bursts (e.g. DHCP renew touching address, route and link at once) are
+coalesced: after the first event we keep draining until the OS has been
+quiet for ``debounce`` seconds, capped at ``max_delay``.
+"""
+
+import select
+import socket
+import sys
+import threading
+import time
+
+
+class ChangeNotifier:
+    """Base class; subclasses implement ``_wait_event`` and ``wake``."""
+
+    #: True if this backend cannot see changes and the caller must poll
+    polling = False
+
+    def __init__(self, debounce: float = 0.1, max_delay: float = 1.0):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.events = 0    # raw OS notifications seen
+        self.changes = 0   # coalesced changes reported to the caller
+
+    def _wait_event(self, timeout: float) -> bool:
+        """Block up to ``timeout``; True if the OS reported a change."""
+        raise NotImplementedError
+
+    def wait_for_change(self, timeout: float) -> bool:
+        """
+        Block until a (debounced) change, ``wake()`` or ``timeout``.
+
+        Returns:
+            bool: True if a change was observed
+        """
+        if not self._wait_event(timeout):
+            return False
+
+        deadline = time.monotonic() + self.max_delay
+        while True:
+            remaining = min(self.debounce, deadline - time.monotonic())
+            if remaining <= 0 or not self._wait_event(remaining):
+                break
+        self.changes += 1
+        return True
+
+    def wake(self):
+        """Make a blocked ``wait_for_change()`` return immediately."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# ------------------------------------------------------------
+# Fallback: plain timer
+# ------------------------------------------------------------
+class PollingNotifier(ChangeNotifier):
+    polling = True
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._event = threading.Event()
+
+    def _wait_event(self, timeout):
+        self._event.wait(timeout)
+        self._event.clear()
+        return False
+
+    def wake(self):
+        self._event.set()
+
+
+# ------------------------------------------------------------
+# Linux: rtnetlink
+# ------------------------------------------------------------
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+
+
+class NetlinkNotifier(ChangeNotifier):
+    GROUPS = RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV4_ROUTE | RTMGRP_IPV6_IFADDR | RTMGRP_IPV6_ROUTE
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        self._sock.bind((0, self.GROUPS))
+        self._sock.setblocking(False)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+
+    @staticmethod
+    def _drain(sock) -> int:
+        count = 0
+        while True:
+            try:
+                if not sock.recv(65536):
+                    return count
+            except (BlockingIOError, InterruptedError):
+                return count
+            except OSError:
+                # ENOBUFS: we fell behind; the kernel dropped events, which still means "changed"
+                return count + 1
+            count += 1
+
+    def _wait_event(self, timeout):
+        try:
+            ready, _, _ = select.select([self._sock, self._wake_r], [], [], max(0.0, timeout))
+        except (OSError, ValueError):
+            return False  # closed under us
+        if self._wake_r in ready:
+            self._drain(self._wake_r)
+            return False
+        if self._sock in ready:
+            received = self._drain(self._sock)
+            self.events += received
+            return received > 0
+        return False
+
+    def wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+
+    def close(self):
+        for sock in (self._sock, self._wake_r, self._wake_w):
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+
+# ------------------------------------------------------------
+# Windows: IP Helper change callbacks
+# ------------------------------------------------------------
+class IpHelperNotifier(ChangeNotifier):
+    AF_UNSPEC = 0
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        import ctypes
+        from ctypes import wintypes
+
+        self._ctypes = ctypes
+        self._iphlpapi = ctypes.WinDLL("iphlpapi")
+        self._event = threading.Event()
+        self._woken = False
+        self._handles = []
+
+        callback_type = ctypes.WINFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int)
+        self._callback = callback_type(self._on_notify)  # keep a reference for the OS
+
+        for register in (self._iphlpapi.NotifyIpInterfaceChange, self._iphlpapi.NotifyUnicastIpAddressChange):
+            register.argtypes = [
+                ctypes.c_ushort, callback_type, ctypes.c_void_p, ctypes.c_ubyte, ctypes.POINTER(wintypes.HANDLE)
+            ]
+            handle = wintypes.HANDLE()
+            rc = register(self.AF_UNSPEC, self._callback, None, 0, ctypes.byref(handle))
+            if rc != 0:
+                self.close()
+                raise OSError(rc, f"{register.__name__} failed")
+            self._handles.append(handle)
+
+    def _on_notify(self, context, row, notification_type):
+        self.events += 1
+        self._event.set()
+
+    def _wait_event(self, timeout):
+        fired = self._event.wait(max(0.0, timeout))
+        self._event.clear()
+        if self._woken:
+            self._woken = False
+            return False
+        return fired
+
+    def wake(self):
+        self._woken = True
+        self._event.set()
+
+    def close(self):
+        for handle in self._handles:
+            try:
+                self._iphlpapi.CancelMibChangeNotify2(handle)
+            except Exception:
+                pass
+        self._handles = []
+
+
+# ------------------------------------------------------------
+# Factory
+# ------------------------------------------------------------
+def create_notifier(**kwargs) -> ChangeNotifier:
+    """Best available backend for this platform, falling back to polling."""
+    backend = None
+    if sys.platform == "win32":
+        backend = IpHelperNotifier
+    elif sys.platform.startswith("linux"):
+        backend = NetlinkNotifier
+
+    if backend is not None:
+        try:
+            return backend(**kwargs)
+        except Exception:
+            pass
+    return PollingNotifier(**kwargs)
@@ -0,0 +1,169 @@
+"""
+classifier.py
+-------------
+Shared adapter classification for the fast and deep scans.
+
+Rules map category names to regex fragments matched (case-insensitively)
+against each adapter's name and description. Each category's fragments
+are compiled into one alternation, and a whole scan is classified with
+one ``finditer`` pass per category over the joined names/descriptions, so
+hosts with hundreds of virtual NICs cost a few regex sweeps rather than
+nested loops. (A single alternation across categories would miss tags:
+its matches cannot overlap.)
+
+Every adapter gets a "category" (first matching category in rule order,
+else "physical") and "tags" (all matching categories). Adapters tagged
+with an excluded category are dropped unless an include pattern matches.
+
+Rules can be overridden by a JSON file with the same shape as
+``DEFAULT_RULES``, named by ``NETWORKCONTROL_RULES`` or found at
+``~/.networkcontrol/classify.json``. A file that cannot be read, parsed
+or compiled is logged and ignored: a typo in it must not break scans.
+"""
+
+import bisect
+import json
+import logging
+import os
+import re
+from pathlib import Path
+
+from networkcontrol.model import instrumentation
+
+log = logging.getLogger(__name__)
+
+DEFAULT_RULES = {
+    "categories": [
+        # Only the OS loopback itself: Teredo / 6to4 are "Pseudo-Interface"s too, and are tunnels
+        ["loopback", ["^loopback pseudo-interface", "^software loopback interface", "^lo\\d*$"]],
+        ["bluetooth", ["bluetooth"]],
+        ["virtual", ["virtual", "vmware", "hyper-v", "vethernet", "virtualbox", "docker", "^veth", "^virbr",
+                     "km-test loopback"]],
+        ["tunnel", ["tunnel", "teredo", "isatap", "6to4", "tap-windows", "wireguard", "openvpn", "^tun", "^tap"]],
+        ["wireless", ["wi-fi", "wifi", "wireless", "wlan", "802\\.11"]],
+    ],
+    "exclude": ["loopback", "bluetooth", "virtual"],
+    "include": [],
+}
+
+DEFAULT_CATEGORY = "physical"
+
+
+def rules_path() -> Path:
+    env = os.environ.get("NETWORKCONTROL_RULES")
+    return Path(env) if env else Path.home() / ".networkcontrol" / "classify.json"
+
+
+def load_rules(path=None) -> dict:
+    """Read user rules, falling back to ``DEFAULT_RULES`` if absent or not valid JSON (see ``load_classifier``)."""
+    path = Path(path) if path else rules_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            user = json.load(f)
+        if not isinstance(user, dict):
+            raise ValueError("expected a JSON object")
+    except FileNotFoundError:
+        return DEFAULT_RULES
+    except Exception as e:
+        log.warning("Ignoring classifier rules in %s: %s", path, e)
+        return DEFAULT_RULES
+    return {key: user.get(key, DEFAULT_RULES[key]) for key in DEFAULT_RULES}
+
+
+def load_classifier(path=None) -> "Classifier":
+    """Classifier for the user's rules, or for ``DEFAULT_RULES`` if those do not compile."""
+    rules = load_rules(path)
+    try:
+        return Classifier(rules)
+    except (re.error, TypeError, ValueError) as e:
+        log.warning("Ignoring classifier rules in %s: %s", Path(path) if path else rules_path(), e)
+        return Classifier(DEFAULT_RULES)
+
+
+class Classifier:
+    """Compiled form of a rules dict; see module docstring."""
+
+    def __init__(self, rules=None):
+        rules = rules or DEFAULT_RULES
+        self.categories = [name for name, _ in rules["categories"]]
+        self.exclude = frozenset(rules.get("exclude", ()))
+
+        self._patterns = [
+            (name, re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE | re.MULTILINE))
+            for name, patterns in rules["categories"]
+            if patterns
+        ]
+        include = rules.get("include") or []
+        self._include = re.compile("|".join(f"(?:{p})" for p in include), re.IGNORECASE | re.MULTILINE) if include else None
+
+    def tags_for(self, names_and_descriptions) -> list:
+        """
+        Tag many adapters in one pass.
+
+        Args:
+            names_and_descriptions: sequence of (name, description)
+
+        Returns:
+            list: one set of category names per adapter
+        """
+        lines = []
+        for name, desc in names_and_descriptions:
+            lines.append(name or "")
+            lines.append(desc or "")
+        text = "\n".join(lines)
+
+        # Offset of each line so a match position maps back to its adapter
+        starts, pos = [], 0
+        for line in lines:
+            starts.append(pos)
+            pos += len(line) + 1
+
+        tags = [set() for _ in range(len(lines) // 2)]
+        for category, pattern in self._patterns:
+            for m in pattern.finditer(text):
+                adapter = (bisect.bisect_right(starts, m.start()) - 1) // 2
+                tags[adapter].add(category)
+        return tags
+
+    @instrumentation.timed("classify")
+    def classify(self, interfaces, keep_excluded: bool = False) -> list:
+        """
+        Add "category" and "tags" to each interface dict and drop excluded ones.
+
+        Returns:
+            list: the kept interfaces (same dict objects, in order)
+        """
+        all_tags = self.tags_for([(i.get("connection", ""), i.get("description", "")) for i in interfaces])
+        kept = []
+        for iface, tags in zip(interfaces, all_tags):
+            iface["tags"] = sorted(tags)
+            iface["category"] = next((c for c in self.categories if c in tags), DEFAULT_CATEGORY)
+            if tags & self.exclude and not keep_excluded and not self._included(iface):
+                continue
+            kept.append(iface)
+        return kept
+
+    def _included(self, iface) -> bool:
+        if self._include is None:
+            return False
+        return bool(
+            self._include.search(iface.get("connection", "") or "")
+            or self._include.search(iface.get("description", "") or "")
+        )
+
+
+_classifier = None
+
+
+def get_classifier() -> Classifier:
+    """Process-wide classifier built from the user's rules file on first use."""
+    global _classifier
+    if _classifier is None:
+        _classifier = load_classifier()
+    return _classifier
+
+
+def reload_rules(path=None) -> Classifier:
+    global _classifier
+    _classifier = load_classifier(path)
+    return _classifier
@@ -0,0 +1,89 @@
+"""
+fake_shell.py
+-------------
+Stand-in PowerShell host speaking the ``powershell_pool`` wire protocol.
+
+Lets the pool, the scan and the apply code run on machines without
+PowerShell (e.g. Linux CI):
+
+    from networkcontrol.model.powershell_pool import configure_pool
+    configure_pool(command=[sys.executable, "-m", "networkcontrol.model.fake_shell"])
+
+Understood scripts:
+    Write-Output <text>          -> stdout "<text>"
+    Start-Sleep -Seconds <n>     -> sleeps (also -Milliseconds)
+    throw <message>              -> returncode 1, stderr "<message>"
+    exit                         -> host process exits without replying
+
+Canned replies for anything else are read from the JSON file named by
+``NETWORKCONTROL_FAKE_RESPONSES``: ``{"<substring of script>": "<stdout>"}``.
+Unknown scripts succeed with empty output.
+"""
+
+import base64
+import json
+import os
+import sys
+import time
+
+
+def _encode(text: str) -> str:
+    return base64.b64encode(text.encode("utf-8")).decode("ascii") if text else "-"
+
+
+def _load_responses() -> dict:
+    path = os.environ.get("NETWORKCONTROL_FAKE_RESPONSES")
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def execute(script: str, responses: dict):
+    """Return (returncode, stdout, stderr) for one script, or None to exit."""
+    for needle, reply in responses.items():
+        if needle in script:
+            return 0, reply, ""
+
+    words = script.strip().split(None, 1)
+    verb = words[0].lower() if words else ""
+    arg = words[1].strip().strip("'\"") if len(words) > 1 else ""
+
+    if verb == "exit":
+        return None
+    if verb == "write-output":
+        return 0, arg + "\n", ""
+    if verb == "throw":
+        return 1, "", arg
+    if verb == "start-sleep":
+        unit, _, amount = arg.partition(" ")
+        seconds = float(amount or 0)
+        if unit.lower().startswith("-m"):
+            seconds /= 1000
+        time.sleep(seconds)
+        return 0, "", ""
+    return 0, "", ""
+
+
+def main():
+    responses = _load_responses()
+    for line in sys.stdin:
+        parts = line.rstrip("\r\n").split(" ", 1)
+        if len(parts) != 2:
+            continue
+        token, payload = parts
+        script = "" if payload == "-" else base64.b64decode(payload).decode("utf-8")
+
+        outcome = execute(script, responses)
+        if outcome is None:
+            sys.exit(3)
+        rc, out, err = outcome
+        sys.stdout.write(f"{token} {rc} {_encode(out)} {_encode(err)}\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+fleet.py
+--------
+Fleet console client: scan and configure many hosts running the agent
+(``python -m networkcontrol --agent``, see ``agent.py``).
+
+Everything runs on one asyncio event loop, with no thread per host. Each
+host has one persistent TCP connection. Requests on it are multiplexed by
+id, and a per-host semaphore bounds how many run at once. A global
+semaphore caps how many connections are being opened at the same time.
+Results stream back per host as they complete.
+
+Fleet rows reuse the local interface dict shape. Their "connection" is
+``fleet_key(host, adapter)``, so rows sort and group by host in the table,
+and ``split_fleet_key()`` recovers the host and adapter for apply.
+
+The shared token never goes on the wire. The agent greets each connection
+with a random nonce, and every request carries ``sign(token, nonce,
+request)``, an HMAC-SHA256 over the nonce and the request. Request ids
+must increase on a connection, so a captured request cannot be replayed.
+Signing authenticates but does not encrypt; pass ``tls_ca`` (the agent's
+certificate or its CA) to also run the connection over TLS.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import ssl
+
+FLEET_SEPARATOR = " ▸ "
+DEFAULT_AGENT_PORT = 47800
+MAX_LINE = 1 << 20  # longest NDJSON message either side accepts
+
+
+class FleetError(Exception):
+    """A host could not be reached, timed out, or returned an error."""
+
+
+def fleet_key(host: str, adapter: str) -> str:
+    return f"{host}{FLEET_SEPARATOR}{adapter}"
+
+
+def split_fleet_key(key: str):
+    """Inverse of ``fleet_key``: returns (host, adapter)."""
+    host, _, adapter = key.partition(FLEET_SEPARATOR)
+    return host, adapter
+
+
+def parse_hosts(lines) -> list:
+    """
+    Read "host[:port]" entries, one per line; blank lines and # comments are skipped.
+
+    Returns:
+        list: (host, port) tuples, de-duplicated, in order
+    """
+    hosts = []
+    for line in lines:
+        entry = line.split("#", 1)[0].strip()
+        if not entry:
+            continue
+        if entry.startswith("["):  # [IPv6]:port
+            host, _, port = entry[1:].partition("]")
+            port = port.lstrip(":")
+        elif entry.count(":") == 1:
+            host, _, port = entry.partition(":")
+        else:
+            host, port = entry, ""
+        item = (host, int(port) if port else DEFAULT_AGENT_PORT)
+        if item not in hosts:
+            hosts.append(item)
+    return hosts
+
+
+def host_label(host: str, port: int) -> str:
+    return host if port == DEFAULT_AGENT_PORT else f"{host}:{port}"
+
+
+def sign(token: str, nonce: str, message: dict) -> str:
+    """HMAC-SHA256, keyed by ``token``, of the connection nonce and ``message`` without its "mac"."""
+    body = {key: value for key, value in message.items() if key != "mac"}
+    data = nonce + json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hmac.new(token.encode("utf-8"), data.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+# ------------------------------------------------------------
+# Connection to one agent
+# ------------------------------------------------------------
+class AgentConnection:
+    """
+    One persistent, lazily (re)opened connection to an agent.
+
+    Args:
+        token (str): shared secret used to sign requests (None = unsigned)
+        tls_ca (str): CA or certificate file to verify the agent with; enables TLS
+        limit (int): requests allowed in flight on this host at once
+        connect_gate (asyncio.Semaphore): shared cap on simultaneous connects
+    """
+
+    def __init__(self, host: str, port: int = DEFAULT_AGENT_PORT, token: str = None,
+                 timeout: float = 10.0, limit: int = 1, connect_gate=None, tls_ca: str = None):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.tls_ca = tls_ca
+        self.timeout = timeout
+        self.label = host_label(host, port)
+        self._limit = asyncio.Semaphore(limit)
+        self._connect_gate = connect_gate
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._reader = None
+        self._writer = None
+        self._nonce = None
+        self._reader_task = None
+        self._connecting = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def _connect(self):
+        async with self._connecting:
+            if self.connected:
+                return
+            gate = self._connect_gate or _NullGate()
+            async with gate:
+                self._reader, self._writer, self._nonce = await asyncio.wait_for(self._open(), self.timeout)
+            self._reader_task = asyncio.ensure_future(self._read_loop(self._reader))
+
+    async def _open(self):
+        """Connect and read the agent's greeting; returns (reader, writer, nonce)."""
+        context = ssl.create_default_context(cafile=self.tls_ca) if self.tls_ca else None
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=MAX_LINE, ssl=context)
+        try:
+            hello = json.loads(await reader.readline())
+            if not isinstance(hello, dict) or hello.get("type") != "hello":
+                raise ValueError("no greeting")
+        except ValueError:
+            writer.close()
+            raise FleetError(f"{self.label}: not a networkcontrol agent")
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer, str(hello.get("nonce", ""))
+
+    async def _read_loop(self, reader):
+        error = FleetError(f"{self.label}: connection closed")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = json.loads(line)
+                future = self._pending.pop(reply.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except (ConnectionError, ValueError) as e:
+            error = FleetError(f"{self.label}: {e}")
+        finally:
+            if reader is self._reader:  # not superseded by a reconnect
+                self._drop(error)
+
+    def _drop(self, error):
+        """Fail everything still waiting on this connection and forget it."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = self._nonce = None
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def request(self, message: dict, timeout: float = None) -> dict:
+        """
+        Send one request and wait for its reply.
+
+        Raises:
+            FleetError: unreachable, timed out, or the agent replied with an error
+        """
+        timeout = timeout or self.timeout
+        request_id = None
+        async with self._limit:
+            try:
+                if not self.connected:
+                    await self._connect()
+                request_id = next(self._ids)
+                future = asyncio.get_running_loop().create_future()
+                self._pending[request_id] = future
+                payload = {**message, "id": request_id}
+                if self.token is not None:
+                    payload["mac"] = sign(self.token, self._nonce, payload)
+                self._writer.write((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+                await self._writer.drain()
+                reply = await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                self._pending.pop(request_id, None)
+                raise FleetError(f"{self.label}: timed out after {timeout:g}s")
+            except (OSError, ConnectionError) as e:
+                self._drop(FleetError(f"{self.label}: {e}"))
+                raise FleetError(f"{self.label}: {e.strerror or e}")
+        if reply.get("type") == "error":
+            raise FleetError(f"{self.label}: {reply.get('message')}")
+        return reply
+
+    async def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        self._drop(FleetError(f"{self.label}: closed"))
+
+
+class _NullGate:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+# ------------------------------------------------------------
+# Fleet
+# ------------------------------------------------------------
+class FleetPool:
+    """
+    Connections to every host in the fleet. Must be used from one event loop.
+
+    Args:
+        hosts (list): (host, port) tuples, see ``parse_hosts``
+        per_host_limit (int): concurrent requests per host
+        max_connecting (int): simultaneous connection attempts across the fleet
+        timeout (float): per-request timeout (deep scans get 3x)
+        token, tls_ca: see ``AgentConnection``
+    """
+
+    def __init__(self, hosts, token: str = None, timeout: float = 10.0, per_host_limit: int = 1,
+                 max_connecting: int = 64, tls_ca: str = None):
+        gate = asyncio.Semaphore(max_connecting)
+        self.timeout = timeout
+        self.connections = {}
+        for host, port in hosts:
+            conn = AgentConnection(host, port, token=token, timeout=timeout, limit=per_host_limit, connect_gate=gate,
+                                   tls_ca=tls_ca)
+            self.connections[conn.label] = conn
+
+    async def _stream(self, jobs):
+        """Run {label: coroutine} concurrently, yielding (label, result | FleetError) as each completes."""
+        async def _run(label, coro):
+            try:
+                return label, await coro
+            except FleetError as e:
+                return label, e
+            except Exception as e:
+                return label, FleetError(f"{label}: {e}")
+
+        for next_done in asyncio.as_completed([_run(label, coro) for label, coro in jobs.items()]):
+            yield await next_done
+
+    async def scan(self, deep: bool = False, hosts=None):
+        """
+        Scan every host (or the labels in ``hosts``).
+
+        Yields:
+            dict: {"host", "interfaces"} or {"host", "error"}, in completion order
+        """
+        timeout = self.timeout * 3 if deep else self.timeout
+        jobs = {
+            label: conn.request({"type": "scan", "deep": deep}, timeout=timeout)
+            for label, conn in self.connections.items()
+            if hosts is None or label in hosts
+        }
+        async for label, outcome in self._stream(jobs):
+            if isinstance(outcome, FleetError):
+                yield {"host": label, "error": str(outcome)}
+            else:
+                yield {"host": label, "interfaces": outcome.get("interfaces", [])}
+
+    async def apply(self, changes: list):
+        """
+        Apply fleet changes (their "connection" is a ``fleet_key``), one transaction per host.
+
+        Yields:
+            dict: {"host", "results"} or {"host", "error", "changes"}, in completion order
+        """
+        by_host = {}
+        for change in changes:
+            host, adapter = split_fleet_key(change["connection"])
+            by_host.setdefault(host, []).append({**change, "connection": adapter})
+
+        jobs = {}
+        for label, host_changes in by_host.items():
+            conn = self.connections.get(label)
+            if conn is None:
+                yield {"host": label, "error": f"{label}: not in the fleet", "changes": host_changes}
+                continue
+            # Transactions verify and may roll back, so allow them longer than a scan
+            jobs[label] = conn.request({"type": "apply", "changes": host_changes}, timeout=self.timeout * 6)
+
+        async for label, outcome in self._stream(jobs):
+            if isinstance(outcome, FleetError):
+                yield {"host": label, "error": str(outcome), "changes": by_host[label]}
+            else:
+                yield {"host": label, "results": outcome.get("results", [])}
+
+    async def close(self):
+        await asyncio.gather(*(conn.close() for conn in self.connections.values()))
+
+
+def fleet_rows(host: str, interfaces: list) -> list:
+    """Copies of a host's interface dicts keyed by ``fleet_key``."""
+    return [{**iface, "connection": fleet_key(host, iface.get("connection", "—"))} for iface in interfaces]
+
+
+def fleet_apply_results(outcome: dict) -> list:
+    """Flatten one ``FleetPool.apply`` item into per-adapter results keyed by ``fleet_key``."""
+    host = outcome["host"]
+    if "error" in outcome:
+        return [
+            {"connection": fleet_key(host, change["connection"]), "success": False, "command": "",
+             "stdout": "", "stderr": outcome["error"], "verified": False, "rolled_back": False}
+            for change in outcome["changes"]
+        ]
+    return [{**res, "connection": fleet_key(host, res.get("connection", ""))} for res in outcome["results"]]
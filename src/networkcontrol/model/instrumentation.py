@@ -0,0 +1,219 @@
+"""
+instrumentation.py
+------------------
+Lightweight timers and counters for the scan, apply and table hot paths.
+
+    @timed("scan.fast")              # decorator
+    with span("subprocess.netsh"):   # block
+    record("scan.source.wmi", ms)    # already-measured duration
+    count("wmi.cache.hit")           # counter
+
+Every timer keeps a rolling window of recent durations, giving p50/p95,
+plus a bounded buffer of trace events. ``snapshot()`` feeds the diagnostics
+dock. ``export_json()`` and ``export_chrome_trace()`` write files; open the
+latter in chrome://tracing or https://ui.perfetto.dev.
+
+Off by default. While disabled, ``timed`` and ``span`` cost one attribute
+check, so instrumented code runs at full speed. Enable with ``enable()`` or
+``NETWORKCONTROL_PROFILE=1``.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+WINDOW = 512            # durations kept per timer for percentiles
+MAX_TRACE_EVENTS = 20000
+
+
+class _State:
+    enabled = os.environ.get("NETWORKCONTROL_PROFILE") == "1"
+
+
+_state = _State()
+_lock = threading.Lock()
+_timers = {}     # name -> deque of durations (ms)
+_totals = {}     # name -> [count, total_ms, max_ms]
+_counters = {}   # name -> int
+_events = deque(maxlen=MAX_TRACE_EVENTS)
+_epoch = time.perf_counter()
+
+
+def enable(on: bool = True):
+    _state.enabled = on
+
+
+def is_enabled() -> bool:
+    return _state.enabled
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _totals.clear()
+        _counters.clear()
+        _events.clear()
+
+
+# ------------------------------------------------------------
+# Recording
+# ------------------------------------------------------------
+def record(name: str, ms: float, start: float = None):
+    """
+    Add one duration (milliseconds) to timer ``name``.
+
+    Args:
+        start (float): ``time.perf_counter()`` at the start, for the trace timeline
+                       (defaults to ``ms`` before now)
+    """
+    if not _state.enabled:
+        return
+    if start is None:
+        start = time.perf_counter() - ms / 1000
+    with _lock:
+        window = _timers.get(name)
+        if window is None:
+            window = _timers[name] = deque(maxlen=WINDOW)
+            _totals[name] = [0, 0.0, 0.0]
+        window.append(ms)
+        totals = _totals[name]
+        totals[0] += 1
+        totals[1] += ms
+        totals[2] = max(totals[2], ms)
+        _events.append((name, start, ms, threading.get_ident()))
+
+
+def count(name: str, n: int = 1):
+    if not _state.enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, (time.perf_counter() - self.start) * 1000, self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str):
+    """Context manager timing its block as ``name`` (a shared no-op while disabled)."""
+    return _Span(name) if _state.enabled else _NULL_SPAN
+
+
+def timed(name: str):
+    """Decorator timing every call of the function as ``name``."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, (time.perf_counter() - start) * 1000, start)
+        return wrapper
+    return decorate
+
+
+# ------------------------------------------------------------
+# Reporting
+# ------------------------------------------------------------
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def snapshot() -> dict:
+    """
+    Current statistics.
+
+    Returns:
+        dict: {
+            "enabled": bool,
+            "timers": {name: {"count", "total_ms", "mean_ms", "p50_ms", "p95_ms", "max_ms", "last_ms"}},
+            "counters": {name: int}
+        }
+    """
+    with _lock:
+        windows = {name: list(window) for name, window in _timers.items()}
+        totals = {name: list(values) for name, values in _totals.items()}
+        counters = dict(_counters)
+
+    timers = {}
+    for name, window in windows.items():
+        ordered = sorted(window)
+        calls, total, peak = totals[name]
+        timers[name] = {
+            "count": calls,
+            "total_ms": total,
+            "mean_ms": total / calls if calls else 0.0,
+            "p50_ms": _percentile(ordered, 0.50),  # over the last WINDOW samples
+            "p95_ms": _percentile(ordered, 0.95),
+            "max_ms": peak,
+            "last_ms": window[-1] if window else 0.0,
+        }
+    return {"enabled": _state.enabled, "timers": timers, "counters": counters}
+
+
+def export_json(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2, sort_keys=True)
+
+
+def chrome_trace() -> dict:
+    """Trace events in the Chrome trace-event format ("X" complete events, microseconds)."""
+    pid = os.getpid()
+    with _lock:
+        events = list(_events)
+        counters = dict(_counters)
+    trace = [
+        {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": round((start - _epoch) * 1e6, 1),
+            "dur": round(ms * 1000, 1),
+            "pid": pid,
+            "tid": tid,
+        }
+        for name, start, ms, tid in events
+    ]
+    if counters:
+        trace.append({
+            "name": "counters", "ph": "C", "ts": round((time.perf_counter() - _epoch) * 1e6, 1),
+            "pid": pid, "tid": 0, "args": counters,
+        })
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(), f)
@@ -3,24 +3,21 @@ network_apply.py
 ----------------
 Handles applying network adapter configuration changes via PowerShell.
 
-All commands are executed in a subprocess and require Administrator privileges.
+Batches go through the transactional ``ApplyEngine`` (snapshot, apply,
+verify, roll back on failure). All commands are executed on the shared
+PowerShell host pool and require Administrator privileges.
 """
 
-import subprocess
+from networkcontrol.model.apply_engine import ApplyEngine
+from networkcontrol.model.backends import get_backend
+from networkcontrol.model.reconcile import get_reconciler
 
-
-def _mask_to_prefix(mask: str) -> int:
-    """Convert dotted-decimal subnet mask (e.g. 255.255.255.0) → CIDR prefix length (e.g. 24)."""
-    try:
-        return sum(bin(int(x)).count("1") for x in mask.split("."))
-    except Exception:
-        # Fallback to common /24 if something unexpected occurs
-        return 24
+APPLY_FIELDS = ("ip", "subnet", "gateway", "mode")
 
 
 def apply_nic_settings(adapter_name: str, ip: str, subnet: str, gateway: str, mode: str) -> dict:
     """
-    Apply configuration changes to a network adapter.
+    Apply configuration changes to a single network adapter (a one-adapter transaction).
 
     Args:
         adapter_name (str): The Windows interface alias (e.g., "Ethernet", "Wi-Fi")
@@ -34,58 +31,89 @@ def apply_nic_settings(adapter_name: str, ip: str, subnet: str, gateway: str, mo
             "success": bool,
             "command": str,
             "stdout": str,
-            "stderr": str
+            "stderr": str,
+            "verified": bool,
+            "rolled_back": bool
         }
     """
-    mode = (mode or "").strip().upper()
     if not adapter_name:
         return {
             "success": False,
             "command": None,
             "stdout": "",
-            "stderr": "Missing adapter name"
+            "stderr": "Missing adapter name",
+            "verified": False,
+            "rolled_back": False,
         }
+    change = {"connection": adapter_name, "ip": ip, "subnet": subnet, "gateway": gateway, "mode": mode}
+    try:
+        result = ApplyEngine(executor=get_backend().apply_executor()).run([change])[0]
+    finally:
+        _forget_deep_scan([adapter_name])
+    result.pop("connection")
+    return result
 
-    if mode == "DHCP":
-        # Enable DHCP on adapter
-        cmd = f'Set-NetIPInterface -InterfaceAlias "{adapter_name}" -Dhcp Enabled'
-    else:
-        # Convert dotted subnet to prefix length if necessary
-        prefix = subnet
-        if "." in subnet:
-            prefix = _mask_to_prefix(subnet)
-
-        # Configure static IP settings
-        cmd = (
-            f'New-NetIPAddress -InterfaceAlias "{adapter_name}" '
-            f'-IPAddress {ip} -PrefixLength {prefix} -DefaultGateway {gateway} '
-            f'-ErrorAction SilentlyContinue'
-        )
 
+def diff_changes(edited: dict, snapshot: dict, address_ops: dict = None) -> list:
+    """
+    Return the adapters whose edited settings differ from the last scan.
+
+    Args:
+        edited (dict): {connection: {"ip", "subnet", "gateway", "mode"}} read from the table
+        snapshot (dict): {connection: interface dict} from the last scan
+        address_ops (dict): {connection: {"add": [...], "remove": [...]}} extra
+            "address/prefix" entries to add or remove
+
+    Returns:
+        list: change dicts ({"connection", "ip", "subnet", "gateway", "mode"},
+              plus "add_addresses" / "remove_addresses" when given) for adapters
+              with at least one modified field or address operation
+    """
+    address_ops = address_ops or {}
+    changes = []
+    for connection, values in edited.items():
+        before = snapshot.get(connection, {})
+        ops = address_ops.get(connection, {})
+        if ops.get("add") or ops.get("remove") or any(
+                str(values.get(f, "")).strip() != str(before.get(f, "")).strip() for f in APPLY_FIELDS):
+            change = {"connection": connection, **{f: values.get(f, "") for f in APPLY_FIELDS}}
+            if ops.get("add"):
+                change["add_addresses"] = list(ops["add"])
+            if ops.get("remove"):
+                change["remove_addresses"] = list(ops["remove"])
+            changes.append(change)
+    return changes
+
+
+def iter_apply_results(changes: list, max_workers: int = None, executor=None, progress=None):
+    """
+    Apply a batch of adapters as one transaction (see ``apply_engine``).
+
+    Commands go to ``executor`` (defaults to the configured backend's, see
+    ``backends.py``). Adapters are applied in parallel, bounded by
+    ``max_workers`` (defaults to the executor's parallelism). If any adapter fails or does not verify, the
+    whole batch is rolled back, so results are only final once the batch is.
+
+    Yields:
+        dict: ``ApplyEngine.run`` result per adapter, in ``changes`` order
+    """
+    if not changes:
+        return
+    engine = ApplyEngine(executor=executor or get_backend().apply_executor(), max_workers=max_workers)
     try:
-        result = subprocess.run(
-            ["powershell", "-Command", cmd],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            timeout=15
-        )
-        success = result.returncode == 0
+        yield from engine.run(changes, progress=progress)
+    finally:
+        _forget_deep_scan(c["connection"] for c in changes)
 
-        return {
-            "success": success,
-            "command": cmd,
-            "stdout": result.stdout.strip(),
-            "stderr": result.stderr.strip()
-        }
 
-    except Exception as e:
-        return {
-            "success": False,
-            "command": cmd if "cmd" in locals() else "",
-            "stdout": "",
-            "stderr": str(e)
-        }
+def _forget_deep_scan(connections):
+    """
+    Drop the deep scan's view of adapters an apply touched (even one rolled back).
+
+    PowerShell observations stay fresh for minutes; without this the table
+    would keep showing the pre-apply config until they expire.
+    """
+    get_reconciler().forget("powershell", connections)
 
 
 def validate_ip_structure(ip: str) -> bool:
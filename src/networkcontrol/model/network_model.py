@@ -1,198 +1,428 @@
-import socket
-import psutil
-import subprocess
-import re
 import json
-import wmi
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from networkcontrol.model import instrumentation
+from networkcontrol.model.addresses import from_psutil, order_addresses, order_gateways, parse_address
+from networkcontrol.model.classifier import get_classifier
+from networkcontrol.model.backends import DEEP_QUERY_MARKER, get_backend
+from networkcontrol.model.powershell_pool import CommandCancelled, ps_quote
+from networkcontrol.model.reconcile import Reconciler, get_reconciler
+from networkcontrol.model.scan_cache import get_scan_cache
 
 
 # ------------------------------------------------------------
 # Helper: Parse DHCP + Gateway info via netsh
 # ------------------------------------------------------------
-def _parse_dhcp_and_gateway():
+def _parse_dhcp_and_gateway(timeout: float = None):
     """
-    Return dicts for {adapter_name: dhcp_mode} and {adapter_name: gateway_ip}
-    using 'netsh interface ip show config'.
-    """
-    dhcp_modes = {}
-    gateways = {}
+    Return {adapter_name: {"mode", "gateways"}} observations from
+    'netsh interface ip show config'.
 
-    try:
-        result = subprocess.run(
-            ["netsh", "interface", "ip", "show", "config"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="ignore",
-        )
-        current_adapter = None
-        for line in result.stdout.splitlines():
-            header = re.match(r'Configuration for interface "(.*)"', line)
-            if header:
-                current_adapter = header.group(1).strip()
-                continue
-
-            if not current_adapter:
-                continue
-
-            dhcp_match = re.search(r"DHCP enabled:\s+(Yes|No)", line, re.IGNORECASE)
-            if dhcp_match:
-                dhcp_modes[current_adapter] = (
-                    "DHCP" if dhcp_match.group(1).lower() == "yes" else "Static"
-                )
-
-            gw_match = re.search(r"Default Gateway:\s*(.*)", line)
-            if gw_match:
-                gw = gw_match.group(1).strip()
-                if gw and gw != "None":
-                    gateways[current_adapter] = gw
-
-    except Exception:
-        pass
-
-    return dhcp_modes, gateways
+    "mode" is left out when netsh does not say; "gateways" holds every
+    default gateway listed, IPv4 first (empty when there is none). Errors
+    (netsh missing, timeout) propagate so the collector can report them.
+    """
+    observations = {}
+    for name, adapter in get_backend().netsh_config(timeout=timeout).items():
+        fields = {"gateways": order_gateways(adapter["gateways"] + adapter["gateways6"])}
+        if adapter["dhcp"] is not None:
+            fields["mode"] = "DHCP" if adapter["dhcp"] else "Static"
+        observations[name] = fields
+    return observations
 
 
 # ------------------------------------------------------------
 # Helper: Get adapter hardware descriptions via WMI
 # ------------------------------------------------------------
-def _get_adapter_descriptions():
+class BackendDescriptionProvider:
+    """Descriptions from the process-wide backend (WMI on a real machine)."""
+
+    def descriptions(self) -> dict:
+        with instrumentation.span("wmi.enumerate"):
+            return get_backend().descriptions()
+
+
+class DescriptionCache:
+    """
+    Adapter descriptions cached for ``ttl`` seconds.
+
+    The cache is also invalidated when the set of interface names changes
+    (adapter plugged in, renamed or removed). ``provider`` is any object
+    with a ``descriptions() -> dict`` method.
+    """
+
+    def __init__(self, provider=None, ttl: float = 300.0, clock=time.monotonic):
+        self.provider = provider or BackendDescriptionProvider()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data = None
+        self._names = None
+        self._loaded_at = 0.0
+
+    def get(self, names=()) -> dict:
+        """
+        Return descriptions, refreshing if stale or ``names`` differs from the cached set.
+
+        Raises:
+            Exception: the provider failed and there is no earlier result to serve
+        """
+        key = frozenset(names)
+        with self._lock:
+            now = self._clock()
+            if self._data is not None and key == self._names and now - self._loaded_at < self.ttl:
+                self.hits += 1
+                instrumentation.count("wmi.cache.hit")
+                return self._data
+
+            self.misses += 1
+            instrumentation.count("wmi.cache.miss")
+            try:
+                data = self.provider.descriptions()
+            except Exception:
+                # Serve the last good result and retry next call; with none, the scan marks descriptions stale
+                if self._data is None:
+                    raise
+                return self._data
+            self._data, self._names, self._loaded_at = data, key, now
+            return data
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "ttl": self.ttl}
+
+
+_description_cache = DescriptionCache()
+
+
+def get_description_cache() -> DescriptionCache:
+    return _description_cache
+
+
+def configure_description_cache(provider=None, ttl: float = 300.0) -> DescriptionCache:
+    """Replace the shared cache (e.g. with a fake provider or a different TTL)."""
+    global _description_cache
+    _description_cache = DescriptionCache(provider=provider, ttl=ttl)
+    return _description_cache
+
+
+def _get_adapter_descriptions(names):
     """
-    Return {adapter_name: friendly_description} using WMI.
+    Return {adapter_name: friendly_description} for ``names`` using WMI (cached).
     Example: {'Ethernet': 'Intel(R) Ethernet Controller I225-V'}
     """
-    descriptions = {}
-    try:
-        c = wmi.WMI()
-        for nic in c.Win32_NetworkAdapter():
-            if nic.NetConnectionID:
-                descriptions[nic.NetConnectionID] = nic.Name
-    except Exception:
-        pass
-    return descriptions
+    return _description_cache.get(names)
+
+
+# ------------------------------------------------------------
+# Concurrent collectors
+# ------------------------------------------------------------
+# Per-source budget in seconds; a source that misses it is reported as stale
+SOURCE_TIMEOUTS = {"netsh": 5.0, "wmi": 5.0}
+
+_collector_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="nic-scan")
+_last_scan_report = {}
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, (time.perf_counter() - start) * 1000
+
+
+def _collect(sources: dict, inline: dict) -> tuple:
+    """
+    Run ``sources`` ({name: (fn, args)}) on the collector pool and ``inline``
+    on the calling thread at the same time.
+
+    Returns:
+        tuple: ({name: value or None}, {name: {"ms": float, "status": str}})
+    """
+    start = time.perf_counter()
+    futures = {name: _collector_pool.submit(_timed, fn, *args) for name, (fn, args) in sources.items()}
+    values, report = {}, {}
+
+    for name, (fn, args) in inline.items():
+        values[name], ms = _timed(fn, *args)
+        report[name] = {"ms": ms, "status": "ok"}
+        instrumentation.record(f"scan.source.{name}", ms)
+
+    for name, future in futures.items():
+        remaining = SOURCE_TIMEOUTS.get(name, 5.0) - (time.perf_counter() - start)
+        try:
+            values[name], ms = future.result(timeout=max(0.0, remaining))
+            report[name] = {"ms": ms, "status": "ok"}
+            instrumentation.record(f"scan.source.{name}", ms)
+        except FutureTimeout:
+            values[name] = None
+            report[name] = {"ms": (time.perf_counter() - start) * 1000, "status": "timeout"}
+            instrumentation.count(f"scan.source.{name}.timeout")
+        except Exception as e:
+            values[name] = None
+            report[name] = {"ms": (time.perf_counter() - start) * 1000, "status": f"error: {e}"}
+            instrumentation.count(f"scan.source.{name}.error")
+    return values, report
+
+
+def get_last_scan_report() -> dict:
+    """Per-source timings of the most recent fast scan: {"total_ms": float, "sources": {...}}."""
+    return _last_scan_report
 
 
 # ------------------------------------------------------------
 # Normal / Fast Scan (psutil + WMI + netsh)
 # ------------------------------------------------------------
+@instrumentation.timed("scan.fast")
 def get_network_interfaces():
-    """Return list of real network interfaces with IP, subnet, gateway, DHCP mode, and link status."""
-    interfaces = psutil.net_if_addrs()
-    dhcp_modes, gateway_map = _parse_dhcp_and_gateway()
-    desc_map = _get_adapter_descriptions()
-    stats = psutil.net_if_stats()
-
-    data = []
-    for name, addrs in interfaces.items():
-        if name.lower().startswith(("loopback", "lo")):
-            continue
-
-        ipv4 = next((a.address for a in addrs if a.family == socket.AF_INET), "")
-        subnet = next((a.netmask for a in addrs if a.family == socket.AF_INET), "")
+    """
+    Return list of real network interfaces with IP, subnet, gateway, DHCP mode, and link status.
 
-        if not ipv4:
-            continue
+    psutil, netsh and WMI run concurrently and each feeds what it saw into
+    the shared ``Reconciler`` (see ``reconcile.py``), which merges them
+    with earlier deep-scan results field by field. Every IPv4 and IPv6
+    address is kept in "addresses" and every gateway in "gateways" (see
+    ``addresses.py``); "ip", "subnet" and "gateway" hold the primary
+    address, which is IPv4 when there is one. A source that failed or ran
+    out of time leaves its fields at their last known value (from the scan
+    cache after a restart), listed in "stale" once no longer fresh. The
+    merged view is saved to the scan cache.
+    """
+    global _last_scan_report
+    backend = get_backend()
 
-        dhcp_mode = dhcp_modes.get(name, "Unknown")
-        gateway = gateway_map.get(name, "—")
-        description = desc_map.get(name, name)
+    start = time.perf_counter()
+    # Read first so WMI is asked about this scan's adapters without listing them again
+    addrs, addrs_ms = _timed(backend.net_if_addrs)
+    instrumentation.record("scan.source.addrs", addrs_ms)
+    values, report = _collect(
+        sources={
+            "netsh": (_parse_dhcp_and_gateway, (SOURCE_TIMEOUTS["netsh"],)),
+            "wmi": (_get_adapter_descriptions, (list(addrs),)),
+        },
+        inline={
+            "stats": (backend.net_if_stats, ()),
+        },
+    )
+    values["addrs"] = addrs
+    report["addrs"] = {"ms": addrs_ms, "status": "ok"}
+    stats = values["stats"]
+    netsh = values["netsh"] or {}
 
-        if any(x in description.lower() for x in ["bluetooth", "virtual", "vmware", "hyper-v", "loopback"]):
-            continue
-        if any(x in name.lower() for x in ["bluetooth", "virtual", "vmware", "hyper-v", "loopback"]):
+    adapters = {}
+    for name, addrs in values["addrs"].items():
+        mode = netsh.get(name, {}).get("mode")
+        records = from_psutil(addrs, dhcp=None if mode is None else mode == "DHCP")
+        if not records:
             continue
-
         link_status = "Up"
         try:
             if name in stats and not stats[name].isup:
                 link_status = "Down"
         except Exception:
             pass
+        adapters[name] = {"addresses": records, "link": link_status}
 
-        data.append({
-            "connection": name,
-            "description": description,
-            "ip": ipv4,
-            "subnet": subnet,
-            "gateway": gateway,
-            "mode": dhcp_mode,
-            "link": link_status
-        })
+    reconciler = get_reconciler()
+    reconciler.observe("psutil", adapters)
+    if values["netsh"] is not None:
+        reconciler.observe("netsh", netsh)
+    if values["wmi"] is not None:
+        reconciler.observe("wmi", {name: {"description": d} for name, d in values["wmi"].items() if d})
 
+    # Tag physical / wireless / tunnel / ...; drop loopback, Bluetooth and virtual
+    data = get_classifier().classify(reconciler.merge())
+    get_scan_cache().save("fast", data)
+
+    _last_scan_report = {"total_ms": (time.perf_counter() - start) * 1000, "sources": report}
     return data
 
 
 # ------------------------------------------------------------
 # Deep Scan (PowerShell JSON)
 # ------------------------------------------------------------
-def get_network_interfaces_deep():
-    """
-    Use PowerShell to gather verified adapter data with real gateways,
-    DHCP/Static status, and hardware description.
-    Bluetooth and virtual adapters are filtered out.
-    """
-    cmd = [
-        "powershell",
-        "-Command",
-        (
-            "Get-NetIPConfiguration | Select-Object "
-            "InterfaceAlias, InterfaceDescription, "
-            "@{n='IPAddress';e={$_.IPv4Address.IPAddress}}, "
-            "@{n='PrefixLength';e={$_.IPv4Address.PrefixLength}}, "
-            "@{n='Gateway';e={$_.IPv4DefaultGateway.NextHop}}, "
-            "@{n='DHCP';e={"
-            " if ($_.IPv4Address.PrefixOrigin -eq 'Dhcp') {'DHCP'} "
-            " else {'Static'} } } "
-            "| ConvertTo-Json -Depth 3"
-        ),
-    ]
+DEEP_SCAN_SCRIPT = (
+    "Get-NetIPConfiguration | ForEach-Object { [pscustomobject]@{ "
+    "InterfaceAlias = $_.InterfaceAlias; "
+    "InterfaceDescription = $_.InterfaceDescription; "
+    "DHCP = $(if ($_.IPv4Address.PrefixOrigin -contains 'Dhcp') {'DHCP'} else {'Static'}); "
+    "Addresses = @(@($_.IPv4Address) + @($_.IPv6Address) + @($_.IPv6LinkLocalAddress) | "
+    "Where-Object { $_ } | ForEach-Object { [pscustomobject]@{ "
+    "IPAddress = [string]$_.IPAddress; PrefixLength = $_.PrefixLength; "
+    "PrefixOrigin = [string]$_.PrefixOrigin } }); "
+    "Gateways = @(@($_.IPv4DefaultGateway) + @($_.IPv6DefaultGateway) | "
+    "Where-Object { $_ } | ForEach-Object { [string]$_.NextHop }) "
+    "} } | ConvertTo-Json -Depth 4"
+)
 
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="ignore",
-            timeout=10
-        )
-        if not result.stdout.strip():
-            raise RuntimeError("PowerShell returned no data")
+# One cmdlet per deep field, so a targeted query runs only what it needs.
+# Each emits the same property as DEEP_SCAN_SCRIPT; {alias} is a quoted literal.
+_DEEP_QUERIES = {
+    "description": "InterfaceDescription = [string](Get-NetAdapter -InterfaceAlias {alias} "
+                   "-ErrorAction Ignore).InterfaceDescription",
+    "mode": "DHCP = $(switch ((Get-NetIPInterface -InterfaceAlias {alias} -AddressFamily IPv4 "
+            "-ErrorAction Ignore).Dhcp) {{ 'Enabled' {{'DHCP'}} 'Disabled' {{'Static'}} default {{''}} }})",
+    "addresses": "Addresses = @(Get-NetIPAddress -InterfaceAlias {alias} -ErrorAction Ignore | "
+                 "ForEach-Object {{ [pscustomobject]@{{ IPAddress = [string]$_.IPAddress; "
+                 "PrefixLength = $_.PrefixLength; PrefixOrigin = [string]$_.PrefixOrigin }} }})",
+    "gateways": "Gateways = @(Get-NetRoute -InterfaceAlias {alias} -DestinationPrefix '0.0.0.0/0', '::/0' "
+                "-ErrorAction Ignore | ForEach-Object {{ [string]$_.NextHop }})",
+}
 
-        adapters = json.loads(result.stdout)
+_last_deep_report = {}
 
-        # Normalize JSON output
-        if isinstance(adapters, dict):
-            adapters = [adapters]
 
-        data = []
-        for nic in adapters:
-            desc = nic.get("InterfaceDescription", "") or ""
-            name = nic.get("InterfaceAlias", "") or ""
+def deep_query_script(targets: dict) -> str:
+    """PowerShell for ``{alias: [deep field, ...]}``: one object per adapter with just those properties."""
+    lines = [f"# {DEEP_QUERY_MARKER}", "@("]
+    for alias, fields in targets.items():
+        quoted = ps_quote(alias)
+        parts = [f"InterfaceAlias = {quoted}"]
+        parts += [_DEEP_QUERIES[field].format(alias=quoted) for field in fields]
+        lines.append("  [pscustomobject]@{ " + "; ".join(parts) + " }")
+    lines.append(") | ConvertTo-Json -Depth 4")
+    return "\n".join(lines)
 
-            # Filter out Bluetooth, virtual, etc.
-            if any(x in desc.lower() for x in ["bluetooth", "virtual", "vmware", "hyper-v", "loopback"]):
-                continue
-            if any(x in name.lower() for x in ["bluetooth", "virtual", "vmware", "hyper-v", "loopback"]):
-                continue
 
-            data.append({
-                "connection": name or "—",
-                "description": desc or "—",
-                "ip": nic.get("IPAddress", "—"),
-                "subnet": str(nic.get("PrefixLength", "—")),
-                "gateway": nic.get("Gateway", "—"),
-                "mode": nic.get("DHCP", "—"),
-            })
+def _deep_addresses(nic: dict) -> tuple:
+    entries = nic.get("Addresses")
+    if entries is None:  # recordings from before multi-address support
+        entries = [{"IPAddress": nic.get("IPAddress"), "PrefixLength": nic.get("PrefixLength"),
+                    "PrefixOrigin": "Dhcp" if nic.get("DHCP") == "DHCP" else "Manual"}]
+    if isinstance(entries, dict):
+        entries = [entries]
+    records = (
+        parse_address(e.get("IPAddress"), prefix=e.get("PrefixLength"), origin=e.get("PrefixOrigin"))
+        for e in entries or ()
+    )
+    return order_addresses(r for r in records if r is not None)
+
+
+def deep_observations(stdout: str) -> dict:
+    """
+    {alias: {field: value}} from deep-scan or deep-query JSON.
+
+    Only properties present in the output (and not empty) are observed.
+    """
+    adapters = json.loads(stdout)
+    if isinstance(adapters, dict):
+        adapters = [adapters]
+
+    observations = {}
+    for nic in adapters:
+        name = nic.get("InterfaceAlias") or ""
+        if not name:
+            continue
+        fields = {}
+        if nic.get("InterfaceDescription"):
+            fields["description"] = nic["InterfaceDescription"]
+        if nic.get("DHCP") in ("DHCP", "Static"):
+            fields["mode"] = nic["DHCP"]
+        if "Addresses" in nic or "IPAddress" in nic:
+            fields["addresses"] = _deep_addresses(nic)
+        if "Gateways" in nic or "Gateway" in nic:
+            gateways = nic.get("Gateways", [nic.get("Gateway")])
+            if isinstance(gateways, str):
+                gateways = [gateways]
+            fields["gateways"] = order_gateways(g for g in gateways or () if g)
+        observations[name] = fields
+    return observations
 
-        return data
 
+def parse_deep_scan(stdout: str) -> list:
+    """Turn full deep-scan JSON on its own (no fast scan) into classified interface dicts."""
+    reconciler = Reconciler()
+    reconciler.observe("powershell", deep_observations(stdout))
+    return get_classifier().classify(reconciler.merge())
+
+
+def get_last_deep_report() -> dict:
+    """
+    What the most recent deep scan did:
+    {"status": "ok" | "skipped" | "error: ...", "targets": {alias: [field, ...]} or None (full scan)}
+    """
+    return _last_deep_report
+
+
+@instrumentation.timed("scan.deep")
+def get_network_interfaces_deep(progress=None, cancel=None):
+    """
+    Verify adapter data with PowerShell, querying only what needs it.
+
+    Once a fast scan has run, only the fields the ``Reconciler`` reports
+    as stale, missing or conflicting are queried, each with its own cmdlet
+    and only for those adapters; with nothing to query, PowerShell is not
+    started at all. Adapters the classifier hides (loopback, Bluetooth,
+    virtual) are neither queried nor returned. Before any fast scan, the
+    full ``DEEP_SCAN_SCRIPT`` runs. Either way the result is the merged
+    view, like a fast scan's, so the two never disagree about an adapter's
+    shape.
+
+    Args:
+        progress (callable): Optional ``progress(message)`` callback
+        cancel (threading.Event): Aborts the PowerShell query when set
+
+    Raises:
+        CommandCancelled: ``cancel`` was set. Other errors leave the
+            merged view as it was; with nothing known at all they become
+            an "Error" row
+    """
+    global _last_deep_report
+    report = progress or (lambda message: None)
+    reconciler = get_reconciler()
+    targets = None
+    if reconciler.adapters():
+        # Adapters the classifier hides (loopback, Bluetooth, virtual) are not worth a query
+        shown = {iface["connection"] for iface in get_classifier().classify(reconciler.merge())}
+        targets = {c: fields for c, fields in reconciler.deep_targets().items() if c in shown}
+
+    if targets == {}:
+        report("All fields are fresh and consistent; no PowerShell query needed")
+        _last_deep_report = {"status": "skipped", "targets": {}}
+        return get_classifier().classify(reconciler.merge())
+
+    try:
+        if targets is None:
+            report("Querying adapters via PowerShell...")
+            script = DEEP_SCAN_SCRIPT
+        else:
+            fields = sum(len(f) for f in targets.values())
+            report(f"Querying {fields} field(s) on {len(targets)} adapter(s) via PowerShell...")
+            script = deep_query_script(targets)
+        result = get_backend().powershell(script, timeout=10, cancel=cancel)
+        if not result.stdout.strip():
+            raise RuntimeError("PowerShell returned no data")
+
+        report("Merging adapter data...")
+        observations = deep_observations(result.stdout)
+        if targets is not None:
+            observations = {
+                alias: {f: v for f, v in fields.items() if f in targets[alias]}
+                for alias, fields in observations.items() if alias in targets
+            }
+        reconciler.observe("powershell", observations)
+        _last_deep_report = {"status": "ok", "targets": targets}
+
+    except CommandCancelled:
+        raise
     except Exception as e:
-        return [{
-            "connection": "Error",
-            "description": str(e),
-            "ip": "—",
-            "subnet": "—",
-            "gateway": "—",
-            "mode": "—"
-        }]
+        _last_deep_report = {"status": f"error: {e}", "targets": targets}
+        report(f"PowerShell failed ({e}); keeping the last known values")
+
+    data = get_classifier().classify(reconciler.merge())
+    if data:
+        get_scan_cache().save("fast", data)
+        return data
+    return [{
+        "connection": "Error",
+        "description": _last_deep_report["status"].partition("error: ")[2],
+        "ip": "—",
+        "subnet": "—",
+        "gateway": "—",
+        "mode": "—"
+    }]
@@ -0,0 +1,369 @@
+"""
+powershell_pool.py
+------------------
+Long-lived PowerShell hosts shared by the scan and apply modules.
+
+Starting powershell.exe costs anywhere from a few hundred milliseconds to
+several seconds, so instead of one process per command we keep a small pool
+of hosts that read framed requests from stdin and write framed responses to
+stdout.
+
+Wire protocol (one line each way, UTF-8):
+    request:   <token> <base64 script>
+    response:  <token> <returncode> <base64 stdout | -> <base64 stderr | ->
+
+Any other output a host produces is ignored. Any process that speaks this
+protocol can stand in for PowerShell (see ``fake_shell.py``).
+"""
+
+import atexit
+import base64
+import itertools
+import queue
+import subprocess
+import threading
+import time
+
+from networkcontrol.model import instrumentation
+
+
+# ------------------------------------------------------------
+# Host bootstrap (runs inside powershell.exe)
+# ------------------------------------------------------------
+_HOST_SCRIPT = r"""
+$ProgressPreference = 'SilentlyContinue'
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+$utf8 = [System.Text.Encoding]::UTF8
+function Encode-Frame([string]$text) {
+    if ([string]::IsNullOrEmpty($text)) { return '-' }
+    return [Convert]::ToBase64String($utf8.GetBytes($text))
+}
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    $parts = $line.Split(' ', 2)
+    if ($parts.Count -lt 2) { continue }
+    $token = $parts[0]
+    $script = $utf8.GetString([Convert]::FromBase64String($parts[1]))
+    $Error.Clear()
+    $out = ''
+    $rc = 0
+    try {
+        $out = Invoke-Expression $script | Out-String
+        if (-not $?) { $rc = 1 }
+    } catch {
+        $rc = 1
+    }
+    $err = ($Error | ForEach-Object { $_.ToString() }) -join "`n"
+    [Console]::Out.WriteLine("$token $rc $(Encode-Frame $out) $(Encode-Frame $err)")
+    [Console]::Out.Flush()
+}
+"""
+
+DEFAULT_COMMAND = [
+    "powershell",
+    "-NoLogo",
+    "-NoProfile",
+    "-NonInteractive",
+    "-EncodedCommand",
+    base64.b64encode(_HOST_SCRIPT.encode("utf-16-le")).decode("ascii"),
+]
+
+_HEALTH_SCRIPT = "Write-Output ok"
+
+
+def ps_quote(text: str) -> str:
+    """Single-quoted PowerShell literal (PowerShell also treats curly quotes as quotes)."""
+    for q in ("'", "‘", "’", "‚", "‛"):
+        text = text.replace(q, q + q)
+    return f"'{text}'"
+
+
+def _encode(text: str) -> str:
+    return base64.b64encode(text.encode("utf-8")).decode("ascii") if text else "-"
+
+
+def _decode(field: str) -> str:
+    return "" if field == "-" else base64.b64decode(field).decode("utf-8", errors="ignore")
+
+
+class SessionError(RuntimeError):
+    """Raised when a host dies or stops speaking the protocol."""
+
+
+class CommandCancelled(RuntimeError):
+    """Raised when a caller's cancel event fires while a command is running."""
+
+
+# ------------------------------------------------------------
+# Single host process
+# ------------------------------------------------------------
+class PowerShellSession:
+    """
+    One long-lived host process.
+
+    ``run()`` is not re-entrant; the pool hands each session to one caller
+    at a time. A session that times out or crashes is killed and marked
+    dead, and the pool replaces it on the next checkout.
+    """
+
+    _tokens = itertools.count(1)
+
+    def __init__(self, command=None):
+        self.command = list(command or DEFAULT_COMMAND)
+        self.commands_run = 0
+        self.last_used = time.monotonic()  # last response received (or start)
+        self._dead = False
+        self._lines = queue.Queue()
+        self._proc = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="ignore",
+            bufsize=1,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+        self._reader = threading.Thread(target=self._pump_stdout, daemon=True)
+        self._reader.start()
+
+    def _pump_stdout(self):
+        """Forward host stdout lines to the queue; ``None`` marks EOF."""
+        try:
+            for line in self._proc.stdout:
+                self._lines.put(line)
+        except Exception:
+            pass
+        finally:
+            self._dead = True
+            self._lines.put(None)
+
+    @property
+    def alive(self) -> bool:
+        return not self._dead and self._proc.poll() is None
+
+    def run(self, script: str, timeout: float = 15, cancel: threading.Event = None) -> subprocess.CompletedProcess:
+        """
+        Execute one script and wait for its framed response.
+
+        Raises:
+            subprocess.TimeoutExpired: no response within ``timeout`` (host is killed)
+            CommandCancelled: ``cancel`` was set before the response arrived (host is killed)
+            SessionError: host exited or the pipe broke
+        """
+        if not self.alive:
+            raise SessionError("PowerShell host is not running")
+
+        token = f"nc{next(self._tokens)}"
+        try:
+            self._proc.stdin.write(f"{token} {_encode(script)}\n")
+            self._proc.stdin.flush()
+        except (OSError, ValueError) as e:
+            self.kill()
+            raise SessionError(f"PowerShell host pipe closed: {e}") from e
+
+        deadline = time.monotonic() + timeout
+        while True:
+            if cancel is not None and cancel.is_set():
+                self.kill()
+                raise CommandCancelled("PowerShell command cancelled")
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(script, timeout)
+                line = self._lines.get(timeout=remaining if cancel is None else min(remaining, 0.1))
+            except queue.Empty:
+                continue
+            except subprocess.TimeoutExpired:
+                self.kill()
+                raise
+
+            if line is None:
+                self.kill()
+                raise SessionError("PowerShell host exited unexpectedly")
+
+            fields = line.rstrip("\r\n").split(" ")
+            if len(fields) != 4 or fields[0] != token:
+                continue  # stray output from the host
+
+            self.commands_run += 1
+            self.last_used = time.monotonic()
+            try:
+                returncode = int(fields[1])
+                stdout, stderr = _decode(fields[2]), _decode(fields[3])
+            except ValueError as e:
+                self.kill()
+                raise SessionError(f"Malformed response from PowerShell host: {e}") from e
+            return subprocess.CompletedProcess(script, returncode, stdout, stderr)
+
+    def ping(self, timeout: float = 5) -> bool:
+        """Round-trip a trivial command; False if the host is unresponsive."""
+        try:
+            return self.run(_HEALTH_SCRIPT, timeout=timeout).returncode == 0
+        except Exception:
+            return False
+
+    def kill(self):
+        self._dead = True
+        try:
+            self._proc.kill()
+        except Exception:
+            pass
+
+    def close(self, timeout: float = 2):
+        """Close stdin so the host exits on its own, then kill if it lingers."""
+        try:
+            self._proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            self._proc.wait(timeout=timeout)
+        except Exception:
+            self.kill()
+
+
+# ------------------------------------------------------------
+# Pool
+# ------------------------------------------------------------
+class PowerShellPool:
+    """
+    Bounded pool of ``PowerShellSession`` objects.
+
+    Sessions are spawned lazily up to ``size``; callers beyond that block
+    until one is returned. Dead sessions are discarded and replaced. A
+    session idle for more than ``idle_check`` seconds is pinged before it
+    is handed out (a host can hang or be killed while it sits idle); one
+    that does not answer within ``ping_timeout`` is replaced.
+    """
+
+    def __init__(self, size: int = 2, command=None, idle_check: float = 30.0, ping_timeout: float = 5.0):
+        self.size = max(1, size)
+        self.command = command
+        self.idle_check = idle_check
+        self.ping_timeout = ping_timeout
+        self.restarts = 0
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _checkout(self) -> PowerShellSession:
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                return PowerShellSession(self.command)
+            if not session.alive:
+                with self._lock:
+                    self.restarts += 1
+                continue
+            if time.monotonic() - session.last_used > self.idle_check and not self._healthy(session):
+                continue
+            return session
+
+    def _healthy(self, session: PowerShellSession) -> bool:
+        """Ping ``session``; kill it (and count a restart) if it does not answer."""
+        with instrumentation.span("powershell.health"):
+            if session.ping(timeout=self.ping_timeout):
+                return True
+        instrumentation.count("powershell.health.failed")
+        with self._lock:
+            self.restarts += 1
+        session.kill()
+        return False
+
+    def _checkin(self, session: PowerShellSession):
+        with self._lock:
+            if session.alive and not self._closed:
+                self._idle.append(session)
+                return
+        session.close()
+
+    def run(self, script: str, timeout: float = 15, retries: int = 1,
+            cancel: threading.Event = None) -> subprocess.CompletedProcess:
+        """
+        Run ``script`` on a pooled host.
+
+        A host that crashes is replaced and the script retried up to
+        ``retries`` times. Timeouts and cancellations are not retried, since
+        the script may already have taken effect.
+        """
+        if self._closed:
+            raise SessionError("PowerShell pool is closed")
+
+        queued = time.perf_counter()
+        with self._slots:
+            instrumentation.record("powershell.queue", (time.perf_counter() - queued) * 1000, queued)
+            attempt = 0
+            while True:
+                session = self._checkout()
+                try:
+                    with instrumentation.span("powershell.run"):
+                        return session.run(script, timeout=timeout, cancel=cancel)
+                except SessionError:
+                    if attempt >= retries:
+                        raise
+                    attempt += 1
+                    self.restarts += 1
+                    instrumentation.count("powershell.retry")
+                finally:
+                    self._checkin(session)
+
+    def health_check(self) -> int:
+        """
+        Ping every idle session now, dropping unresponsive ones. Returns healthy count.
+
+        Checkout already does this for sessions idle past ``idle_check``;
+        this is for callers that want the whole pool verified up front.
+        """
+        with self._lock:
+            sessions, self._idle = self._idle, []
+
+        healthy = [session for session in sessions if self._healthy(session)]
+
+        with self._lock:
+            self._idle.extend(healthy)
+        return len(healthy)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            sessions, self._idle = self._idle, []
+        for session in sessions:
+            session.close()
+
+
+# ------------------------------------------------------------
+# Shared instance
+# ------------------------------------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> PowerShellPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PowerShellPool()
+        return _pool
+
+
+def configure_pool(size: int = 2, command=None, idle_check: float = 30.0) -> PowerShellPool:
+    """Replace the shared pool (e.g. to point at ``fake_shell`` or resize)."""
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, PowerShellPool(size=size, command=command, idle_check=idle_check)
+    if old is not None:
+        old.close()
+    return _pool
+
+
+def _close_pool():
+    if _pool is not None:
+        _pool.close()
+
+
+atexit.register(_close_pool)
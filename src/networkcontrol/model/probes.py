@@ -0,0 +1,250 @@
+"""
+probes.py
+---------
+Connectivity probes behind the Link column's Internet / Network status.
+
+For each adapter that is up and has an IPv4 address, two targets are
+probed concurrently, with the socket bound to that adapter's address:
+
+    gateway    its default gateway (``GATEWAY_PORT``)
+    upstream   an outside host (``DEFAULT_UPSTREAM``, or "host:port" in
+               ``NETWORKCONTROL_PROBE_TARGET``)
+
+A probe is a TCP connect. An accepted *or refused* connection both prove
+the target answered, and the RTT is the handshake time. A timeout or an
+unreachable error counts as a loss. This needs no privileges, unlike ICMP,
+which is not available to unprivileged processes on Windows.
+
+``ProbeEngine.check_all()`` probes every adapter under a shared
+concurrency limit. Results are cached for ``cache_ttl`` seconds, so a
+burst of refreshes does not re-probe. Loss is the failure rate over the
+last ``window`` probes of each target. ``ProbeEngine.run()`` repeats the
+check forever with a jittered interval.
+
+Per-adapter result:
+
+    {
+        "status": "Internet" | "Network" | "Isolated",
+        "rtt_ms": float | None,        # of the target that decided the status
+        "loss": float,                 # 0.0 - 1.0, same target
+        "gateway": probe result | None,
+        "upstream": probe result,
+    }
+
+where a probe result is {"reachable", "rtt_ms", "loss", "error"}.
+"""
+
+import asyncio
+import ipaddress
+import os
+import random
+import time
+from collections import deque
+
+from networkcontrol.model import instrumentation
+
+DEFAULT_UPSTREAM = ("1.1.1.1", 443)
+GATEWAY_PORT = 53
+
+
+def upstream_target():
+    """(host, port) from ``NETWORKCONTROL_PROBE_TARGET``, else ``DEFAULT_UPSTREAM``."""
+    spec = os.environ.get("NETWORKCONTROL_PROBE_TARGET", "").strip()
+    if not spec:
+        return DEFAULT_UPSTREAM
+    host, _, port = spec.rpartition(":")
+    if not host:
+        return spec, DEFAULT_UPSTREAM[1]
+    return host.strip("[]"), int(port)
+
+
+def probe_source(iface: dict):
+    """The adapter's IPv4 address to bind probes to, or None if it cannot be probed."""
+    if "down" in str(iface.get("link", "")).lower() or "unreachable" in str(iface.get("link", "")).lower():
+        return None
+    try:
+        address = ipaddress.IPv4Address(str(iface.get("ip", "")).strip())
+    except ValueError:
+        return None
+    if address.is_unspecified or address.is_link_local:
+        return None
+    return str(address)
+
+
+def probe_gateway(iface: dict):
+    gateway = str(iface.get("gateway", "")).strip()
+    try:
+        return str(ipaddress.IPv4Address(gateway))
+    except ValueError:
+        return None
+
+
+def format_probe(result: dict) -> str:
+    """Link column text, e.g. "Internet 12 ms" or "Network 3 ms · 40% loss"."""
+    text = result["status"]
+    if result.get("rtt_ms") is not None:
+        text += f" {result['rtt_ms']:.0f} ms"
+    if result.get("loss"):
+        text += f" · {result['loss']:.0%} loss"
+    return text
+
+
+# ------------------------------------------------------------
+# Engine
+# ------------------------------------------------------------
+class ProbeEngine:
+    """
+    Args:
+        upstream (tuple): (host, port) probed through every adapter
+        gateway_port (int): TCP port tried on each gateway
+        timeout (float): seconds before a connect counts as lost
+        concurrency (int): connects in flight at once, across all adapters
+        cache_ttl (float): seconds a result is reused without re-probing
+        window (int): probes per target that loss is computed over
+    """
+
+    def __init__(self, upstream=None, gateway_port: int = GATEWAY_PORT, timeout: float = 1.0,
+                 concurrency: int = 32, cache_ttl: float = 5.0, window: int = 10, clock=time.monotonic):
+        self.upstream = upstream or upstream_target()
+        self.gateway_port = gateway_port
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.window = window
+        self._clock = clock
+        self._limit = None
+        self._concurrency = concurrency
+        self._cache = {}     # (source, host, port) -> (expires, result)
+        self._history = {}   # (source, host, port) -> deque of bools
+        self._inflight = {}  # (source, host, port) -> task
+
+    async def connect(self, source: str, host: str, port: int):
+        """
+        One TCP handshake from ``source`` to ``host:port``.
+
+        Returns:
+            tuple: (reachable, rtt_ms or None, error text)
+        """
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self._concurrency)
+        async with self._limit:
+            start = time.perf_counter()
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(host, port, local_addr=(source, 0) if source else None),
+                    self.timeout,
+                )
+            except asyncio.TimeoutError:
+                return False, None, f"no answer within {self.timeout:g}s"
+            except ConnectionRefusedError:
+                # Refused means something at that address sent a RST: the host is up
+                return True, (time.perf_counter() - start) * 1000, ""
+            except OSError as e:
+                return False, None, e.strerror or str(e)
+            rtt = (time.perf_counter() - start) * 1000
+            writer.close()
+            return True, rtt, ""
+
+    async def probe(self, source: str, host: str, port: int) -> dict:
+        """Probe one target (cached for ``cache_ttl``; concurrent callers share one connect)."""
+        key = (source, host, port)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > self._clock():
+            instrumentation.count("probe.cache.hit")
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._probe(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _probe(self, key) -> dict:
+        source, host, port = key
+        with instrumentation.span("probe.connect"):
+            reachable, rtt, error = await self.connect(source, host, port)
+        history = self._history.get(key)
+        if history is None:
+            history = self._history[key] = deque(maxlen=self.window)
+        history.append(reachable)
+        result = {
+            "reachable": reachable,
+            "rtt_ms": rtt,
+            "loss": history.count(False) / len(history),
+            "error": error,
+        }
+        self._cache[key] = (self._clock() + self.cache_ttl, result)
+        return result
+
+    async def check(self, iface: dict):
+        """Probe one adapter; None if it has nothing to probe from (see ``probe_source``)."""
+        source = probe_source(iface)
+        if source is None:
+            return None
+        gateway = probe_gateway(iface)
+        jobs = [self.probe(source, *self.upstream)]
+        if gateway:
+            jobs.append(self.probe(source, gateway, self.gateway_port))
+        results = await asyncio.gather(*jobs)
+        upstream = results[0]
+        gateway_result = results[1] if gateway else None
+
+        if upstream["reachable"]:
+            status, decided = "Internet", upstream
+        elif gateway_result is not None and gateway_result["reachable"]:
+            status, decided = "Network", gateway_result
+        else:
+            status, decided = "Isolated", gateway_result or upstream
+        return {
+            "status": status,
+            "rtt_ms": decided["rtt_ms"],
+            "loss": decided["loss"],
+            "gateway": gateway_result,
+            "upstream": upstream,
+        }
+
+    async def check_all(self, interfaces) -> dict:
+        """
+        Probe every adapter concurrently.
+
+        Returns:
+            dict: {connection: per-adapter result} for the adapters that could be probed
+        """
+        interfaces = list(interfaces)
+        results = await asyncio.gather(*(self.check(iface) for iface in interfaces))
+        return {
+            iface["connection"]: result
+            for iface, result in zip(interfaces, results)
+            if result is not None
+        }
+
+    async def run(self, interfaces, on_result, interval: float = 10.0, jitter: float = 0.2,
+                  wait=None, stopped=None):
+        """
+        Check ``interfaces()`` every ``interval`` seconds, +/- ``jitter`` of it, until ``stopped()``.
+
+        Jitter keeps many consoles (or a fleet of agents) from probing the
+        same upstream in lockstep.
+
+        Args:
+            interfaces (callable): Returns the current interface dicts
+            on_result (callable): Receives each ``check_all()`` result
+            wait (coroutine function): ``wait(seconds)`` between rounds (default ``asyncio.sleep``)
+            stopped (callable): Returns True to end the loop (default: run forever)
+        """
+        wait = wait or asyncio.sleep
+        stopped = stopped or (lambda: False)
+        while not stopped():
+            current = list(interfaces())
+            with instrumentation.span("probe.round"):
+                results = await self.check_all(current)
+            self.forget(probe_source(iface) for iface in current)
+            on_result(results)
+            await wait(interval * random.uniform(1 - jitter, 1 + jitter))
+
+    def forget(self, keep_sources):
+        """Drop cache and loss history for sources no longer in use."""
+        keep = set(keep_sources)
+        for store in (self._cache, self._history):
+            for key in [key for key in store if key[0] not in keep]:
+                del store[key]
@@ -0,0 +1,361 @@
+"""
+reconcile.py
+------------
+One view of every adapter, merged field by field from all scan sources.
+
+Sources and what they observe:
+
+    psutil      addresses, link          (every fast scan; defines the adapter set)
+    netsh       mode, gateways           (every fast scan)
+    wmi         description              (every fast scan, cached for minutes)
+    powershell  description, mode,       (deep queries, only for the fields
+                addresses, gateways       that need them)
+    cache       everything               (the last saved view, at startup)
+
+``Reconciler.observe()`` records what a source saw and when. ``merge()``
+picks each field from the highest-priority source in ``FIELD_PRIORITY``
+whose observation is still fresh (younger than ``MAX_AGE`` of that
+source). With no fresh source, the newest observation is used and the
+field is listed in the adapter's "stale" entry. Two fresh sources that
+disagree are a conflict, and the newest of them wins: a netsh reading
+taken after an apply beats the PowerShell one from before it.
+
+``deep_targets()`` lists the fields worth a PowerShell query: those that
+are stale, have never been observed, or conflict without PowerShell
+having the newest word. The deep scan queries only those, per adapter.
+``forget()`` drops a source's observations of adapters that were just
+reconfigured (apply calls it for PowerShell).
+
+Merged adapters have the same shape as a fast scan, plus
+
+    "sources": ("description:wmi", "mode:netsh", ...)   # where each field came from
+"""
+
+import sys
+import threading
+import time
+
+from networkcontrol.model.addresses import (
+    format_prefix,
+    order_addresses,
+    primary,
+    primary_gateway,
+    to_address,
+)
+from networkcontrol.model.scan_cache import get_scan_cache
+
+ADAPTER_SOURCE = "psutil"
+FIELD_PRIORITY = {
+    "description": ("powershell", "wmi", "cache"),
+    "mode": ("powershell", "netsh", "cache"),
+    "link": ("psutil", "cache"),
+    "addresses": ("psutil", "powershell", "cache"),
+    "gateways": ("powershell", "netsh", "cache"),
+}
+# Seconds an observation counts as fresh; cached values never do
+MAX_AGE = {"psutil": 30.0, "netsh": 60.0, "wmi": 600.0, "powershell": 300.0, "cache": 0.0}
+DEEP_FIELDS = ("description", "mode", "addresses", "gateways")
+# Interface fields made stale by each merged field
+STALE_FIELDS = {
+    "description": ("description",),
+    "mode": ("mode",),
+    "link": ("link",),
+    "addresses": ("ip", "subnet", "addresses"),
+    "gateways": ("gateway", "gateways"),
+}
+# Interned "field:source" labels for the "sources" entry
+_LABELS = {(f, s): sys.intern(f"{f}:{s}") for f, sources in FIELD_PRIORITY.items() for s in sources}
+# FIELD_PRIORITY with each source's MAX_AGE
+_RANKED = {f: tuple((s, MAX_AGE[s]) for s in sources) for f, sources in FIELD_PRIORITY.items()}
+
+
+def _key(field, value):
+    """Comparable form of a value, for conflict detection."""
+    if field == "addresses":
+        return frozenset((a.address.partition("%")[0], a.prefix) for a in value)
+    if field == "gateways":
+        return frozenset(value)
+    return str(value).strip().lower()
+
+
+def cache_observations(interfaces) -> dict:
+    """Observations for ``observe("cache", ...)`` from cached interface dicts."""
+    observations = {}
+    for iface in interfaces:
+        fields = {}
+        if iface.get("description") and iface["description"] != iface["connection"]:
+            fields["description"] = iface["description"]
+        if iface.get("mode") in ("DHCP", "Static"):
+            fields["mode"] = iface["mode"]
+        if iface.get("link"):
+            fields["link"] = iface["link"]
+        if iface.get("addresses"):
+            fields["addresses"] = order_addresses(to_address(a) for a in iface["addresses"])
+        if "gateways" in iface:
+            fields["gateways"] = tuple(iface["gateways"])
+        observations[iface["connection"]] = fields
+    return observations
+
+
+_NEVER = float("inf")
+
+
+def _still_valid(cached, field, source, previous, value, taken_at) -> bool:
+    """Whether a merged row survives ``source`` re-observing ``field``; extends its expiry if so."""
+    if previous is None or (previous[0] is not value and previous[0] != value):
+        return False
+    if cached[1][field] == source:
+        cached[2][field] = taken_at + MAX_AGE[source]  # the chosen value, re-confirmed
+        return True
+    # Another source repeating itself only matters if it disagrees, or had expired
+    return field not in cached[3] and taken_at - previous[1] <= MAX_AGE[source]
+
+
+class Reconciler:
+    """
+    Per-field merge of scan sources; see module docstring. Thread-safe.
+
+    Each adapter's merged row is kept until something could change it: a
+    new value, a source other than the chosen one reporting on a field in
+    conflict (or coming back after expiring), or the chosen observation
+    going stale. A steady network re-merges almost nothing per scan.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._observed = {}  # {connection: {field: {source: (value, taken_at)}}}
+        self._order = []     # adapters in scan order
+        self._listed = False  # an ADAPTER_SOURCE observation has fixed the adapter set
+        # {connection: [row or None, {field: source chosen, None if stale}, {field: expires}, {field in conflict}]}
+        self._merged = {}
+
+    def observe(self, source: str, observations: dict, taken_at: float = None):
+        """
+        Record ``{connection: {field: value}}`` seen by ``source``.
+
+        "addresses" are ``AddressRecord`` tuples in ``order_addresses()``
+        order, as ``from_psutil()`` returns them. An ``ADAPTER_SOURCE``
+        observation lists every adapter that exists: the rest are forgotten.
+        """
+        taken_at = self._clock() if taken_at is None else taken_at
+        with self._lock:
+            observed, merged = self._observed, self._merged
+            if source == ADAPTER_SOURCE:
+                self._order = list(observations)
+                observed = self._observed = {c: observed.get(c) or {} for c in self._order}
+                self._merged = merged = {c: merged[c] for c in self._order if c in merged}
+                self._listed = True
+            for connection, fields in observations.items():
+                entry = observed.get(connection)
+                if entry is None:
+                    if self._listed:
+                        continue  # not an adapter the latest scan listed
+                    entry = observed[connection] = {}
+                    self._order.append(connection)
+                cached = merged.get(connection)
+                for field, value in fields.items():
+                    seen = entry.setdefault(field, {})
+                    previous = seen.get(source)
+                    if previous is not None and previous[1] > taken_at:
+                        continue
+                    seen[source] = (value, taken_at)
+                    if cached is not None and not _still_valid(cached, field, source, previous, value, taken_at):
+                        del merged[connection]
+                        cached = None
+
+    def forget(self, source: str, connections):
+        """Drop what ``source`` observed of ``connections`` (their config just changed)."""
+        with self._lock:
+            for connection in connections:
+                entry = self._observed.get(connection)
+                if entry is None:
+                    continue
+                for seen in entry.values():
+                    seen.pop(source, None)
+                self._merged.pop(connection, None)
+
+    def adapters(self) -> list:
+        with self._lock:
+            return list(self._order)
+
+    @staticmethod
+    def _choose(observed: dict, field: str, now: float, conflicts: bool = True):
+        """
+        (value, source, stale, conflict) of one field; value is None if never observed.
+
+        The highest-priority fresh source wins unless a newer fresh source
+        disagrees with it; then the newest disagreeing one wins. With
+        ``conflicts`` False, sources older than the current choice are not
+        compared, so conflict is only reported when it changed the choice.
+        """
+        value = source = taken_at = key = None
+        conflict = False
+        for candidate, max_age in _RANKED[field]:
+            seen = observed.get(candidate)
+            if seen is None or now - seen[1] > max_age:
+                continue
+            if source is None:
+                value, taken_at = seen
+                source = candidate
+                continue
+            newer = seen[1] > taken_at
+            if not (newer or conflicts):
+                continue
+            if key is None:
+                key = _key(field, value)
+            other = _key(field, seen[0])
+            if other != key:
+                conflict = True
+                if newer:
+                    value, taken_at = seen
+                    source, key = candidate, other
+        if source is not None:
+            return value, source, False, conflict
+        if observed:
+            source = max(observed, key=lambda s: observed[s][1])
+            return observed[source][0], source, True, False
+        return None, None, True, False
+
+    def merge(self) -> list:
+        """The merged interface dicts, in scan order (adapters without an address are left out)."""
+        data = []
+        with self._lock:
+            now = self._clock()
+            merged = self._merged
+            for connection in self._order:
+                cached = merged.get(connection)
+                if cached is None or now >= min(cached[2].values(), default=_NEVER):
+                    cached = merged[connection] = self._merge_one(connection, self._observed[connection], now)
+                row = cached[0]
+                if row is not None:
+                    data.append({**row, "stale": list(row["stale"])} if row["stale"] else dict(row))
+        return data
+
+    def _merge_one(self, connection: str, observed: dict, now: float) -> list:
+        """One adapter's entry of ``_merged`` (see ``__init__``)."""
+        values, sources, stale = {}, [], []
+        chosen, expires, conflicts = {}, {}, set()
+        for field in FIELD_PRIORITY:
+            seen = observed.get(field)
+            value = source = None
+            if seen:
+                if len(seen) == 1:
+                    # One source (psutil's link, a deep scan on its own): nothing to weigh up
+                    (source, (value, taken_at)), = seen.items()
+                    is_stale = now - taken_at > MAX_AGE[source]
+                else:
+                    value, source, is_stale, conflict = self._choose(seen, field, now)
+                    if conflict:
+                        conflicts.add(field)
+                sources.append(_LABELS[field, source])
+                if is_stale:
+                    source = None
+                else:
+                    expires[field] = seen[source][1] + MAX_AGE[source]
+            chosen[field] = source
+            if source is None:
+                stale += STALE_FIELDS[field]
+            values[field] = value
+
+        records = values["addresses"] or ()
+        deep = observed.get("addresses", {}).get("powershell")
+        if deep is not None and records is not deep[0]:
+            records = self._with_origins(records, deep[0])
+        main = primary(records)
+        if main is None:
+            return [None, chosen, expires, conflicts]
+        gateways = tuple(values["gateways"] or ())
+        row = {
+            "connection": connection,
+            "description": values["description"] or connection,
+            "ip": main.address,
+            "subnet": format_prefix(main),
+            "gateway": primary_gateway(gateways, main.family),
+            "mode": values["mode"] or "Unknown",
+            "link": values["link"] or "Up",
+            "stale": stale,
+            "addresses": records,
+            "gateways": gateways,
+            "sources": tuple(sources),
+        }
+        return [row, chosen, expires, conflicts]
+
+    @staticmethod
+    def _with_origins(records, deep_records) -> tuple:
+        """psutil knows no IPv6 origins; borrow them from PowerShell's view of the same addresses."""
+        origins = {a.address.partition("%")[0]: a.origin for a in deep_records}
+        return tuple(
+            r._replace(origin=origins[r.address.partition("%")[0]])
+            if not r.origin and origins.get(r.address.partition("%")[0]) else r
+            for r in records
+        )
+
+    def _fields(self, fields) -> list:
+        """[(connection, {field: _choose() result})] for every adapter."""
+        with self._lock:
+            now = self._clock()
+            return [
+                (c, {f: self._choose(self._observed[c].get(f, {}), f, now) for f in fields})
+                for c in self._order
+            ]
+
+    def deep_targets(self) -> dict:
+        """
+        {connection: [field, ...]} for the ``DEEP_FIELDS`` a PowerShell query should refresh.
+
+        A field qualifies when it is stale (or never observed), or when fresh
+        sources conflict and the winner is not PowerShell: a source that
+        changed its mind since the last deep query needs confirming.
+        """
+        targets = {}
+        for connection, choices in self._fields(DEEP_FIELDS):
+            fields = [
+                f for f, (_, source, stale, conflict) in choices.items()
+                if stale or (conflict and source != "powershell")
+            ]
+            if fields:
+                targets[connection] = fields
+        return targets
+
+    def conflicts(self) -> dict:
+        """{connection: [field, ...]} whose fresh sources currently disagree."""
+        result = {}
+        for connection, choices in self._fields(FIELD_PRIORITY):
+            fields = [f for f, choice in choices.items() if choice[3]]
+            if fields:
+                result[connection] = fields
+        return result
+
+
+# ------------------------------------------------------------
+# Process-wide reconciler
+# ------------------------------------------------------------
+_reconciler = None
+_reconciler_lock = threading.Lock()
+
+
+def _seeded() -> Reconciler:
+    """A reconciler that starts from the scan cache, so failed sources fall back to saved values."""
+    reconciler = Reconciler()
+    cache = get_scan_cache()
+    cached = cache.load("fast")
+    if cached:
+        reconciler.observe("cache", cache_observations(cached), taken_at=cache.taken_at("fast"))
+    return reconciler
+
+
+def get_reconciler() -> Reconciler:
+    global _reconciler
+    with _reconciler_lock:
+        if _reconciler is None:
+            _reconciler = _seeded()
+        return _reconciler
+
+
+def configure_reconciler(reconciler: Reconciler = None) -> Reconciler:
+    """Replace the shared reconciler (None starts a fresh one from the scan cache)."""
+    global _reconciler
+    with _reconciler_lock:
+        _reconciler = reconciler if reconciler is not None else _seeded()
+        return _reconciler
@@ -0,0 +1,247 @@
+"""
+scan_cache.py
+-------------
+The last merged scan result, kept in a small SQLite file.
+
+Two uses:
+
+    warm start   ``load("fast")`` fills the table at launch in milliseconds,
+                 before the first live scan has finished
+    fallback     the shared ``Reconciler`` (``reconcile.py``) is seeded from
+                 ``load("fast")``, so a field no live source could read
+                 (netsh, WMI or PowerShell failed) keeps its last good value
+
+``save()`` stores each scan; fast and deep scans both save their merged
+view as "fast".
+
+Rows are stored per backend (``scope``, the backend's name) and scan kind.
+Every scan records when it ran; an adapter row is only
+rewritten when its values changed, so a steady network costs one small
+write per scan. Adapters missing from a scan are deleted.
+
+Loaded interface dicts are tagged:
+
+    "source": "cache"           (live scans carry no "source")
+    "cached_at": float          time.time() of the scan that last saw them
+    "stale": [every field]      nothing in them has been confirmed live
+
+The file lives in ``default_path()``; ``NETWORKCONTROL_CACHE`` names
+another file, or "off" disables caching. A cache that cannot be opened
+(read-only profile, corrupt file) behaves as an empty, disabled one.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+from networkcontrol.model import instrumentation
+from networkcontrol.model.backends import get_backend
+
+SCHEMA_VERSION = 1
+# Fields a cached row cannot vouch for
+CACHED_FIELDS = ("description", "ip", "subnet", "gateway", "mode", "link", "addresses", "gateways")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    scope TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    PRIMARY KEY (scope, kind)
+);
+CREATE TABLE IF NOT EXISTS interfaces (
+    scope TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    connection TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    changed_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (scope, kind, connection)
+);
+"""
+
+
+def default_path() -> Path:
+    """%LOCALAPPDATA%\\NetworkControl on Windows, else $XDG_CACHE_HOME (~/.cache)/networkcontrol."""
+    if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+        base = Path(os.environ["LOCALAPPDATA"]) / "NetworkControl"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "networkcontrol"
+    return base / "scan_cache.sqlite3"
+
+
+class ScanCache:
+    """
+    Args:
+        path: SQLite file, ":memory:", or None for a disabled cache
+        scope (str): Rows to read and write (default: the current backend's name)
+    """
+
+    def __init__(self, path=None, scope: str = None, clock=time.time):
+        self.path = path
+        self._scope = scope
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = None
+        self._saved = {}  # (scope, kind) -> {connection: interface dict as last written}
+        if path is not None:
+            try:
+                self._db = self._open(path)
+            except Exception:
+                self._db = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    @property
+    def scope(self) -> str:
+        return self._scope or get_backend().name
+
+    @staticmethod
+    def _open(path):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            db.executescript("DROP TABLE IF EXISTS scans; DROP TABLE IF EXISTS interfaces;")
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        db.executescript(_SCHEMA)
+        if path != ":memory:":
+            db.execute("PRAGMA journal_mode = WAL")
+            db.execute("PRAGMA synchronous = NORMAL")
+        return db
+
+    # ------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------
+    def load(self, kind: str = "fast") -> list:
+        """Cached interface dicts of one scan kind, tagged as cached (see module docstring)."""
+        rows, taken_at = self._read(kind)
+        return [
+            {**iface, "source": "cache", "cached_at": taken_at, "stale": list(CACHED_FIELDS)}
+            for iface in rows.values()
+        ]
+
+    def taken_at(self, kind: str = "fast"):
+        """time.time() of the last cached scan of ``kind``, or None."""
+        return self._read(kind)[1]
+
+    @instrumentation.timed("cache.load")
+    def _read(self, kind):
+        if self._db is None:
+            return {}, None
+        scope = self.scope
+        try:
+            with self._lock:
+                scan = self._db.execute(
+                    "SELECT taken_at FROM scans WHERE scope = ? AND kind = ?", (scope, kind)).fetchone()
+                rows = self._db.execute(
+                    "SELECT connection, data FROM interfaces WHERE scope = ? AND kind = ? ORDER BY position",
+                    (scope, kind)).fetchall()
+        except Exception:
+            return {}, None
+        return {connection: json.loads(data) for connection, data in rows}, scan[0] if scan else None
+
+    # ------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------
+    @instrumentation.timed("cache.save")
+    def save(self, kind: str, interfaces: list):
+        """Store a scan as the latest of ``kind``; only changed adapters are rewritten."""
+        if self._db is None:
+            return
+        try:
+            self._write((self.scope, kind), self._last_saved(kind), interfaces)
+        except Exception:
+            pass  # a cache that cannot be written must never break a scan
+
+    def _last_saved(self, kind) -> dict:
+        with self._lock:
+            saved = self._saved.get((self.scope, kind))
+        return saved if saved is not None else self._read(kind)[0]
+
+    def _write(self, key, saved, interfaces):
+        scope, kind = key
+        now = self._clock()
+        current = {iface["connection"]: dict(iface) for iface in interfaces}
+        positions = {connection: position for position, connection in enumerate(saved)}
+        changed = [
+            (scope, kind, connection, position, now, json.dumps(iface))
+            for position, (connection, iface) in enumerate(current.items())
+            if positions.get(connection) != position or saved.get(connection) != iface
+        ]
+        gone = [(scope, kind, connection) for connection in saved if connection not in current]
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN")
+            try:
+                db.execute("INSERT OR REPLACE INTO scans (scope, kind, taken_at) VALUES (?, ?, ?)",
+                           (scope, kind, now))
+                db.executemany(
+                    "INSERT OR REPLACE INTO interfaces (scope, kind, connection, position, changed_at, data)"
+                    " VALUES (?, ?, ?, ?, ?, ?)", changed)
+                db.executemany("DELETE FROM interfaces WHERE scope = ? AND kind = ? AND connection = ?", gone)
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                self._saved.pop(key, None)
+                raise
+            self._saved[key] = current
+        instrumentation.count("cache.rows.written", len(changed))
+
+    def clear(self):
+        """Forget every cached scan of the current scope."""
+        if self._db is None:
+            return
+        scope = self.scope
+        with self._lock:
+            self._db.execute("DELETE FROM scans WHERE scope = ?", (scope,))
+            self._db.execute("DELETE FROM interfaces WHERE scope = ?", (scope,))
+            self._saved = {key: rows for key, rows in self._saved.items() if key[0] != scope}
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# ------------------------------------------------------------
+# Process-wide cache
+# ------------------------------------------------------------
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _from_environment():
+    spec = os.environ.get("NETWORKCONTROL_CACHE", "").strip()
+    if spec.lower() == "off":
+        return ScanCache(None)
+    return ScanCache(spec or default_path())
+
+
+def get_scan_cache() -> ScanCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = _from_environment()
+        return _cache
+
+
+def configure_scan_cache(path=..., scope: str = None) -> ScanCache:
+    """
+    Replace the process-wide cache.
+
+    Args:
+        path: SQLite file, ":memory:", None to disable, or omitted to re-read ``NETWORKCONTROL_CACHE``
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = _from_environment() if path is ... else ScanCache(path, scope=scope)
+        return _cache
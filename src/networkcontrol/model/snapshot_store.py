@@ -0,0 +1,146 @@
+"""
+snapshot_store.py
+-----------------
+Recent scan history plus structural diffs between consecutive scans.
+
+Each scan is stored as {connection: InterfaceRecord}; records are
+namedtuples of interned strings, so unchanged adapters share storage
+between snapshots. ``push()`` returns the diff against the previous scan:
+
+    {
+        "seq": int,
+        "taken_at": float,                          # time.time()
+        "added": {connection: interface dict},
+        "removed": [connection, ...],
+        "modified": {connection: {field: (old, new)}},
+    }
+
+The monitor worker sends these diffs to the GUI instead of full scans,
+and ``changes()`` keeps the last ``depth`` of them for post-mortems.
+"""
+
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+from networkcontrol.model import instrumentation
+from networkcontrol.model.addresses import to_address
+
+FIELDS = ("connection", "description", "ip", "subnet", "gateway", "mode", "link", "category", "stale",
+          "addresses", "gateways", "sources")
+_SEQUENCE_FIELDS = ("stale", "addresses", "gateways", "sources")
+
+InterfaceRecord = namedtuple("InterfaceRecord", FIELDS)
+Snapshot = namedtuple("Snapshot", "seq taken_at records")
+
+
+def _intern(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(map(sys.intern, map(str, value)))
+    return sys.intern(str(value)) if value is not None else ""
+
+
+def _text(value):
+    return sys.intern(value) if type(value) is str else _intern(value)
+
+
+def _addresses(value):
+    return tuple(map(to_address, value or ()))
+
+
+# (field, converter, default) per record field, in FIELDS order
+_CONVERTERS = tuple(
+    (field, _addresses if field == "addresses" else _intern if field in _SEQUENCE_FIELDS else _text,
+     () if field in _SEQUENCE_FIELDS else "")
+    for field in FIELDS
+)
+
+
+def to_record(iface: dict) -> InterfaceRecord:
+    get = iface.get
+    return InterfaceRecord._make([convert(get(field, default)) for field, convert, default in _CONVERTERS])
+
+
+def to_dict(record: InterfaceRecord) -> dict:
+    iface = record._asdict()
+    iface["stale"] = list(record.stale)
+    return iface
+
+
+def diff_records(old: dict, new: dict) -> dict:
+    """Structural diff of two {connection: InterfaceRecord} maps (no seq/timestamp)."""
+    added = {key: to_dict(rec) for key, rec in new.items() if key not in old}
+    removed = [key for key in old if key not in new]
+    modified = {}
+    for key, rec in new.items():
+        before = old.get(key)
+        if before is None or before == rec:
+            continue
+        modified[key] = {
+            field: (a, b) for field, a, b in zip(FIELDS, before, rec) if a != b
+        }
+    return {"added": added, "removed": removed, "modified": modified}
+
+
+def is_empty(diff: dict) -> bool:
+    return not (diff["added"] or diff["removed"] or diff["modified"])
+
+
+class SnapshotStore:
+    """Keeps the last ``depth`` scans and the diffs between them (thread-safe)."""
+
+    def __init__(self, depth: int = 20):
+        self._snapshots = deque(maxlen=depth)
+        self._changes = deque(maxlen=depth)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @instrumentation.timed("snapshot.push")
+    def push(self, interfaces, taken_at: float = None) -> dict:
+        """Store a scan and return its diff against the previous one."""
+        records = {iface["connection"]: to_record(iface) for iface in interfaces}
+        with self._lock:
+            previous = self._snapshots[-1].records if self._snapshots else {}
+            self._seq += 1
+            diff = diff_records(previous, records)
+            diff["seq"] = self._seq
+            diff["taken_at"] = taken_at if taken_at is not None else time.time()
+            self._snapshots.append(Snapshot(self._seq, diff["taken_at"], records))
+            if not is_empty(diff):
+                self._changes.append(diff)
+        return diff
+
+    def latest(self) -> list:
+        """Most recent scan as a list of interface dicts."""
+        with self._lock:
+            if not self._snapshots:
+                return []
+            return [to_dict(rec) for rec in self._snapshots[-1].records.values()]
+
+    def snapshots(self) -> list:
+        with self._lock:
+            return list(self._snapshots)
+
+    def changes(self, since: float = 0.0) -> list:
+        """Non-empty diffs recorded after ``since`` (a time.time() value)."""
+        with self._lock:
+            return [diff for diff in self._changes if diff["taken_at"] > since]
+
+
+def apply_diff(current: dict, diff: dict) -> dict:
+    """
+    Apply a diff to {connection: interface dict} in place.
+
+    Returns:
+        dict: ``current``
+    """
+    for key in diff["removed"]:
+        current.pop(key, None)
+    for key, iface in diff["added"].items():
+        current[key] = dict(iface)
+    for key, fields in diff["modified"].items():
+        iface = current.setdefault(key, {"connection": key})
+        for field, (_, new) in fields.items():
+            iface[field] = list(new) if field == "stale" else new
+    return current
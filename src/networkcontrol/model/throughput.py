@@ -0,0 +1,161 @@
+"""
+throughput.py
+-------------
+Per-adapter traffic rates from ``net_io_counters(pernic=True)`` samples.
+
+Each ``sample()`` turns the counter deltas since the previous sample into
+rates:
+
+    METRICS = ("rx_bps", "tx_bps", "rx_pps", "tx_pps", "err_ps", "drop_ps")
+
+The last ``history`` rates of every metric are kept in one fixed-size
+``array('d')`` per adapter, used as a ring buffer. Memory per adapter
+therefore stays constant however long the monitor runs. Adapters that
+disappear from the counters are dropped.
+"""
+
+import time
+from array import array
+
+from networkcontrol.model import instrumentation
+
+METRICS = ("rx_bps", "tx_bps", "rx_pps", "tx_pps", "err_ps", "drop_ps")
+RX_BPS, TX_BPS, RX_PPS, TX_PPS, ERR_PS, DROP_PS = range(len(METRICS))
+HISTORY = 60  # samples kept per metric (one minute at the default 1 s interval)
+
+
+def _totals(counters) -> tuple:
+    """psutil ``snetio`` -> (bytes_recv, bytes_sent, packets_recv, packets_sent, errors, drops)."""
+    return (
+        counters.bytes_recv,
+        counters.bytes_sent,
+        counters.packets_recv,
+        counters.packets_sent,
+        counters.errin + counters.errout,
+        counters.dropin + counters.dropout,
+    )
+
+
+class _Adapter:
+    __slots__ = ("previous", "ring", "filled")
+
+    def __init__(self, previous, history):
+        self.previous = previous
+        self.ring = array("d", bytes(8 * history * len(METRICS)))
+        self.filled = 0
+
+
+class ThroughputMonitor:
+    """
+    Rolling traffic rates for every adapter.
+
+    All adapters share one ring cursor: slot ``i`` of every ring holds the
+    rates of the same sample. Not thread-safe; one worker samples and
+    publishes copies (see ``snapshot()``).
+    """
+
+    def __init__(self, history: int = HISTORY, clock=time.monotonic):
+        self.history = history
+        self._clock = clock
+        self._adapters = {}
+        self._cursor = 0  # next slot to write
+        self._last = None
+
+    @instrumentation.timed("throughput.sample")
+    def sample(self, counters: dict, now: float = None) -> set:
+        """
+        Add one reading of ``{name: snetio}``.
+
+        Counters that went backwards (driver reset, 32-bit wrap) count as
+        zero for that interval instead of a huge negative rate.
+
+        Returns:
+            set: Adapters whose rates were updated (new adapters need two samples)
+        """
+        now = self._clock() if now is None else now
+        elapsed = now - self._last if self._last is not None else 0.0
+        self._last = now
+        slot = self._cursor
+        self._cursor = (slot + 1) % self.history
+
+        updated = set()
+        for name, reading in counters.items():
+            totals = _totals(reading)
+            adapter = self._adapters.get(name)
+            if adapter is None:
+                self._adapters[name] = _Adapter(totals, self.history)
+                continue
+            if elapsed > 0:
+                ring = adapter.ring
+                for metric, (new, old) in enumerate(zip(totals, adapter.previous)):
+                    ring[metric * self.history + slot] = max(new - old, 0) / elapsed
+                adapter.filled = min(adapter.filled + 1, self.history)
+                updated.add(name)
+            adapter.previous = totals
+
+        for name in [name for name in self._adapters if name not in counters]:
+            del self._adapters[name]
+        return updated
+
+    def rates(self, name: str):
+        """Latest rates of ``name`` in ``METRICS`` order, or None before its second sample."""
+        adapter = self._adapters.get(name)
+        if adapter is None or not adapter.filled:
+            return None
+        slot = (self._cursor - 1) % self.history
+        return tuple(adapter.ring[metric * self.history + slot] for metric in range(len(METRICS)))
+
+    def history_of(self, name: str, metric: int) -> tuple:
+        """Recorded values of one metric for ``name``, oldest first."""
+        adapter = self._adapters.get(name)
+        if adapter is None or not adapter.filled:
+            return ()
+        ring, size = adapter.ring, self.history
+        base = metric * size
+        start = (self._cursor - adapter.filled) % size
+        end = start + adapter.filled
+        if end <= size:
+            return tuple(ring[base + start:base + end])
+        return tuple(ring[base + start:base + size]) + tuple(ring[base:base + end - size])
+
+    def snapshot(self, names=None) -> dict:
+        """
+        Rates and rx/tx history for publishing to the GUI.
+
+        Returns:
+            dict: {name: {"rates": tuple, "rx": tuple, "tx": tuple}} for adapters with rates
+        """
+        result = {}
+        for name in self._adapters if names is None else names:
+            rates = self.rates(name)
+            if rates is not None:
+                result[name] = {
+                    "rates": rates,
+                    "rx": self.history_of(name, RX_BPS),
+                    "tx": self.history_of(name, TX_BPS),
+                }
+        return result
+
+    def adapters(self):
+        return list(self._adapters)
+
+
+# ------------------------------------------------------------
+# Formatting
+# ------------------------------------------------------------
+def format_bytes_rate(value: float) -> str:
+    if value < 1024:
+        return f"{value:.0f} B/s"
+    for unit in ("KB/s", "MB/s"):
+        value /= 1024
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+    return f"{value / 1024:.1f} GB/s"
+
+
+def format_count_rate(value: float) -> str:
+    if value >= 10000:
+        return f"{value / 1000:.0f}k"
+    if value >= 100 or value == 0:
+        return f"{value:.0f}"
+    return f"{value:.1f}"
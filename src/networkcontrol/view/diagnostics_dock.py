@@ -0,0 +1,130 @@
+"""
+diagnostics_dock.py
+-------------------
+Dock showing the instrumentation timers and counters (see
+``model/instrumentation.py``), refreshed once a second while visible,
+with JSON and Chrome-trace export.
+"""
+
+from PyQt6 import QtCore, QtWidgets
+
+from networkcontrol.model import instrumentation
+
+TIMER_HEADERS = ("Timer", "Count", "p50 ms", "p95 ms", "Max ms", "Last ms")
+TIMER_FIELDS = ("count", "p50_ms", "p95_ms", "max_ms", "last_ms")
+
+
+class PaintTimer(QtCore.QObject):
+    """
+    Event filter timing a view's viewport repaints as ``name``.
+
+    While profiling is on, the paint event is delivered through
+    ``viewportEvent()`` inside a span instead of the normal path.
+    Otherwise the event passes through untouched.
+    """
+
+    def __init__(self, view: QtWidgets.QAbstractItemView, name: str = "table.paint"):
+        super().__init__(view)
+        self._view = view
+        self._name = name
+        view.viewport().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() != QtCore.QEvent.Type.Paint or not instrumentation.is_enabled():
+            return False
+        with instrumentation.span(self._name):
+            self._view.viewportEvent(event)
+        return True
+
+
+class DiagnosticsDock(QtWidgets.QDockWidget):
+    def __init__(self, parent=None):
+        super().__init__("Diagnostics", parent)
+        self.setObjectName("diagnosticsDock")
+
+        body = QtWidgets.QWidget(self)
+        layout = QtWidgets.QVBoxLayout(body)
+
+        controls = QtWidgets.QHBoxLayout()
+        self.chk_enabled = QtWidgets.QCheckBox("Profiling enabled", body)
+        self.chk_enabled.setChecked(instrumentation.is_enabled())
+        self.chk_enabled.toggled.connect(instrumentation.enable)
+        btn_reset = QtWidgets.QPushButton("Reset", body)
+        btn_reset.clicked.connect(self._reset)
+        btn_json = QtWidgets.QPushButton("Export JSON…", body)
+        btn_json.clicked.connect(lambda: self._export("JSON (*.json)", instrumentation.export_json))
+        btn_trace = QtWidgets.QPushButton("Export Chrome trace…", body)
+        btn_trace.clicked.connect(lambda: self._export("Chrome trace (*.json)", instrumentation.export_chrome_trace))
+        controls.addWidget(self.chk_enabled)
+        controls.addStretch(1)
+        for button in (btn_reset, btn_json, btn_trace):
+            controls.addWidget(button)
+        layout.addLayout(controls)
+
+        self.timers = self._make_table(TIMER_HEADERS, body)
+        self.counters = self._make_table(("Counter", "Value"), body)
+        layout.addWidget(self.timers, 3)
+        layout.addWidget(self.counters, 1)
+        self.setWidget(body)
+
+        self._refresh_timer = QtCore.QTimer(self)
+        self._refresh_timer.setInterval(1000)
+        self._refresh_timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self._on_visibility)
+
+    @staticmethod
+    def _make_table(headers, parent):
+        table = QtWidgets.QTableWidget(0, len(headers), parent)
+        table.setHorizontalHeaderLabels(headers)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def _on_visibility(self, visible):
+        if visible:
+            self.refresh()
+            self._refresh_timer.start()
+        else:
+            self._refresh_timer.stop()
+
+    # ------------------------------------------------------------
+    def refresh(self):
+        snap = instrumentation.snapshot()
+        self.chk_enabled.setChecked(snap["enabled"])
+
+        timers = sorted(snap["timers"].items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        self.timers.setRowCount(len(timers))
+        for row, (name, stats) in enumerate(timers):
+            cells = [name] + [str(stats["count"]) if f == "count" else f"{stats[f]:.1f}" for f in TIMER_FIELDS]
+            self._set_row(self.timers, row, cells)
+
+        counters = sorted(snap["counters"].items())
+        self.counters.setRowCount(len(counters))
+        for row, (name, value) in enumerate(counters):
+            self._set_row(self.counters, row, [name, str(value)])
+
+    @staticmethod
+    def _set_row(table, row, cells):
+        for col, text in enumerate(cells):
+            item = table.item(row, col)
+            if item is None:
+                item = QtWidgets.QTableWidgetItem()
+                if col:
+                    item.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignRight | QtCore.Qt.AlignmentFlag.AlignVCenter)
+                table.setItem(row, col, item)
+            if item.text() != text:
+                item.setText(text)
+
+    def _reset(self):
+        instrumentation.reset()
+        self.refresh()
+
+    def _export(self, file_filter, writer):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export diagnostics", "networkcontrol-profile.json", file_filter)
+        if not path:
+            return
+        try:
+            writer(path)
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self, "Export failed", str(e))
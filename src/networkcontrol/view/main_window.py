@@ -0,0 +1,39 @@
+"""
+main_window.py
+--------------
+Builds the main window from the precompiled ``ui_main_window`` module.
+
+``ui_main_window.py`` is generated from ``ui/main_window.ui``; regenerate
+it after editing the .ui file in Designer:
+
+    pyuic6 src/networkcontrol/view/ui/main_window.ui -o src/networkcontrol/view/ui_main_window.py
+
+The compiled module is always used. Set ``NETWORKCONTROL_LOAD_UI=1`` while
+editing the .ui in Designer to parse it at runtime (``uic.loadUi``)
+instead, without regenerating. File timestamps are not consulted: git does
+not preserve them, so they say nothing about which file is newer.
+"""
+
+import os
+from pathlib import Path
+
+from PyQt6 import QtWidgets
+
+UI_PATH = Path(__file__).parent / "ui" / "main_window.ui"
+
+
+def _load_ui_at_runtime() -> bool:
+    """Development switch: parse the .ui instead of using the compiled module."""
+    return os.environ.get("NETWORKCONTROL_LOAD_UI") == "1"
+
+
+def create_main_window() -> QtWidgets.QMainWindow:
+    window = QtWidgets.QMainWindow()
+    if _load_ui_at_runtime():
+        from PyQt6 import uic
+        uic.loadUi(str(UI_PATH), window)
+    else:
+        from networkcontrol.view.ui_main_window import Ui_MainWindow
+        window.ui = Ui_MainWindow()
+        window.ui.setupUi(window)
+    return window
@@ -0,0 +1,102 @@
+# Form implementation generated from reading ui file 'src/networkcontrol/view/ui/main_window.ui'
+#
+# Created by: PyQt6 UI code generator 6.11.0
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(738, 319)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.MinimumExpanding, QtWidgets.QSizePolicy.Policy.MinimumExpanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(MainWindow.sizePolicy().hasHeightForWidth())
+        MainWindow.setSizePolicy(sizePolicy)
+        self.centralwidget = QtWidgets.QWidget(parent=MainWindow)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.MinimumExpanding, QtWidgets.QSizePolicy.Policy.MinimumExpanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.centralwidget.sizePolicy().hasHeightForWidth())
+        self.centralwidget.setSizePolicy(sizePolicy)
+        self.centralwidget.setObjectName("centralwidget")
+        self.gridLayout_2 = QtWidgets.QGridLayout(self.centralwidget)
+        self.gridLayout_2.setObjectName("gridLayout_2")
+        self.controlsWidget = QtWidgets.QWidget(parent=self.centralwidget)
+        self.controlsWidget.setMinimumSize(QtCore.QSize(0, 40))
+        self.controlsWidget.setObjectName("controlsWidget")
+        self.gridLayout_3 = QtWidgets.QGridLayout(self.controlsWidget)
+        self.gridLayout_3.setObjectName("gridLayout_3")
+        self.tableNetwork = QtWidgets.QTreeView(parent=self.controlsWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.MinimumExpanding, QtWidgets.QSizePolicy.Policy.MinimumExpanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.tableNetwork.sizePolicy().hasHeightForWidth())
+        self.tableNetwork.setSizePolicy(sizePolicy)
+        self.tableNetwork.setStyleSheet("QTreeView {\n"
+"    background-color: white;\n"
+"    alternate-background-color: #f7f7f7;\n"
+"}\n"
+"\n"
+"QTreeView::item:selected {\n"
+"    background-color: #d0e3ff;\n"
+"    color: black;\n"
+"}\n"
+"\n"
+"QLineEdit {\n"
+"    background-color: white;\n"
+"    color: black;\n"
+"}\n"
+"")
+        self.tableNetwork.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.AllEditTriggers)
+        self.tableNetwork.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
+        self.tableNetwork.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectItems)
+        self.tableNetwork.setUniformRowHeights(True)
+        self.tableNetwork.setSortingEnabled(True)
+        self.tableNetwork.setObjectName("tableNetwork")
+        self.tableNetwork.header().setDefaultSectionSize(80)
+        self.tableNetwork.header().setStretchLastSection(True)
+        self.gridLayout_3.addWidget(self.tableNetwork, 2, 1, 1, 1)
+        self.horizontalFrame = QtWidgets.QFrame(parent=self.controlsWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Fixed, QtWidgets.QSizePolicy.Policy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.horizontalFrame.sizePolicy().hasHeightForWidth())
+        self.horizontalFrame.setSizePolicy(sizePolicy)
+        self.horizontalFrame.setObjectName("horizontalFrame")
+        self.gridLayout = QtWidgets.QGridLayout(self.horizontalFrame)
+        self.gridLayout.setObjectName("gridLayout")
+        self.btnDeepScan = QtWidgets.QPushButton(parent=self.horizontalFrame)
+        self.btnDeepScan.setObjectName("btnDeepScan")
+        self.gridLayout.addWidget(self.btnDeepScan, 0, 1, 1, 1)
+        self.btnRefresh = QtWidgets.QPushButton(parent=self.horizontalFrame)
+        self.btnRefresh.setObjectName("btnRefresh")
+        self.gridLayout.addWidget(self.btnRefresh, 0, 0, 1, 1)
+        self.btnApply = QtWidgets.QPushButton(parent=self.horizontalFrame)
+        self.btnApply.setObjectName("btnApply")
+        self.gridLayout.addWidget(self.btnApply, 0, 2, 1, 1)
+        self.gridLayout_3.addWidget(self.horizontalFrame, 1, 1, 1, 1)
+        self.gridLayout_2.addWidget(self.controlsWidget, 0, 0, 1, 1)
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.menubar = QtWidgets.QMenuBar(parent=MainWindow)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 738, 22))
+        self.menubar.setObjectName("menubar")
+        MainWindow.setMenuBar(self.menubar)
+        self.statusbar = QtWidgets.QStatusBar(parent=MainWindow)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+
+        self.retranslateUi(MainWindow)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "Network Control"))
+        self.btnDeepScan.setText(_translate("MainWindow", "Deep Scan"))
+        self.btnRefresh.setText(_translate("MainWindow", "Refresh"))
+        self.btnApply.setText(_translate("MainWindow", "Apply Changes"))
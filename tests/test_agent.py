@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from networkcontrol.agent import Agent
+from networkcontrol.model.fleet import FleetError, FleetPool
+
+INTERFACES = [{"connection": "Ethernet", "ip": "10.0.0.5"}]
+
+
+def _apply_once(agent_token, client_token):
+    applied = []
+
+    def apply(changes):
+        applied.extend(changes)
+        return [{"connection": "Ethernet", "success": True}]
+
+    async def run():
+        agent = Agent(scan=lambda deep: INTERFACES, apply=apply, token=agent_token)
+        server = await agent.serve("127.0.0.1", 0)
+        pool = FleetPool([("127.0.0.1", server.sockets[0].getsockname()[1])], token=client_token, timeout=5)
+        try:
+            conn = next(iter(pool.connections.values()))
+            replies = []
+            for message in ({"type": "scan", "deep": False}, {"type": "apply", "changes": [{"connection": "Ethernet"}]}):
+                try:
+                    replies.append(await conn.request(message))
+                except FleetError as e:
+                    replies.append(e)
+            return replies
+        finally:
+            await pool.close()
+            server.close()
+            await server.wait_closed()
+
+    scan, reply = asyncio.run(run())  # replies, or the FleetError each request raised
+    return scan, reply, applied
+
+
+def test_agent_without_token_refuses_apply():
+    scan, reply, applied = _apply_once(None, None)
+    assert scan["interfaces"] == INTERFACES
+    assert isinstance(reply, FleetError) and "token" in str(reply)
+    assert applied == []
+
+
+def test_agent_with_token_applies_signed_requests():
+    _, reply, applied = _apply_once("s3cret", "s3cret")
+    assert reply["results"][0]["success"]
+    assert applied == [{"connection": "Ethernet"}]
+
+
+@pytest.mark.parametrize("client_token", [None, "wrong"])
+def test_agent_with_token_refuses_unsigned_or_badly_signed_apply(client_token):
+    _, reply, applied = _apply_once("s3cret", client_token)
+    assert isinstance(reply, FleetError) and "Invalid signature" in str(reply)
+    assert applied == []
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from networkcontrol.model.apply_engine import ApplyEngine, FakeExecutor
+
+CONFIGS = {
+    "Ethernet": {"mode": "DHCP"},
+    "Ethernet 2": {"mode": "DHCP"},
+}
+CHANGES = [
+    {"connection": "Ethernet", "mode": "Static", "ip": "10.0.0.5", "subnet": "24", "gateway": ""},
+    {"connection": "Ethernet 2", "mode": "Static", "ip": "10.0.1.5", "subnet": "24", "gateway": ""},
+]
+
+
+class OverrunningExecutor(FakeExecutor):
+    """Apply on "Ethernet 2" ignores its timeout and takes ``overrun`` seconds, like a hung netsh."""
+
+    def __init__(self, overrun: float):
+        super().__init__(CONFIGS)
+        self.overrun = overrun
+        self.active = set()
+        self.overlapped = False
+
+    def apply(self, connection, config, timeout):
+        with self._lock:
+            self.overlapped = self.overlapped or connection in self.active
+            self.active.add(connection)
+        try:
+            if connection == "Ethernet 2" and config["mode"] == "Static":
+                time.sleep(self.overrun)
+            return super().apply(connection, config, timeout)
+        finally:
+            with self._lock:
+                self.active.discard(connection)
+
+
+def test_rollback_waits_for_an_apply_that_overran_the_deadline():
+    executor = OverrunningExecutor(overrun=0.3)
+    results = ApplyEngine(executor, timeout=0.1, rollback_timeout=2).run(CHANGES)
+    assert not executor.overlapped
+    assert all(res["rolled_back"] for res in results)
+    assert executor.configs["Ethernet 2"]["mode"] == "DHCP"
+
+
+def test_rollback_skips_an_adapter_whose_apply_is_still_running():
+    executor = OverrunningExecutor(overrun=1.0)
+    first, second = ApplyEngine(executor, timeout=0.1, rollback_timeout=0.3).run(CHANGES)
+    assert first["rolled_back"]
+    assert not second["rolled_back"] and not second["success"]
+    assert "adapter state unknown" in second["stderr"]
+    assert not any(call[0] == "apply" and call[1] == "Ethernet 2" and call[2]["mode"] == "DHCP"
+                   for call in executor.calls)
+    assert not executor.overlapped
+    deadline = time.monotonic() + 5
+    while threading.active_count() > 1 and time.monotonic() < deadline:  # let the overrun finish
+        time.sleep(0.05)
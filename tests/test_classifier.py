@@ -0,0 +1,47 @@
+import json
+import logging
+
+import pytest
+
+from networkcontrol.model import classifier as classifier_module
+from networkcontrol.model.classifier import DEFAULT_RULES, reload_rules
+
+INTERFACES = [
+    {"connection": "vEthernet (WSL)", "description": "Hyper-V Virtual Ethernet Adapter"},
+    {"connection": "Ethernet", "description": "Intel(R) Ethernet Connection"},
+]
+
+
+@pytest.fixture(autouse=True)
+def _restore_classifier(monkeypatch):
+    monkeypatch.setattr(classifier_module, "_classifier", None)
+
+
+@pytest.mark.parametrize("rules", [
+    {"categories": [["virtual", ["("]]]},          # pattern does not compile
+    {"categories": [["virtual"]]},                  # category without patterns
+    {"categories": 3},                              # not a list
+    [["virtual", ["("]]],                           # not an object
+])
+def test_bad_rules_fall_back_to_defaults(tmp_path, caplog, rules):
+    path = tmp_path / "classify.json"
+    path.write_text(json.dumps(rules), encoding="utf-8")
+    with caplog.at_level(logging.WARNING):
+        classifier = reload_rules(path)
+    assert classifier.categories == [name for name, _ in DEFAULT_RULES["categories"]]
+    assert [i["connection"] for i in classifier.classify([dict(i) for i in INTERFACES])] == ["Ethernet"]
+    assert "Ignoring classifier rules" in caplog.text
+
+
+def test_missing_rules_file_uses_defaults_quietly(tmp_path, caplog):
+    with caplog.at_level(logging.WARNING):
+        classifier = reload_rules(tmp_path / "absent.json")
+    assert classifier.categories == [name for name, _ in DEFAULT_RULES["categories"]]
+    assert caplog.text == ""
+
+
+def test_valid_user_rules_are_used(tmp_path):
+    path = tmp_path / "classify.json"
+    path.write_text(json.dumps({"categories": [["lab", ["intel"]]], "exclude": ["lab"]}), encoding="utf-8")
+    kept = reload_rules(path).classify([dict(i) for i in INTERFACES])
+    assert [i["connection"] for i in kept] == ["vEthernet (WSL)"]
@@ -0,0 +1,46 @@
+from networkcontrol.model.addresses import AddressRecord
+from networkcontrol.model.reconcile import MAX_AGE, Reconciler, cache_observations
+
+ADDRESSES = (AddressRecord("ipv4", "10.0.0.5", 24, "dhcp"),)
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_single_source_fields_go_stale_after_max_age():
+    clock = Clock()
+    reconciler = Reconciler(clock=clock)
+    reconciler.observe("psutil", {"Ethernet": {"addresses": ADDRESSES, "link": "Up"}})
+    reconciler.observe("netsh", {"Ethernet": {"mode": "DHCP", "gateways": ("10.0.0.1",)}})
+    assert reconciler.merge()[0]["stale"] == ["description"]
+
+    clock.now += 10000
+    stale = reconciler.merge()[0]["stale"]
+    for field in ("mode", "link", "ip", "subnet", "addresses", "gateway", "gateways"):
+        assert field in stale
+
+
+def test_single_source_field_expires_without_new_observations():
+    clock = Clock()
+    reconciler = Reconciler(clock=clock)
+    reconciler.observe("psutil", {"Ethernet": {"addresses": ADDRESSES, "link": "Up"}})
+    assert "link" not in reconciler.merge()[0]["stale"]
+
+    clock.now += MAX_AGE["psutil"] + 1
+    assert "link" in reconciler.merge()[0]["stale"]
+
+
+def test_cache_only_fields_are_stale():
+    clock = Clock()
+    reconciler = Reconciler(clock=clock)
+    cached = [{"connection": "Ethernet", "description": "NIC", "mode": "Static", "link": "Up",
+               "addresses": [["ipv4", "10.0.0.5", 24, "manual"]], "gateways": []}]
+    reconciler.observe("cache", cache_observations(cached), taken_at=clock.now - 5)
+    row = reconciler.merge()[0]
+    for field in ("description", "mode", "link", "addresses", "gateways"):
+        assert field in row["stale"]